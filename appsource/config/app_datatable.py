@@ -0,0 +1,223 @@
+"""
+DataTables Engine - server side processing for the admin list views
+
+    1. recordsTotal / recordsFiltered are cached per model and query, the model
+       version is a stamp in the cache shared by every process
+       (settings.DATATABLE_VERSION_CACHE_ALIAS), a save/delete of one of
+       PAGED_MODELS writes a new one so no worker serves stale counts
+    2. recordsFiltered is keyed by the filtered query, so it is only recomputed
+       when the search term changes
+    3. pages are fetched by seeking on the ordering keys (keyset pagination)
+       when the boundary of the neighbouring page is known, and by scanning
+       from the nearer end of the result set otherwise, so the last page
+       costs the same as the first one
+"""
+import uuid
+import hashlib
+from django.core.cache import cache, caches
+from django.core.exceptions import EmptyResultSet, FieldDoesNotExist
+from django.db.models import Q
+from django.db.models.signals import post_save, post_delete
+from django.conf import settings
+from config import app_logger
+
+logger = app_logger.createLogger("app")
+
+MAX_PAGE_LENGTH = 500
+
+# models listed by the admin DataTables, a save / delete starts a new version
+PAGED_MODELS = (
+    'squarebox.Property',
+    'squarebox.PropertyType',
+    'squarebox.Lead',
+    'squarebox.PropertyImage',
+    'squarebox.MaintenanceRequest',
+    'mck_master.SupportPageContent',
+    'mck_master.Category',
+    'mck_master.SubCategory',
+    'mck_master.Banner',
+    'mck_master.Gallery',
+    'mck_master.State',
+    'mck_master.City',
+    'mck_master.Offers',
+    'mck_master.ClientFeedback',
+    'mck_admin_console.FAQCategory',
+    'mck_admin_console.FAQ',
+    'mck_admin_console.Area',
+    'mck_admin_console.Testimonial',
+    'mck_auth.AccountTypeRole',
+)
+
+
+def get_version_cache():
+    return caches[settings.DATATABLE_VERSION_CACHE_ALIAS]
+
+
+def _model_version_key(model):
+    return "dt_version:{0}".format(model._meta.label_lower)
+
+
+def get_model_version(model):
+    """
+    Current data version of a model, created on first use
+    """
+    key = _model_version_key(model)
+    version = get_version_cache().get(key)
+    if version is None:
+        get_version_cache().add(key, uuid.uuid4().hex, None)
+        version = get_version_cache().get(key)
+    return version
+
+
+def bump_model_version(sender, **kwargs):
+    # a new stamp rather than incr(), the file based cache has no atomic incr
+    get_version_cache().set(_model_version_key(sender), uuid.uuid4().hex, None)
+
+
+for _label in PAGED_MODELS:
+    post_save.connect(bump_model_version, sender=_label, dispatch_uid="app_datatable_save_%s" % _label)
+    post_delete.connect(bump_model_version, sender=_label, dispatch_uid="app_datatable_delete_%s" % _label)
+
+
+def _query_signature(qs):
+    try:
+        sql, params = qs.query.sql_with_params()
+    except EmptyResultSet:
+        return None
+    return hashlib.md5("{0}|{1}".format(sql, params).encode()).hexdigest()
+
+
+def cached_count(qs):
+    """
+    COUNT(*) of the queryset, cached until the model changes
+    """
+    counted_qs = qs.order_by()
+    signature = _query_signature(counted_qs)
+    if signature is None:
+        return 0
+    key = "dt_count:{0}:{1}:{2}".format(qs.model._meta.label_lower, get_model_version(qs.model), signature)
+    total = cache.get(key)
+    if total is None:
+        total = counted_qs.count()
+        cache.set(key, total, settings.DATATABLE_COUNT_CACHE_TIMEOUT)
+    return total
+
+
+def has_search(request, is_download=False):
+    if request.method == "POST":
+        pDict = request.POST
+    else:
+        pDict = request.GET
+    if is_download and request.session.has_key('search_value'):
+        return bool(request.session.get('search_value'))
+    return bool(pDict.get('search[value]'))
+
+
+def _order_keys(qs):
+    """
+    Returns the queryset ordered with a primary key tie breaker and the
+    (field name, descending) keys to seek on, or None when the ordering
+    cannot be used for seeking (relations, lookups, nullable columns).
+    """
+    model = qs.model
+    pk_name = model._meta.pk.name
+    order_by = list(qs.query.order_by)
+    if not [term for term in order_by if isinstance(term, str) and term.lstrip('-') in ('pk', pk_name)]:
+        descending = not order_by or not isinstance(order_by[0], str) or order_by[0].startswith('-')
+        order_by.append('-pk' if descending else 'pk')
+        qs = qs.order_by(*order_by)
+
+    keys = list()
+    for term in order_by:
+        if not isinstance(term, str):
+            return qs, None
+        descending = term.startswith('-')
+        name = term.lstrip('-')
+        if name == 'pk':
+            name = pk_name
+        if '__' in name or name == '?':
+            return qs, None
+        try:
+            field = model._meta.get_field(name)
+        except FieldDoesNotExist:
+            return qs, None
+        if field.is_relation or field.null or not field.concrete:
+            return qs, None
+        if qs._fields and field.attname not in qs._fields:
+            # .values() rows without the key
+            return qs, None
+        keys.append((field.attname, descending))
+    return qs, keys
+
+
+def _row_key(row, keys):
+    if isinstance(row, dict):
+        return tuple(row[name] for name, descending in keys)
+    return tuple(getattr(row, name) for name, descending in keys)
+
+
+def _seek_q(keys, values, backwards=False):
+    """
+    (k1, k2, ..) strictly after / before (v1, v2, ..) in the ordering
+    """
+    q = Q()
+    for index, (name, descending) in enumerate(keys):
+        lookup = "lt" if descending != backwards else "gt"
+        term = Q(**{"{0}__{1}".format(name, lookup): values[index]})
+        for prev_index in range(index):
+            term &= Q(**{keys[prev_index][0]: values[prev_index]})
+        q |= term
+    return q
+
+
+def _cursor_prefix(request, qs):
+    session = getattr(request, 'session', None)
+    owner = session.session_key if session is not None and session.session_key else request.user.pk
+    return "dt_cursor:{0}:{1}:{2}:{3}".format(qs.model._meta.label_lower,
+                                               get_model_version(qs.model),
+                                               owner,
+                                               _query_signature(qs))
+
+
+def seek_page(request, qs, total_records):
+    """
+    Rows for the requested DataTables page (start / length)
+    """
+    try:
+        if request.method == "POST":
+            pDict = request.POST
+        else:
+            pDict = request.GET
+
+        limit = min(int(pDict.get('length', -1)), MAX_PAGE_LENGTH)
+        start = int(pDict.get('start', 0))
+        if limit == -1:
+            return qs
+
+        qs, keys = _order_keys(qs)
+        prefix = _cursor_prefix(request, qs)
+        after = cache.get("{0}:after:{1}".format(prefix, start)) if keys and start else None
+        before = cache.get("{0}:before:{1}".format(prefix, start + limit)) if keys and start else None
+
+        if start == 0:
+            rows = list(qs[:limit])
+        elif after is not None:
+            rows = list(qs.filter(_seek_q(keys, after))[:limit])
+        elif before is not None:
+            rows = list(qs.filter(_seek_q(keys, before, backwards=True)).reverse()[:limit])[::-1]
+        elif start * 2 > total_records:
+            # closer to the end, scan the reversed ordering instead
+            end = max(total_records - start, 0)
+            rows = list(qs.reverse()[max(end - limit, 0):end])[::-1]
+        else:
+            rows = list(qs[start:start + limit])
+
+        if keys and rows:
+            timeout = settings.DATATABLE_CURSOR_CACHE_TIMEOUT
+            cache.set("{0}:after:{1}".format(prefix, start + limit), _row_key(rows[-1], keys), timeout)
+            cache.set("{0}:before:{1}".format(prefix, start), _row_key(rows[0], keys), timeout)
+        return rows
+
+    except Exception as e:
+        app_logger.exceptionlogs(e)
+    return qs
@@ -0,0 +1,149 @@
+"""
+Property Facets - filter sidebar counts of the website property page
+
+    1. the query string filters (city, property_type, listing_type, budget,
+       bedrooms) are normalised by get_filters and applied by filter_queryset,
+       the page and the counts share them
+    2. each facet counts the listings matching every filter but its own, so
+       the other options of a selected facet keep their counts, in one
+       grouped query per facet (the price buckets in one conditional
+       aggregate)
+    3. the counts are cached per filter signature and the data versions of
+       Property and PropertyType (app_datatable.get_model_version, stamps in
+       the cache shared by every process), a listing saved or deleted by any
+       worker starts a new version
+
+    Usage:
+        filters = app_facets.get_filters(request.GET)
+        qs = app_facets.filter_queryset(Property.objects.live(), filters)
+        facets = app_facets.get_facets(filters)
+"""
+import hashlib
+from django.conf import settings
+from django.core.cache import cache
+from django.db.models import Count, Q
+from config import app_datatable
+from config import app_gv as gv
+from config import app_search
+from squarebox.models import Property, PropertyType
+
+
+# label shown and sent in ?budget=, filter on the price
+PRICE_BUCKETS = (
+    ("Below 100k", Q(price__lt=100000)),
+    ("100k - 300k", Q(price__range=(100000, 300000))),
+    ("Above 300k", Q(price__gt=300000)),
+)
+PRICE_BUCKET_FILTERS = dict(PRICE_BUCKETS)
+
+FILTER_PARAMS = ('city', 'property_type', 'listing_type', 'budget', 'bedrooms')
+
+
+def get_filters(params):
+    """
+    {param: value} of the filters set in the query string, unknown values dropped
+    """
+    filters = dict()
+    for name in FILTER_PARAMS:
+        value = (params.get(name) or '').strip()
+        if not value:
+            continue
+        if name == 'budget' and value not in PRICE_BUCKET_FILTERS:
+            continue
+        if name == 'bedrooms':
+            if not value.isdigit():
+                continue
+            value = int(value)
+        filters[name] = value
+    return filters
+
+
+def filter_queryset(qs, filters, skip=None, ranked=False):
+    """
+    Applies the filters but skip, ranked orders the city matches best first
+    """
+    for name, value in filters.items():
+        if name == skip:
+            continue
+        if name == 'city':
+            qs = app_search.search(qs, value, fields=['city'], ranked=ranked)
+        elif name == 'property_type':
+            qs = qs.filter(property_type__name__iexact=value)
+        elif name == 'listing_type':
+            qs = qs.filter(listing_type__iexact=value)
+        elif name == 'budget':
+            qs = qs.filter(PRICE_BUCKET_FILTERS[value])
+        elif name == 'bedrooms':
+            qs = qs.filter(bedrooms=value)
+    return qs
+
+
+def _grouped_counts(qs, field):
+    rows = qs.exclude(**{'{0}__isnull'.format(field): True}) \
+             .values(field) \
+             .annotate(count=Count('pk')) \
+             .order_by(field)
+    return [(row[field], row['count']) for row in rows]
+
+
+def _facet(items, selected, choices=None):
+    """
+    Options of a facet, every one of the choices (counted 0 when missing)
+    followed by the other values found
+    """
+    counts = dict(items)
+    labels = dict(choices or ())
+    values = [value for value, label in choices or ()]
+    values += [value for value, count in items if value not in labels]
+    selected = str(selected).lower() if selected is not None else None
+    return [dict(value=value, label=labels.get(value, value), count=counts.get(value, 0),
+                 selected=str(value).lower() == selected)
+            for value in values]
+
+
+def compute_facets(filters):
+    """
+    {facet: [{value, label, count, selected}, ..]} of the live listings
+    """
+    base = Property.objects.live()
+    facets = dict()
+
+    qs = filter_queryset(base, filters, skip='city')
+    facets['city'] = _facet(_grouped_counts(qs, 'city'), filters.get('city'))
+
+    qs = filter_queryset(base, filters, skip='property_type')
+    facets['property_type'] = _facet(_grouped_counts(qs, 'property_type__name'),
+                                     filters.get('property_type'), gv.PROPERTY_TYPE_CHOICES)
+
+    qs = filter_queryset(base, filters, skip='listing_type')
+    facets['listing_type'] = _facet(_grouped_counts(qs, 'listing_type'),
+                                    filters.get('listing_type'), Property.LISTING_TYPE_CHOICES)
+
+    qs = filter_queryset(base, filters, skip='budget')
+    counts = qs.aggregate(**{'bucket_{0}'.format(index): Count('pk', filter=q)
+                             for index, (label, q) in enumerate(PRICE_BUCKETS)})
+    facets['budget'] = _facet([(label, counts['bucket_{0}'.format(index)])
+                               for index, (label, q) in enumerate(PRICE_BUCKETS)], filters.get('budget'))
+
+    qs = filter_queryset(base, filters, skip='bedrooms')
+    facets['bedrooms'] = _facet(_grouped_counts(qs, 'bedrooms'), filters.get('bedrooms'))
+    return facets
+
+
+def _filter_signature(filters):
+    signature = "|".join("{0}={1}".format(name, str(filters[name]).lower()) for name in sorted(filters))
+    return hashlib.md5(signature.encode()).hexdigest()
+
+
+def get_facets(filters):
+    """
+    compute_facets cached until a Property or PropertyType changes, in any process
+    """
+    key = "facets:{0}:{1}:{2}".format(app_datatable.get_model_version(Property),
+                                      app_datatable.get_model_version(PropertyType),
+                                      _filter_signature(filters))
+    facets = cache.get(key)
+    if facets is None:
+        facets = compute_facets(filters)
+        cache.set(key, facets, settings.PROPERTY_FACET_CACHE_TIMEOUT)
+    return facets
@@ -27,6 +27,8 @@ ENQUIRY_STATUS = (("OPEN", ""),
 IMAGE_REPO_FOLDER = 'data/ir'
 FILE_REPO_FOLDER = 'data/fr'
 
+EMAIL_STATUS = (('PENDING', 'Pending'), ('SENDING', 'Sending'), ('SENT', 'Sent'), ('FAILED', 'Failed'))
+
 INVOICE_STATUS = (('DUE', 'Due'), ('PAID', 'Paid'), ('PARTIALLY', 'Partially Paid'))
 PAYMENT_TRANSACTION_MODE = (('CASH','Cash'), ('CARD','Card'), ('UPI','UPI'))
 
@@ -0,0 +1,214 @@
+"""
+Image Derivatives - resized JPEG / WebP copies of the uploaded property images
+
+    1. saving a Property (main_image) or a PropertyImage (image) with a new
+       upload schedules its derivatives once the transaction commits, they are
+       generated by a small thread pool (Pillow releases the GIL while
+       resizing and encoding) so the upload request does not wait on them
+    2. one copy per settings.IMAGE_DERIVATIVE_WIDTHS narrower than the
+       original and per format, next to the original:
+           ddata/properties/2025/08/13/villa.jpg
+           ddata/properties/2025/08/13/villa.w640.webp
+    3. the copies are recorded on the row in image_derivatives
+           {"source": <image name>, "width": <original width>,
+            "jpeg": {"320": <name>, ..}, "webp": {"320": <name>, ..}}
+       and rendered by the mck_website image_tags (srcset / responsive_image)
+    4. the copies of the previous image are released (storage.delete, one
+       reference with the content addressed storage) once the new ones are
+       recorded, when the image is removed and when the row is deleted
+    5. script_image_derivatives generates them for the existing rows
+
+    The receivers are connected by the squarebox app config.
+"""
+import io
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from django.apps import apps
+from django.conf import settings
+from django.core.files.base import ContentFile
+from django.db import close_old_connections, transaction
+from django.db.models.signals import post_save, pre_delete
+from PIL import Image, ImageOps
+from config import app_logger
+
+
+logger = app_logger.createLogger("app_threads")
+
+# model label -> image field of the model carrying the derivatives
+IMAGE_FIELDS = {
+    'squarebox.Property': 'main_image',
+    'squarebox.PropertyImage': 'image',
+}
+
+FORMATS = {
+    'jpeg': ('JPEG', 'jpg'),
+    'webp': ('WEBP', 'webp'),
+}
+
+_executor = None
+_executor_lock = threading.Lock()
+
+
+def get_executor():
+    global _executor
+    with _executor_lock:
+        if _executor is None:
+            _executor = ThreadPoolExecutor(max_workers=settings.IMAGE_DERIVATIVE_WORKERS,
+                                           thread_name_prefix="app-image")
+        return _executor
+
+
+def derivative_name(name, width, extension):
+    stem = name.rsplit(".", 1)[0]
+    return "{0}.w{1}.{2}".format(stem, width, extension)
+
+
+def target_widths(width):
+    """
+    Configured widths below the original width, the original width itself
+    when it is narrower than all of them
+    """
+    widths = [target for target in settings.IMAGE_DERIVATIVE_WIDTHS if target < width]
+    return widths or [width]
+
+
+def generate_derivatives(field_file):
+    """
+    Writes the derivatives of an image to its storage, returns the image_derivatives dict
+    """
+    storage = field_file.storage
+    with storage.open(field_file.name, 'rb') as source:
+        image = Image.open(source)
+        image = ImageOps.exif_transpose(image)
+        if image.mode not in ('RGB', 'L'):
+            image = image.convert('RGB')
+        image.load()
+
+    derivatives = dict(source=field_file.name, width=image.width)
+    for width in target_widths(image.width):
+        height = max(round(image.height * width / image.width), 1)
+        resized = image.resize((width, height), Image.LANCZOS) if width != image.width else image
+        for key, (image_format, extension) in FORMATS.items():
+            buffer = io.BytesIO()
+            resized.save(buffer, image_format, quality=settings.IMAGE_DERIVATIVE_QUALITY, optimize=True)
+            name = derivative_name(field_file.name, width, extension)
+            if storage.exists(name):
+                storage.delete(name)
+            name = storage.save(name, ContentFile(buffer.getvalue()))
+            derivatives.setdefault(key, dict())[str(width)] = name
+    return derivatives
+
+
+def derivative_names(derivatives):
+    return [name for key in FORMATS for name in (derivatives or dict()).get(key, dict()).values()]
+
+
+def release_derivatives(storage, derivatives):
+    """
+    Deletes the copies once the transaction commits
+    """
+    for name in derivative_names(derivatives):
+        transaction.on_commit(lambda name=name: storage.delete(name))
+
+
+def process(model_label, pk):
+    """
+    Generates and records the derivatives of a row, skipped if the image
+    changed or got its derivatives in the meantime
+    """
+    model = apps.get_model(model_label)
+    field_name = IMAGE_FIELDS[model_label]
+    instance = model.objects.filter(pk=pk).only('pk', field_name, 'image_derivatives').first()
+    if instance is None:
+        return None
+    field_file = getattr(instance, field_name)
+    if not field_file or instance.image_derivatives.get('source') == field_file.name:
+        return instance.image_derivatives
+
+    derivatives = generate_derivatives(field_file)
+    # recorded only if the row still has this image and the derivatives read above, the
+    # image may have changed or got its derivatives from another worker in the meantime
+    updated = model.objects.filter(pk=pk, image_derivatives=instance.image_derivatives,
+                                   **{field_name: field_file.name}).update(image_derivatives=derivatives)
+    if not updated:
+        release_derivatives(field_file.storage, derivatives)
+        return None
+    # the copies of the previous image were shown until now
+    release_derivatives(field_file.storage, instance.image_derivatives)
+    logger.info("Image derivatives of %s %s: %s", model_label, pk, field_file.name)
+    return derivatives
+
+
+def _process_in_pool(model_label, pk):
+    try:
+        process(model_label, pk)
+    except Exception as e:
+        app_logger.exceptionlogs(e)
+    finally:
+        close_old_connections()
+
+
+def schedule(model_label, pk):
+    get_executor().submit(_process_in_pool, model_label, pk)
+
+
+def is_stale(instance, field_name):
+    field_file = getattr(instance, field_name)
+    return (field_file.name or None) != (instance.image_derivatives.get('source') or None)
+
+
+def _stored_derivatives(model, pk):
+    # the row may have got its derivatives after the instance was loaded
+    return model._base_manager.filter(pk=pk).values_list('image_derivatives', flat=True).first()
+
+
+def image_saved(sender, instance, update_fields=None, **kwargs):
+    if update_fields is not None and set(update_fields) == {'image_derivatives'}:
+        return
+    model_label = sender._meta.label
+    field_name = IMAGE_FIELDS[model_label]
+    if not is_stale(instance, field_name):
+        return
+    if not getattr(instance, field_name):
+        # image removed, forget its derivatives
+        derivatives = _stored_derivatives(sender, instance.pk)
+        sender._base_manager.filter(pk=instance.pk).update(image_derivatives=dict())
+        release_derivatives(sender._meta.get_field(field_name).storage, derivatives)
+        return
+    transaction.on_commit(lambda: schedule(model_label, instance.pk))
+
+
+def image_deleted(sender, instance, **kwargs):
+    field_name = IMAGE_FIELDS[sender._meta.label]
+    release_derivatives(sender._meta.get_field(field_name).storage, _stored_derivatives(sender, instance.pk))
+
+
+for _label in IMAGE_FIELDS:
+    post_save.connect(image_saved, sender=_label, dispatch_uid="app_images_save_%s" % _label)
+    pre_delete.connect(image_deleted, sender=_label, dispatch_uid="app_images_delete_%s" % _label)
+
+
+def _urls(storage, derivatives, key):
+    return [(int(width), storage.url(name)) for width, name in sorted(
+        derivatives.get(key, dict()).items(), key=lambda item: int(item[0]))]
+
+
+def srcset(storage, derivatives, key='webp'):
+    """
+    "url 320w, url 640w, .." of the derivatives in one format
+    """
+    return ", ".join("{0} {1}w".format(url, width) for width, url in _urls(storage, derivatives, key))
+
+
+def fallback_url(storage, derivatives, width=None):
+    """
+    URL of the JPEG derivative closest above width (the largest without width)
+    """
+    urls = _urls(storage, derivatives, 'jpeg')
+    if not urls:
+        return None
+    if width:
+        for derivative_width, url in urls:
+            if derivative_width >= width:
+                return url
+    return urls[-1][1]
@@ -1,8 +1,16 @@
 import sys
+import copy
+import queue
+import atexit
+import time
+import random
 import datetime
+import threading
 import logging.config
+import logging.handlers
 from functools import wraps
 from django.conf import settings
+from config import app_metrics
 
 """
 Notes: Order of logs
@@ -17,6 +25,19 @@ Notes: Order of logs
     logger.info("It works.")
     logger.warn("Something not ideal")
     logger.error("Something went wrong")
+
+Notes: Queue logging (settings.APP_LOGGING_QUEUE)
+
+    Django configures logging through configure_logging (LOGGING_CONFIG), the
+    handlers of every logger in LOGGING are then moved behind one bounded
+    queue and written by a background listener thread. Records are formatted
+    by the listener, so pass arguments instead of pre-formatted strings:
+
+    logger.info("Saved %s", instance)       formatted only when written
+    logger.info("Saved %s" % instance)      formatted in the request thread
+
+    When the queue is full records are dropped and counted, the count is
+    logged once the queue has room again (see queue_logging_stats).
 """
 
 def createLogger(logHandler):
@@ -38,28 +59,41 @@ def setLoggerLevel(logger,loglevel):
     return logger
 
 
+def _sample_function_logs(logger):
+    """
+    Whether the entry / exit lines of this call are logged,
+    settings.APP_LOGGING_FUNCTION_SAMPLE_RATE is the logged fraction of calls
+    """
+    if not logger.isEnabledFor(logging.INFO):
+        return False
+    rate = getattr(settings, 'APP_LOGGING_FUNCTION_SAMPLE_RATE', 1.0)
+    return rate >= 1 or random.random() < rate
+
+
 def functionlogs(log='app'):
     def wrap(function):
+        file_name = function.__code__.co_filename.rsplit("/", 1)[-1]
         @wraps(function)
         def wrapper(*args, **kwargs):
             logger = logging.getLogger(log)
-            function.__class__
-            file_name = function.__code__.co_filename.rsplit("/", 1)
-            if file_name and len(file_name)>1:
-                file_name = file_name[1]
-            init_time = datetime.datetime.now()
-            logger.info("*******Starting function %s : %s" % (file_name, function.__qualname__))
+            sampled = _sample_function_logs(logger)
+            if sampled:
+                logger.info("*******Starting function %s : %s", file_name, function.__qualname__)
             # if settings.APP_LOGGER_FUNCTION_IN_PARAMS.upper() == 'TRUE':
             #     logger.debug("I/P: with args={} kwargs={}".format(args, kwargs))
+            init_time = time.perf_counter()
             try:
                 response = function(*args, **kwargs)
             except Exception as error:
-                logger.error("Function '{}' raised {} with error '{}'".format(function.__qualname__,error.__class__.__name__,str(error)))
+                logger.error("Function '%s' raised %s with error '%s'", function.__qualname__, error.__class__.__name__, error)
                 raise error
             # if settings.APP_LOGGER_FUNCTION_OUT_PARAMS.upper() == 'TRUE':
             #     logger.debug("O/P: {}".format(response))
-            end_time = datetime.datetime.now()
-            logger.info("*******Finished function %s : %s in %s seconds" % (file_name, function.__qualname__,end_time-init_time))
+            elapsed = time.perf_counter() - init_time
+            if settings.APP_METRICS_ENABLED:
+                app_metrics.observe_function(function.__qualname__, elapsed)
+            if sampled:
+                logger.info("*******Finished function %s : %s in %s seconds", file_name, function.__qualname__, datetime.timedelta(seconds=elapsed))
             return response
         return wrapper
     return wrap
@@ -73,9 +107,9 @@ def exceptionlogs(e,log='app'):
     exception_traceback = sys.exc_info()
     logger = logging.getLogger(log)
     logger.error('-'*80)
-    logger.error('Error Type   : %s' %(exception_traceback[0]))
-    logger.error('Error Trace  : %s' %(exception_traceback[1]))
-    logger.error('Error Line: %s %s' %(exception_traceback[2].tb_lineno,e))
+    logger.error('Error Type   : %s', exception_traceback[0])
+    logger.error('Error Trace  : %s', exception_traceback[1])
+    logger.error('Error Line: %s %s', exception_traceback[2].tb_lineno, e)
     logger.error('-'*80)
 
 
@@ -90,3 +124,121 @@ def _setmsg(success_msg,error_msg, flag):
     else:
         msg = error_msg
     return flag, msg
+
+
+class QueueStats:
+    """
+    Drop accounting shared by the queue handlers
+    """
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.dropped = 0
+        self.reported = 0
+
+
+class DroppingQueueHandler(logging.handlers.QueueHandler):
+    """
+    Never blocks the caller, records are dropped and counted when the queue is full.
+    Formatting is left to the listener, the record only remembers its route (logger).
+    """
+    def __init__(self, log_queue, route, stats):
+        super().__init__(log_queue)
+        self.route = route
+        self.stats = stats
+
+    def prepare(self, record):
+        record = copy.copy(record)
+        record.queue_route = self.route
+        return record
+
+    def enqueue(self, record):
+        stats = self.stats
+        try:
+            self.queue.put_nowait(record)
+        except queue.Full:
+            with stats.lock:
+                stats.dropped += 1
+            return
+        if stats.dropped != stats.reported:
+            with stats.lock:
+                dropped, stats.reported = stats.dropped - stats.reported, stats.dropped
+            report = logging.makeLogRecord(dict(name=record.name, levelno=logging.WARNING, levelname="WARNING",
+                                                msg="%s log records dropped, logging queue full", args=(dropped,)))
+            report.queue_route = self.route
+            try:
+                self.queue.put_nowait(report)
+            except queue.Full:
+                pass
+
+
+class RoutingQueueListener(logging.handlers.QueueListener):
+    """
+    Background writer, hands every record to the handlers of the logger it came from
+    """
+    def __init__(self, log_queue, routes):
+        super().__init__(log_queue)
+        self.routes = routes
+
+    def handle(self, record):
+        for handler in self.routes.get(record.queue_route, ()):
+            if record.levelno >= handler.level:
+                handler.handle(record)
+
+    def enqueue_sentinel(self):
+        # wait for room, the sentinel must not be dropped
+        self.queue.put(self._sentinel)
+
+
+_queue_listener = None
+_queue_stats = None
+
+
+def start_queue_logging(logger_names, queue_size):
+    """
+    Moves the handlers of the loggers behind a bounded queue and a listener thread
+    """
+    global _queue_listener, _queue_stats
+    stop_queue_logging()
+    log_queue = queue.Queue(queue_size)
+    stats = QueueStats()
+    routes = dict()
+    for name in logger_names:
+        logger = logging.getLogger(name)
+        routes[name] = [handler for handler in logger.handlers]
+        for handler in routes[name]:
+            logger.removeHandler(handler)
+        logger.addHandler(DroppingQueueHandler(log_queue, name, stats))
+    _queue_listener = RoutingQueueListener(log_queue, routes)
+    _queue_stats = stats
+    _queue_listener.start()
+
+
+def stop_queue_logging():
+    """
+    Writes out the queued records and stops the listener thread
+    """
+    global _queue_listener
+    if _queue_listener is not None:
+        _queue_listener.stop()
+        _queue_listener = None
+
+
+def queue_logging_stats():
+    if _queue_stats is None:
+        return dict(enabled=False)
+    return dict(enabled=True,
+                queued=_queue_listener.queue.qsize() if _queue_listener else 0,
+                dropped=_queue_stats.dropped)
+
+
+def configure_logging(logging_settings):
+    """
+    LOGGING_CONFIG callable, dictConfig followed by the queue when enabled
+    """
+    stop_queue_logging()
+    logging.config.dictConfig(logging_settings)
+    if getattr(settings, 'APP_LOGGING_QUEUE', False):
+        start_queue_logging(list(logging_settings.get('loggers', dict())), settings.APP_LOGGING_QUEUE_SIZE)
+
+
+atexit.register(stop_queue_logging)
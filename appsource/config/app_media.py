@@ -0,0 +1,169 @@
+"""
+Media Serving - /site-media/, /app-static/ and /static/ without streaming through Python
+
+    1. with settings.MEDIA_SENDFILE the front-end server sends the file:
+           "x-sendfile"        X-Sendfile: <absolute path> (Apache, lighttpd)
+           "x-accel-redirect"  X-Accel-Redirect: <internal location>/<path> (nginx),
+                               the location of each document root is taken from
+                               settings.MEDIA_ACCEL_LOCATIONS, a document root
+                               without one is streamed as in 2.
+    2. otherwise a FileResponse, which the WSGI server hands to os.sendfile
+       through wsgi.file_wrapper, single byte ranges are streamed in chunks
+    3. ETag / Last-Modified are answered with 304 (If-None-Match,
+       If-Modified-Since), Range / If-Range with 206, or 416 when the range
+       starts past the end, an invalid range (last < first) is ignored and the
+       full file sent (RFC 7233 2.1)
+    4. content addressed uploads (cas/..) and hashed static names are cached
+       for a year as immutable, everything else for settings.MEDIA_CACHE_MAX_AGE
+"""
+import os
+import re
+import stat
+import mimetypes
+import posixpath
+from django.conf import settings
+from django.core.exceptions import SuspiciousFileOperation
+from django.http import FileResponse, Http404, HttpResponse, StreamingHttpResponse
+from django.utils._os import safe_join
+from django.utils.cache import get_conditional_response
+from django.utils.http import http_date, parse_http_date_safe
+from config import app_storage
+
+
+IMMUTABLE_MAX_AGE = 365 * 24 * 60 * 60
+HASHED_NAME_RE = re.compile(r"\.[0-9a-f]{12}\.\w+$")
+RANGE_RE = re.compile(r"^bytes=(\d*)-(\d*)$")
+CHUNK_SIZE = 64 * 1024
+
+
+def is_immutable(path):
+    """
+    Content addressed and hashed names never change their content
+    """
+    return bool(app_storage.content_hash(path) or HASHED_NAME_RE.search(path))
+
+
+def file_etag(path, stat_result):
+    sha256 = app_storage.content_hash(path)
+    if sha256:
+        return '"{0}"'.format(sha256)
+    return '"{0:x}-{1:x}"'.format(stat_result.st_mtime_ns, stat_result.st_size)
+
+
+def parse_range(header, size):
+    """
+    (start, end) of a single byte range, None for a full response (no range
+    or an invalid one) and False when the range cannot be satisfied
+    """
+    match = RANGE_RE.match(header.replace(" ", ""))
+    if not match or not size:
+        return None
+    first, last = match.groups()
+    if not first and not last:
+        return None
+    if not first:
+        # the last n bytes
+        start, end = max(size - int(last), 0), size - 1
+    else:
+        start = int(first)
+        if last and int(last) < start:
+            # syntactically invalid, the header is ignored
+            return None
+        end = min(int(last), size - 1) if last else size - 1
+    if start >= size:
+        return False
+    return start, end
+
+
+def if_range_matches(request, etag, last_modified):
+    if_range = request.headers.get("If-Range")
+    if not if_range:
+        return True
+    if if_range.startswith('"') or if_range.startswith('W/'):
+        return if_range == etag
+    return parse_http_date_safe(if_range) == int(last_modified)
+
+
+def _read_range(path, start, length):
+    with open(path, "rb") as file:
+        file.seek(start)
+        while length > 0:
+            chunk = file.read(min(CHUNK_SIZE, length))
+            if not chunk:
+                break
+            length -= len(chunk)
+            yield chunk
+
+
+def _sendfile_response(full_path, document_root):
+    """
+    Response for the front-end server to send the file, None when it cannot
+    """
+    backend = settings.MEDIA_SENDFILE
+    response = HttpResponse()
+    if backend == "x-sendfile":
+        response["X-Sendfile"] = full_path
+    elif backend == "x-accel-redirect":
+        location = settings.MEDIA_ACCEL_LOCATIONS.get(str(document_root))
+        if location is None:
+            return None
+        location = location.rstrip("/")
+        relative = os.path.relpath(full_path, document_root).replace(os.sep, "/")
+        response["X-Accel-Redirect"] = "{0}/{1}".format(location, relative)
+    else:
+        raise ValueError("Unknown MEDIA_SENDFILE backend {0}".format(backend))
+    # the front-end server sets the length and answers the ranges
+    return response
+
+
+def serve(request, path, document_root=None):
+    """
+    Drop-in replacement of django.views.static.serve
+    """
+    path = posixpath.normpath(path).lstrip("/")
+    try:
+        full_path = safe_join(document_root, path)
+        stat_result = os.stat(full_path)
+    except (OSError, ValueError, SuspiciousFileOperation) as e:
+        raise Http404("File not found") from e
+    if not stat.S_ISREG(stat_result.st_mode):
+        raise Http404("File not found")
+
+    etag = file_etag(path, stat_result)
+    last_modified = stat_result.st_mtime
+    response = get_conditional_response(request, etag=etag, last_modified=int(last_modified))
+    if response is None:
+        content_type, encoding = mimetypes.guess_type(full_path)
+        content_type = content_type or "application/octet-stream"
+        size = stat_result.st_size
+
+        if settings.MEDIA_SENDFILE:
+            response = _sendfile_response(full_path, document_root)
+        if response is not None:
+            response["Content-Type"] = content_type
+        else:
+            byte_range = None
+            if "Range" in request.headers and if_range_matches(request, etag, last_modified):
+                byte_range = parse_range(request.headers["Range"], size)
+            if byte_range is False:
+                response = HttpResponse(status=416)
+                response["Content-Range"] = "bytes */{0}".format(size)
+            elif byte_range:
+                start, end = byte_range
+                response = StreamingHttpResponse(
+                    _read_range(full_path, start, end - start + 1), status=206, content_type=content_type)
+                response["Content-Length"] = str(end - start + 1)
+                response["Content-Range"] = "bytes {0}-{1}/{2}".format(start, end, size)
+            else:
+                response = FileResponse(open(full_path, "rb"), content_type=content_type)
+            response["Accept-Ranges"] = "bytes"
+        if encoding:
+            response["Content-Encoding"] = encoding
+
+    response["ETag"] = etag
+    response["Last-Modified"] = http_date(last_modified)
+    if is_immutable(path):
+        response["Cache-Control"] = "public, max-age={0}, immutable".format(IMMUTABLE_MAX_AGE)
+    else:
+        response["Cache-Control"] = "public, max-age={0}".format(settings.MEDIA_CACHE_MAX_AGE)
+    return response
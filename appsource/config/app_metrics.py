@@ -0,0 +1,283 @@
+"""
+Metrics - in process timing registry fed by app_logger.functionlogs
+
+    1. every decorated function call is observed in a histogram per __qualname__
+       (count, sum, max and log spaced buckets giving p50 / p95 / p99)
+    2. mck_auth.middleware.MetricsMiddleware observes the duration, SQL query
+       count and SQL time of every request per view name
+    3. each process snapshots its registry to settings.APP_METRICS_DIR from a
+       background thread every settings.APP_METRICS_FLUSH_INTERVAL seconds,
+       the Prometheus endpoint (mck_admin_console MetricsView) and the
+       script_metrics_report script merge the snapshots of every process
+    4. a snapshot not rewritten for settings.APP_METRICS_SNAPSHOT_MAX_AGE
+       seconds is from a process gone (restarted / scaled down worker), it
+       is left out of the merge and deleted
+
+    Bucket counts are additive, so histograms of several processes merge
+    exactly, the percentiles are the upper bound of the matching bucket.
+"""
+import os
+import math
+import json
+import time
+import atexit
+import bisect
+import threading
+from django.conf import settings
+
+
+def _bounds(start, factor, count):
+    return tuple(start * factor ** index for index in range(count))
+
+
+# 10us .. ~10 minutes, 20% apart
+SECONDS_BOUNDS = _bounds(0.00001, 1.2, 100)
+# 1 .. ~30000 queries, whole numbers
+COUNT_BOUNDS = tuple(sorted({math.ceil(bound) for bound in _bounds(1, 1.25, 48)}))
+
+QUANTILES = (0.5, 0.95, 0.99)
+
+FAMILIES = {
+    'app_function_seconds': ("Wall time of functionlogs decorated functions", SECONDS_BOUNDS),
+    'app_request_seconds': ("Wall time of requests per view", SECONDS_BOUNDS),
+    'app_request_sql_queries': ("SQL queries per request per view", COUNT_BOUNDS),
+    'app_request_sql_seconds': ("SQL time per request per view", SECONDS_BOUNDS),
+}
+
+
+class Histogram:
+    def __init__(self, bounds, buckets=None, count=0, total=0.0, maximum=0.0):
+        self.bounds = bounds
+        # the last bucket holds everything above the last bound
+        self.buckets = buckets or [0] * (len(bounds) + 1)
+        self.count = count
+        self.total = total
+        self.maximum = maximum
+
+    def observe(self, value):
+        self.buckets[bisect.bisect_left(self.bounds, value)] += 1
+        self.count += 1
+        self.total += value
+        if value > self.maximum:
+            self.maximum = value
+
+    def merge(self, other):
+        for index, value in enumerate(other.buckets):
+            self.buckets[index] += value
+        self.count += other.count
+        self.total += other.total
+        self.maximum = max(self.maximum, other.maximum)
+
+    def quantile(self, q):
+        if not self.count:
+            return 0.0
+        rank = q * self.count
+        seen = 0
+        for index, value in enumerate(self.buckets):
+            seen += value
+            if seen >= rank:
+                if index < len(self.bounds):
+                    return min(self.bounds[index], self.maximum)
+                return self.maximum
+        return self.maximum
+
+    def to_dict(self):
+        return dict(buckets=list(self.buckets), count=self.count, total=self.total, maximum=self.maximum)
+
+
+class Registry:
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.families = {name: dict() for name in FAMILIES}
+        self.flushing = False
+        # process the flush thread runs in, a forked worker starts its own
+        self.flusher_pid = None
+
+    def observe(self, family, name, value):
+        with self.lock:
+            histogram = self.families[family].get(name)
+            if histogram is None:
+                histogram = self.families[family][name] = Histogram(FAMILIES[family][1])
+            histogram.observe(value)
+        if self.flusher_pid != os.getpid():
+            self.start_flusher()
+
+    def start_flusher(self):
+        """
+        Starts the thread writing the snapshot of this process, once per process
+        """
+        with self.lock:
+            if self.flusher_pid == os.getpid():
+                return
+            self.flusher_pid = os.getpid()
+        threading.Thread(target=self._flush_loop, name="app-metrics-flush", daemon=True).start()
+
+    def _flush_loop(self):
+        while True:
+            time.sleep(settings.APP_METRICS_FLUSH_INTERVAL)
+            self.flush()
+            self.remove_stale_snapshots()
+
+    def to_dict(self):
+        with self.lock:
+            return {family: {name: histogram.to_dict() for name, histogram in histograms.items()}
+                    for family, histograms in self.families.items()}
+
+    def snapshot_path(self, pid=None):
+        return os.path.join(settings.APP_METRICS_DIR, "metrics.{0}.json".format(pid or os.getpid()))
+
+    def flush(self):
+        """
+        Writes the snapshot of this process, one thread at a time
+        """
+        with self.lock:
+            if self.flushing:
+                return
+            self.flushing = True
+        try:
+            data = self.to_dict()
+            os.makedirs(settings.APP_METRICS_DIR, exist_ok=True)
+            path = self.snapshot_path()
+            with open(path + ".tmp", "w") as snapshot:
+                json.dump(data, snapshot)
+            os.replace(path + ".tmp", path)
+        except OSError:
+            pass
+        finally:
+            self.flushing = False
+
+    def other_snapshots(self):
+        """
+        [(path, fresh)] of the snapshots of the other processes, fresh when
+        rewritten within settings.APP_METRICS_SNAPSHOT_MAX_AGE seconds
+        """
+        if not os.path.isdir(settings.APP_METRICS_DIR):
+            return list()
+        own_path = self.snapshot_path()
+        cutoff = time.time() - settings.APP_METRICS_SNAPSHOT_MAX_AGE
+        snapshots = list()
+        for file_name in sorted(os.listdir(settings.APP_METRICS_DIR)):
+            path = os.path.join(settings.APP_METRICS_DIR, file_name)
+            if not file_name.endswith(".json") or path == own_path:
+                continue
+            try:
+                snapshots.append((path, os.path.getmtime(path) >= cutoff))
+            except OSError:
+                continue
+        return snapshots
+
+    def remove_stale_snapshots(self):
+        for path, fresh in self.other_snapshots():
+            if not fresh:
+                try:
+                    os.remove(path)
+                except OSError:
+                    pass
+
+    def merged(self):
+        """
+        Histograms of this process merged with the fresh snapshots of the other processes
+        """
+        families = {family: dict() for family in FAMILIES}
+        snapshots = [self.to_dict()]
+        for path, fresh in self.other_snapshots():
+            if not fresh:
+                continue
+            try:
+                with open(path) as snapshot:
+                    snapshots.append(json.load(snapshot))
+            except (OSError, ValueError):
+                continue
+        for snapshot in snapshots:
+            for family, histograms in snapshot.items():
+                if family not in FAMILIES:
+                    continue
+                bounds = FAMILIES[family][1]
+                for name, values in histograms.items():
+                    if len(values['buckets']) != len(bounds) + 1:
+                        continue
+                    histogram = families[family].setdefault(name, Histogram(bounds))
+                    histogram.merge(Histogram(bounds, **values))
+        return families
+
+
+registry = Registry()
+
+
+@atexit.register
+def _flush_at_exit():
+    if any(registry.families.values()):
+        registry.flush()
+
+
+def observe_function(qualname, seconds):
+    registry.observe('app_function_seconds', qualname, seconds)
+
+
+def observe_request(view_name, seconds, query_count, query_seconds):
+    registry.observe('app_request_seconds', view_name, seconds)
+    registry.observe('app_request_sql_queries', view_name, query_count)
+    registry.observe('app_request_sql_seconds', view_name, query_seconds)
+
+
+class QueryTimer:
+    """
+    connection.execute_wrapper counting the queries of a request and their time
+    """
+    def __init__(self):
+        self.count = 0
+        self.seconds = 0.0
+
+    def __call__(self, execute, sql, params, many, context):
+        start = time.perf_counter()
+        try:
+            return execute(sql, params, many, context)
+        finally:
+            self.count += 1
+            self.seconds += time.perf_counter() - start
+
+
+def _label(value):
+    return str(value).replace('\\', '\\\\').replace('"', '\\"').replace('\n', '\\n')
+
+
+def prometheus_text(families=None):
+    """
+    Histograms as Prometheus summaries plus a _max gauge
+    """
+    families = families if families is not None else registry.merged()
+    lines = list()
+    for family, histograms in families.items():
+        help_text = FAMILIES[family][0]
+        lines.append("# HELP {0} {1}".format(family, help_text))
+        lines.append("# TYPE {0} summary".format(family))
+        for name, histogram in sorted(histograms.items()):
+            label = 'name="{0}"'.format(_label(name))
+            for q in QUANTILES:
+                lines.append('{0}{{{1},quantile="{2}"}} {3:.6g}'.format(family, label, q, histogram.quantile(q)))
+            lines.append('{0}_sum{{{1}}} {2:.6g}'.format(family, label, histogram.total))
+            lines.append('{0}_count{{{1}}} {2}'.format(family, label, histogram.count))
+        lines.append("# HELP {0}_max Maximum of {1}".format(family, help_text[0].lower() + help_text[1:]))
+        lines.append("# TYPE {0}_max gauge".format(family))
+        for name, histogram in sorted(histograms.items()):
+            lines.append('{0}_max{{name="{1}"}} {2:.6g}'.format(family, _label(name), histogram.maximum))
+    return "\n".join(lines) + "\n"
+
+
+def top_report(limit=20, families=None):
+    """
+    Top functions and views by total time, one table per family
+    """
+    families = families if families is not None else registry.merged()
+    lines = list()
+    for family, histograms in families.items():
+        lines.append("")
+        lines.append(family)
+        lines.append("{0:<60} {1:>8} {2:>10} {3:>10} {4:>10} {5:>10} {6:>12}".format(
+            "name", "count", "p50", "p95", "p99", "max", "total"))
+        ranked = sorted(histograms.items(), key=lambda item: item[1].total, reverse=True)[:limit]
+        for name, histogram in ranked:
+            lines.append("{0:<60} {1:>8} {2:>10.4g} {3:>10.4g} {4:>10.4g} {5:>10.4g} {6:>12.4g}".format(
+                name[:60], histogram.count, histogram.quantile(0.5), histogram.quantile(0.95),
+                histogram.quantile(0.99), histogram.maximum, histogram.total))
+    return "\n".join(lines)
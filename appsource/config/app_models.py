@@ -0,0 +1,49 @@
+"""
+Soft Delete Models - managers and indexes of the datamode columns
+
+    Rows are never deleted, datamode marks them 'A' (active), 'I' (inactive)
+    or 'D' (deleted), so nearly every list reads
+
+        Model.objects.exclude(datamode='D').order_by('-updated_on')
+
+    1. ActiveManager spells those filters once, the default manager is
+       otherwise unchanged (deleted rows are still returned by .all()):
+           Model.objects.live().latest_first()      not deleted, newest first
+           Model.objects.active()                   datamode 'A' only
+    2. datamode_indexes(db_table) are the two indexes serving them, given to
+       Meta.indexes of every model with a datamode:
+           <table>_dm_idx      (datamode, updated_on DESC)  active() / filters
+           <table>_live_idx    (updated_on DESC) WHERE NOT datamode = 'D'
+                               a partial index holding only the live rows,
+                               used by live() when ordered by updated_on
+"""
+from django.db import models
+from django.db.models import Q
+
+
+DELETED = 'D'
+ACTIVE = 'A'
+
+# the condition of the partial indexes, the same expression as live()
+LIVE = ~Q(datamode=DELETED)
+
+
+class ActiveQuerySet(models.QuerySet):
+    def live(self):
+        return self.exclude(datamode=DELETED)
+
+    def active(self):
+        return self.filter(datamode=ACTIVE)
+
+    def latest_first(self):
+        return self.order_by('-updated_on')
+
+
+ActiveManager = models.Manager.from_queryset(ActiveQuerySet, 'ActiveManager')
+
+
+def datamode_indexes(db_table):
+    return [
+        models.Index(fields=['datamode', '-updated_on'], name='%s_dm_idx' % db_table),
+        models.Index(fields=['-updated_on'], condition=LIVE, name='%s_live_idx' % db_table),
+    ]
@@ -0,0 +1,205 @@
+"""
+Email Outbox - transactional email queue in the database (mck_master.EmailOutbox)
+
+    1. enqueue() inserts the message in the current transaction, so an email
+       is only ever sent for a committed row (e.g. the Lead of an enquiry)
+       and the request never waits on the mail server
+    2. send_pending() claims a batch of due rows with a conditional update,
+       so several workers never send the same row, and delivers the batch
+       over one connection of settings.OUTBOX_EMAIL_BACKEND
+    3. a failed message is retried with exponential backoff until
+       settings.OUTBOX_MAX_ATTEMPTS, rows left in SENDING by a dead worker
+       are claimed again after settings.OUTBOX_CLAIM_TIMEOUT
+    4. with settings.OUTBOX_SEND_IN_PROCESS every web process starts a daemon
+       thread with its first request (mck_master app config, start_worker),
+       it sends what is due right away (rows left by a restart or a crash),
+       then when woken after each commit and every poll interval; otherwise
+       (or as well) the script_outbox_worker script drains the outbox
+
+    Usage:
+        with transaction.atomic():
+            lead_obj.save()
+            app_outbox.enqueue(subject, body, [lead_obj.email])
+"""
+import os
+import uuid
+import socket
+import threading
+from datetime import timedelta
+from django.conf import settings
+from django.core.mail import EmailMessage, get_connection
+from django.db import close_old_connections, transaction
+from django.db.models import Q
+from django.utils import timezone
+from config import app_logger
+from mck_master.models import EmailOutbox
+
+
+logger = app_logger.createLogger("app_threads")
+
+
+def enqueue(subject, body, to, from_email=None):
+    """
+    Queues an email, delivered once the surrounding transaction commits
+    """
+    if isinstance(to, str):
+        to = [to]
+    outbox = EmailOutbox.objects.create(
+        subject=subject,
+        body=body,
+        from_email=from_email or settings.DEFAULT_FROM_EMAIL,
+        to=",".join(to),
+        next_attempt_on=timezone.now(),
+    )
+    if settings.OUTBOX_SEND_IN_PROCESS:
+        transaction.on_commit(worker.wake)
+    return outbox
+
+
+def retry_delay(attempts):
+    """
+    Backoff before the next attempt: base, 2 x base, 4 x base .. capped
+    """
+    return min(settings.OUTBOX_RETRY_BASE * 2 ** (attempts - 1), settings.OUTBOX_RETRY_MAX)
+
+
+def claim_batch(batch_size=None):
+    """
+    Claims up to batch_size due rows for this worker, returns them
+    """
+    batch_size = batch_size or settings.OUTBOX_BATCH_SIZE
+    now = timezone.now()
+    due = Q(status='PENDING', next_attempt_on__lte=now) | Q(
+        status='SENDING', claimed_on__lt=now - timedelta(seconds=settings.OUTBOX_CLAIM_TIMEOUT))
+    due_ids = list(EmailOutbox.objects.filter(due, datamode='A').order_by(
+        'next_attempt_on', 'id').values_list('id', flat=True)[:batch_size])
+    if not due_ids:
+        return list()
+
+    token = "{0}:{1}:{2}".format(socket.gethostname(), os.getpid(), uuid.uuid4().hex[:12])[:64]
+    # the row is only taken if no other worker claimed it in between
+    EmailOutbox.objects.filter(due, id__in=due_ids).update(
+        status='SENDING', claimed_by=token, claimed_on=now)
+    return list(EmailOutbox.objects.filter(claimed_by=token, status='SENDING').order_by('id'))
+
+
+def _mark_failed(outbox, error):
+    outbox.attempts += 1
+    outbox.last_error = "{0}: {1}".format(type(error).__name__, error)
+    outbox.claimed_by = ""
+    outbox.claimed_on = None
+    if outbox.attempts >= settings.OUTBOX_MAX_ATTEMPTS:
+        outbox.status = 'FAILED'
+        logger.error("Email %s failed after %s attempts: %s", outbox.id, outbox.attempts, outbox.last_error)
+    else:
+        outbox.status = 'PENDING'
+        outbox.next_attempt_on = timezone.now() + timedelta(seconds=retry_delay(outbox.attempts))
+        logger.warning("Email %s attempt %s failed, retrying at %s: %s",
+                       outbox.id, outbox.attempts, outbox.next_attempt_on, outbox.last_error)
+    outbox.save(update_fields=['attempts', 'last_error', 'claimed_by', 'claimed_on', 'status',
+                               'next_attempt_on', 'updated_on'])
+
+
+def _mark_sent(outbox):
+    outbox.attempts += 1
+    outbox.status = 'SENT'
+    outbox.sent_on = timezone.now()
+    outbox.last_error = ""
+    outbox.save(update_fields=['attempts', 'status', 'sent_on', 'last_error', 'updated_on'])
+
+
+def send_batch(batch):
+    """
+    Sends the claimed rows over one connection, returns the number sent
+    """
+    try:
+        connection = get_connection(settings.OUTBOX_EMAIL_BACKEND, fail_silently=False)
+        connection.open()
+    except Exception as e:
+        for outbox in batch:
+            _mark_failed(outbox, e)
+        return 0
+
+    sent = 0
+    try:
+        for outbox in batch:
+            message = EmailMessage(outbox.subject, outbox.body, outbox.from_email,
+                                   outbox.recipients, connection=connection)
+            try:
+                message.send()
+            except Exception as e:
+                _mark_failed(outbox, e)
+                # the server may have dropped us, start the next message on a fresh connection
+                connection.close()
+                try:
+                    connection.open()
+                except Exception:
+                    pass
+                continue
+            _mark_sent(outbox)
+            sent += 1
+    finally:
+        connection.close()
+    return sent
+
+
+def send_pending(batch_size=None, max_batches=None):
+    """
+    Drains the due rows batch by batch, returns the number sent
+    """
+    sent = 0
+    batches = 0
+    while max_batches is None or batches < max_batches:
+        batch = claim_batch(batch_size)
+        if not batch:
+            break
+        sent += send_batch(batch)
+        batches += 1
+    return sent
+
+
+class OutboxWorker:
+    """
+    Daemon thread of the web process sending the outbox, woken after each
+    commit that queued an email and every poll interval otherwise
+    """
+    def __init__(self):
+        self.event = threading.Event()
+        self.lock = threading.Lock()
+        self.thread = None
+        # process the thread was started in, a forked worker starts its own
+        self.pid = None
+
+    def start(self):
+        with self.lock:
+            if self.thread is None or not self.thread.is_alive():
+                self.thread = threading.Thread(target=self.run, name="app-outbox-worker", daemon=True)
+                self.thread.start()
+                self.pid = os.getpid()
+
+    def wake(self):
+        self.start()
+        self.event.set()
+
+    def run(self):
+        while True:
+            self.event.wait(settings.OUTBOX_POLL_INTERVAL)
+            self.event.clear()
+            try:
+                send_pending()
+            except Exception as e:
+                app_logger.exceptionlogs(e)
+            finally:
+                close_old_connections()
+
+
+worker = OutboxWorker()
+
+
+def start_worker(**kwargs):
+    """
+    request_started receiver, starts the worker of the process with its first
+    request and sends the rows already due
+    """
+    if worker.pid != os.getpid():
+        worker.wake()
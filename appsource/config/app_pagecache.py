@@ -0,0 +1,221 @@
+"""
+Page Cache - rendered marketing pages served to anonymous visitors from a cache
+
+    1. cache_page wraps the dispatch of a page view, a GET / HEAD of an
+       anonymous visitor is answered from settings.PAGE_CACHE_ALIAS, keyed by
+       the path and the template version (a hash of every template file,
+       or settings.PAGE_CACHE_VERSION), so a deploy changing a template
+       starts over with fresh pages; the entries read are kept in the
+       process memory for settings.PAGE_CACHE_LOCAL_TIMEOUT seconds
+    2. a page is fresh for settings.PAGE_CACHE_TIMEOUT seconds, then for
+       settings.PAGE_CACHE_STALE_TIMEOUT more it is still served while a
+       worker thread renders it again (stale-while-revalidate)
+    3. ETag / Last-Modified are answered with 304 (If-None-Match,
+       If-Modified-Since), the page is not rendered at all
+    4. the csrf tokens of the forms are cached as a placeholder and filled
+       in per visitor, such pages are private to the browser
+    5. the fragments of the shared includes (header, footer) are cached with
+       {% cache fragment_cache_timeout <name> template_version .. %}, the
+       context_processor gives both variables
+
+    script_page_cache purges every page, or the given paths, from the shared
+    cache; a worker keeps serving the copy in its memory for up to
+    PAGE_CACHE_LOCAL_TIMEOUT seconds and the header / footer fragments
+    (process memory too) until PAGE_FRAGMENT_CACHE_TIMEOUT or a template change.
+
+    Usage:
+        @method_decorator(app_pagecache.cache_page, name='dispatch')
+        class AboutPage(TemplateView):
+"""
+import os
+import re
+import time
+import hashlib
+import threading
+from functools import wraps
+from concurrent.futures import ThreadPoolExecutor
+from django.conf import settings
+from django.core.cache import caches
+from django.db import close_old_connections
+from django.http import HttpResponse
+from django.middleware.csrf import get_token
+from django.template import engines
+from django.utils.cache import get_conditional_response, patch_vary_headers
+from django.utils.http import http_date
+from config import app_logger
+
+
+logger = app_logger.createLogger("app")
+
+CSRF_PLACEHOLDER = "page-cache-csrf-token"
+CSRF_INPUT_RE = re.compile(r'(name="csrfmiddlewaretoken" value=")[^"]*(")')
+
+_template_version = None
+_executor = None
+_executor_lock = threading.Lock()
+
+
+def get_cache():
+    return caches[settings.PAGE_CACHE_ALIAS]
+
+
+def get_entry(key):
+    """
+    The entry from the process memory, read through from the shared cache
+    for settings.PAGE_CACHE_LOCAL_TIMEOUT seconds (a purge shows after it)
+    """
+    local = caches['default'] if settings.PAGE_CACHE_LOCAL_TIMEOUT else None
+    entry = local.get(key) if local is not None else None
+    if entry is None:
+        entry = get_cache().get(key)
+        if entry is not None and local is not None:
+            local.set(key, entry, settings.PAGE_CACHE_LOCAL_TIMEOUT)
+    return entry
+
+
+def template_version():
+    """
+    settings.PAGE_CACHE_VERSION or a hash of the name, size and mtime of every
+    template file, computed once per process
+    """
+    global _template_version
+    if _template_version is None:
+        version = getattr(settings, 'PAGE_CACHE_VERSION', None)
+        if not version:
+            digest = hashlib.md5()
+            for engine in engines.all():
+                for directory in engine.template_dirs:
+                    for root, dirnames, filenames in sorted(os.walk(directory)):
+                        for filename in sorted(filenames):
+                            stat_result = os.stat(os.path.join(root, filename))
+                            digest.update("{0}|{1}|{2}|{3}\n".format(
+                                root, filename, stat_result.st_size, stat_result.st_mtime_ns).encode())
+            version = digest.hexdigest()[:12]
+        _template_version = version
+    return _template_version
+
+
+def page_key(path):
+    return "page:{0}:{1}".format(template_version(), hashlib.md5(path.encode()).hexdigest())
+
+
+def context_processor(request):
+    return dict(template_version=template_version(),
+                fragment_cache_timeout=settings.PAGE_FRAGMENT_CACHE_TIMEOUT)
+
+
+def is_cacheable(request):
+    return (settings.PAGE_CACHE_ENABLED and request.method in ("GET", "HEAD")
+            and not request.user.is_authenticated)
+
+
+def _render_entry(view, request, args, kwargs):
+    """
+    Renders the page, returns the cache entry or None for the responses not
+    to be cached, with the response
+    """
+    response = view(request, *args, **kwargs)
+    if hasattr(response, 'render') and callable(response.render):
+        response = response.render()
+    if response.status_code != 200 or response.streaming or response.cookies:
+        return None, response
+    content = response.content.decode(response.charset)
+    content, tokens = CSRF_INPUT_RE.subn(r"\g<1>{0}\g<2>".format(CSRF_PLACEHOLDER), content)
+    content = content.encode(response.charset)
+    now = time.time()
+    entry = dict(content=content, content_type=response['Content-Type'], csrf=bool(tokens),
+                 etag='"{0}"'.format(hashlib.md5(content).hexdigest()), modified=now, created=now)
+    return entry, response
+
+
+def store(key, entry):
+    previous = get_cache().get(key)
+    if previous and previous['etag'] == entry['etag']:
+        # same content, clients keep their copy
+        entry['modified'] = previous['modified']
+    get_cache().set(key, entry, settings.PAGE_CACHE_TIMEOUT + settings.PAGE_CACHE_STALE_TIMEOUT)
+    if settings.PAGE_CACHE_LOCAL_TIMEOUT:
+        caches['default'].set(key, entry, settings.PAGE_CACHE_LOCAL_TIMEOUT)
+
+
+def _refresh(view, request, args, kwargs, key):
+    try:
+        entry, response = _render_entry(view, request, args, kwargs)
+        if entry is not None:
+            store(key, entry)
+    except Exception as e:
+        app_logger.exceptionlogs(e)
+    finally:
+        get_cache().delete(key + ":refresh")
+        close_old_connections()
+
+
+def get_executor():
+    global _executor
+    with _executor_lock:
+        if _executor is None:
+            _executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix="app-page-cache")
+        return _executor
+
+
+def schedule_refresh(view, request, args, kwargs, key):
+    # one refresh per page at a time, the others keep serving the stale entry
+    if get_cache().add(key + ":refresh", 1, settings.PAGE_CACHE_STALE_TIMEOUT):
+        clone = request.__class__.__new__(request.__class__)
+        clone.__dict__.update(request.__dict__)
+        clone.META = dict(request.META)
+        get_executor().submit(_refresh, view, clone, args, kwargs, key)
+
+
+def respond(request, entry, state):
+    response = get_conditional_response(request, etag=entry['etag'], last_modified=int(entry['modified']))
+    if response is None:
+        content = entry['content']
+        if entry['csrf']:
+            content = content.replace(CSRF_PLACEHOLDER.encode(), get_token(request).encode())
+        response = HttpResponse(content, content_type=entry['content_type'])
+    response["ETag"] = entry['etag']
+    response["Last-Modified"] = http_date(entry['modified'])
+    if entry['csrf']:
+        response["Cache-Control"] = "private, no-cache"
+    else:
+        response["Cache-Control"] = "public, max-age={0}, stale-while-revalidate={1}".format(
+            settings.PAGE_CACHE_BROWSER_MAX_AGE, settings.PAGE_CACHE_STALE_TIMEOUT)
+    response["X-Page-Cache"] = state
+    patch_vary_headers(response, ("Cookie",))
+    return response
+
+
+def cache_page(view):
+    """
+    Serves the view from the page cache to anonymous visitors
+    """
+    @wraps(view)
+    def wrapper(request, *args, **kwargs):
+        if not is_cacheable(request):
+            return view(request, *args, **kwargs)
+        key = page_key(request.path)
+        entry = get_entry(key)
+        if entry is None:
+            entry, response = _render_entry(view, request, args, kwargs)
+            if entry is None:
+                return response
+            store(key, entry)
+            return respond(request, entry, "MISS")
+        if time.time() - entry['created'] > settings.PAGE_CACHE_TIMEOUT:
+            schedule_refresh(view, request, args, kwargs, key)
+            return respond(request, entry, "STALE")
+        return respond(request, entry, "HIT")
+    return wrapper
+
+
+def purge(paths=None):
+    """
+    Drops the cached pages of the paths, every page without paths, the
+    workers see it after PAGE_CACHE_LOCAL_TIMEOUT (their copy in memory)
+    """
+    if not paths:
+        get_cache().clear()
+        return
+    for path in paths:
+        get_cache().delete(page_key(path))
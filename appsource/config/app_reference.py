@@ -0,0 +1,192 @@
+"""
+Reference Data - the small lookup tables read from an in-process snapshot
+
+    1. REFERENCE_MODELS lists the tables and the columns kept, a table is
+       loaded once per process into a Snapshot, an immutable tuple of rows
+       (named tuples, str() is the name like the models) with read only
+       indexes by id and by parent (the state of a city ..)
+    2. the version of a table is a stamp in the cache shared by every
+       process (settings.REFERENCE_CACHE_ALIAS), a new stamp is written once
+       a save or delete of the table is committed; a process compares it with
+       its snapshot at most once every settings.REFERENCE_CHECK_INTERVAL
+       seconds and reloads the table on that read, the process that saved
+       reloads on its next read
+    3. bind(field) renders the options of a ModelChoiceField from the
+       snapshot, the value submitted is still validated against the table
+    4. queryset.update() / bulk_create() / loaddata do not send the signals,
+       script_reference_data writes new stamps
+
+    Usage:
+        app_reference.get('mck_master.SubCategory').children(category_id)
+        app_reference.bind(self.fields['category'])
+"""
+import time
+import uuid
+from collections import defaultdict, namedtuple
+from types import MappingProxyType
+from django.apps import apps
+from django.conf import settings
+from django.core.cache import caches
+from django.db import transaction
+from django.db.models.signals import post_save, post_delete
+from django.forms.models import ModelChoiceIterator, ModelChoiceIteratorValue
+
+
+# label: columns kept, the parent column (or None) last
+REFERENCE_MODELS = {
+    'mck_master.Country': (('id', 'name', 'iso2', 'iso3', 'telephone_calling_code', 'datamode'), None),
+    'mck_master.State': (('id', 'name', 'code', 'country_id', 'datamode'), 'country_id'),
+    'mck_master.City': (('id', 'name', 'code', 'state_id', 'datamode'), 'state_id'),
+    'mck_master.Category': (('id', 'name', 'image', 'datamode'), None),
+    'mck_master.SubCategory': (('id', 'name', 'image', 'category_id', 'datamode'), 'category_id'),
+    'squarebox.PropertyType': (('id', 'name', 'datamode'), None),
+}
+
+_snapshots = dict()
+_checked = dict()
+_row_classes = dict()
+
+
+def _pk(value):
+    try:
+        return int(value)
+    except (TypeError, ValueError):
+        return None
+
+
+def _row_class(label):
+    if label not in _row_classes:
+        fields, parent = REFERENCE_MODELS[label]
+        base = namedtuple(label.split('.')[-1] + 'Row', fields)
+        _row_classes[label] = type(base.__name__, (base,), dict(__slots__=(), __str__=lambda row: str(row.name)))
+    return _row_classes[label]
+
+
+class Snapshot:
+    """
+    The rows of a table at a version, ordered by id
+    """
+    __slots__ = ('label', 'version', 'rows', '_by_id', '_by_parent')
+
+    def __init__(self, label, version, rows):
+        parent = REFERENCE_MODELS[label][1]
+        by_parent = defaultdict(list)
+        if parent:
+            for row in rows:
+                by_parent[getattr(row, parent)].append(row)
+        self.label = label
+        self.version = version
+        self.rows = tuple(rows)
+        self._by_id = MappingProxyType({row.id: row for row in rows})
+        self._by_parent = MappingProxyType({key: tuple(value) for key, value in by_parent.items()})
+
+    def __iter__(self):
+        return iter(self.rows)
+
+    def __len__(self):
+        return len(self.rows)
+
+    def get(self, pk):
+        return self._by_id.get(_pk(pk))
+
+    def children(self, parent_id):
+        return self._by_parent.get(_pk(parent_id), ())
+
+    def live(self):
+        return tuple(row for row in self.rows if row.datamode != 'D')
+
+
+def get_cache():
+    return caches[settings.REFERENCE_CACHE_ALIAS]
+
+
+def _version_key(label):
+    return "reference_version:{0}".format(label.lower())
+
+
+def get_version(label):
+    """
+    Stamp of the current data of the table, created on first use
+    """
+    key = _version_key(label)
+    version = get_cache().get(key)
+    if version is None:
+        get_cache().add(key, uuid.uuid4().hex, None)
+        version = get_cache().get(key)
+    return version
+
+
+def bump(label):
+    # a new stamp rather than incr(), two processes saving at once cannot
+    # write the same version
+    get_cache().set(_version_key(label), uuid.uuid4().hex, None)
+    _snapshots.pop(label, None)
+
+
+def load(label, version):
+    model = apps.get_model(label)
+    fields, parent = REFERENCE_MODELS[label]
+    row_class = _row_class(label)
+    rows = [row_class(*values) for values in model._base_manager.order_by('pk').values_list(*fields)]
+    return Snapshot(label, version, rows)
+
+
+def get(label):
+    """
+    The snapshot of the table, checked against the shared stamp at most once
+    every settings.REFERENCE_CHECK_INTERVAL seconds
+    """
+    snapshot = _snapshots.get(label)
+    now = time.monotonic()
+    if snapshot is not None and now - _checked.get(label, 0) < settings.REFERENCE_CHECK_INTERVAL:
+        return snapshot
+    # the stamp is read before the rows, a save meanwhile is seen on the next check
+    version = get_version(label)
+    _checked[label] = now
+    if snapshot is None or snapshot.version != version:
+        snapshot = load(label, version)
+        _snapshots[label] = snapshot
+    return snapshot
+
+
+def bump_on_commit(sender, **kwargs):
+    label = sender._meta.label
+    transaction.on_commit(lambda: bump(label))
+
+
+for _label in REFERENCE_MODELS:
+    post_save.connect(bump_on_commit, sender=_label, dispatch_uid="app_reference_save_%s" % _label)
+    post_delete.connect(bump_on_commit, sender=_label, dispatch_uid="app_reference_delete_%s" % _label)
+
+
+class SnapshotChoiceIterator(ModelChoiceIterator):
+    """
+    Options of a ModelChoiceField read from the snapshot of its model
+    """
+    def snapshot(self):
+        return get(self.queryset.model._meta.label)
+
+    def __iter__(self):
+        if self.field.empty_label is not None:
+            yield ("", self.field.empty_label)
+        for row in self.snapshot():
+            yield self.choice(row)
+
+    def __len__(self):
+        return len(self.snapshot()) + (1 if self.field.empty_label is not None else 0)
+
+    def __bool__(self):
+        return self.field.empty_label is not None or bool(len(self.snapshot()))
+
+    def choice(self, row):
+        return ModelChoiceIteratorValue(self.field.prepare_value(row.id), row), self.field.label_from_instance(row)
+
+
+def bind(field):
+    """
+    Renders the options of the ModelChoiceField (every row of its model) from
+    the snapshot
+    """
+    field.iterator = SnapshotChoiceIterator
+    field.widget.choices = field.choices
+    return field
@@ -0,0 +1,154 @@
+"""
+Read Replica - website reads on the "replica" database alias
+
+    1. ReplicaRouter (settings.DATABASE_ROUTERS) sends the reads of the
+       DATABASE_REPLICA_APPS models to "replica" while a request runs one of
+       settings.DATABASE_REPLICA_VIEWS with GET / HEAD, everything else
+       (writes, admin console, sessions and auth) stays on "default"
+    2. a request writing one of those models pins its session to "default"
+       for settings.DATABASE_REPLICA_STICKY_SECONDS, so a user reads their own
+       writes even while the replica lags (mck_auth.middleware.ReplicaMiddleware)
+    3. the replica is a copy of the SQLite file refreshed with the online
+       backup API (sync_replica) every settings.DATABASE_REPLICA_SYNC_INTERVAL
+       seconds, by a thread of the web process or script_replica_sync, a
+       stand-in for real replication the router does not need to know about;
+       the copy is written aside and renamed over the replica, under a lock
+       file so one process of the host syncs at a time and the others skip
+
+    The "replica" alias only exists with settings.DATABASE_REPLICA_ENABLED,
+    without it every read goes to "default".
+"""
+import os
+import time
+import sqlite3
+import tempfile
+import threading
+from contextvars import ContextVar
+from django.conf import settings
+from config import app_logger
+
+
+logger = app_logger.createLogger("app_threads")
+
+REPLICA = "replica"
+SESSION_PIN_KEY = "_replica_pinned_until"
+
+# per request state, set by mck_auth.middleware.ReplicaMiddleware
+use_replica = ContextVar("use_replica", default=False)
+wrote = ContextVar("replica_wrote", default=None)
+
+
+def is_enabled():
+    return REPLICA in settings.DATABASES
+
+
+def is_replicated(model):
+    return model._meta.app_label in settings.DATABASE_REPLICA_APPS
+
+
+class ReplicaRouter:
+    def db_for_read(self, model, **hints):
+        if use_replica.get() and is_replicated(model):
+            return REPLICA
+        return "default"
+
+    def db_for_write(self, model, **hints):
+        state = wrote.get()
+        if state is not None and is_replicated(model):
+            state.append(model._meta.label)
+        return "default"
+
+    def allow_relation(self, obj1, obj2, **hints):
+        return True
+
+    def allow_migrate(self, db, app_label, model_name=None, **hints):
+        # the replica is a copy of default, never migrated on its own
+        return db != REPLICA
+
+
+def is_pinned(request):
+    session = getattr(request, "session", None)
+    return bool(session) and session.get(SESSION_PIN_KEY, 0) > time.time()
+
+
+def pin(request):
+    session = getattr(request, "session", None)
+    if session is not None:
+        session[SESSION_PIN_KEY] = time.time() + settings.DATABASE_REPLICA_STICKY_SECONDS
+
+
+def sync_replica(wait=False):
+    """
+    Copies the default database into the replica file with the SQLite online
+    backup API, into a temporary file renamed over the replica so its readers
+    keep the previous copy until they reconnect.
+
+    Skipped while another process syncs, or when the replica is younger than
+    DATABASE_REPLICA_SYNC_INTERVAL, unless wait (then it waits for the lock
+    and always syncs). Returns whether it synced
+    """
+    try:
+        import fcntl
+    except ImportError:
+        # no flock outside POSIX, every process syncs on its own
+        fcntl = None
+    source_path = settings.DATABASES["default"]["NAME"]
+    target_path = settings.DATABASES[REPLICA]["NAME"]
+    with open(target_path + ".lock", "a") as lock_file:
+        if fcntl is not None:
+            try:
+                fcntl.flock(lock_file, fcntl.LOCK_EX if wait else fcntl.LOCK_EX | fcntl.LOCK_NB)
+            except BlockingIOError:
+                return False
+        if not wait and os.path.exists(target_path) \
+                and time.time() - os.path.getmtime(target_path) < settings.DATABASE_REPLICA_SYNC_INTERVAL:
+            return False
+        start = time.perf_counter()
+        fd, temp_path = tempfile.mkstemp(dir=os.path.dirname(target_path) or ".", prefix=".replica-")
+        os.close(fd)
+        try:
+            source = sqlite3.connect(source_path, timeout=20)
+            try:
+                target = sqlite3.connect(temp_path)
+                try:
+                    source.backup(target)
+                    # a rollback journal, no -wal file is left next to the replica
+                    target.execute("PRAGMA journal_mode=DELETE")
+                finally:
+                    target.close()
+            finally:
+                source.close()
+            os.replace(temp_path, target_path)
+        except Exception:
+            if os.path.exists(temp_path):
+                os.remove(temp_path)
+            raise
+    logger.debug("Replica %s synced in %.3fs", os.path.basename(target_path), time.perf_counter() - start)
+    return True
+
+
+class ReplicaSync:
+    """
+    Daemon thread of the web process refreshing the replica, every process
+    runs one, sync_replica lets one of them copy at a time
+    """
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.thread = None
+
+    def start(self):
+        with self.lock:
+            if self.thread is None or not self.thread.is_alive():
+                self.thread = threading.Thread(target=self.run, name="app-replica-sync", daemon=True)
+                self.thread.start()
+
+    def run(self):
+        while True:
+            try:
+                sync_replica()
+            except Exception as e:
+                app_logger.exceptionlogs(e)
+            time.sleep(settings.DATABASE_REPLICA_SYNC_INTERVAL)
+
+
+replica_sync = ReplicaSync()
@@ -0,0 +1,209 @@
+"""
+Row Renderer - DataTables rows from the build_table column definitions
+
+    The column dicts of mck_auth.build_table drive the rendering, besides
+    display_name / column_name a column can carry:
+
+        value       ORM lookup shown in the cell, e.g. "country__name"
+                    (defaults to the column_name field, the id for relations)
+        template    format string of the cell, its placeholders are ORM lookups
+                    of the row, "pk" or one of the urls given to the renderer
+        empty       text shown instead of the template when a lookup is empty
+        actions     "edit" on the datamode column for tables without the
+                    activate / inactivate link (the status is always green)
+
+    Only the needed columns are fetched with .values(), every url is reversed
+    once per draw and the cell templates are compiled once per column, so a
+    row is a handful of dict lookups and str.format calls.
+
+    Usage:
+        renderer = app_rows.RowRenderer(queryset, table_data, edit_url='squarebox:property_update')
+        qs, total_records, total_display_records = app_utils.method_for_datatable_operations(
+            request, renderer.queryset)
+        final_data = renderer.render(qs)
+"""
+import string
+from django.core.exceptions import FieldDoesNotExist
+from django.db.models import FileField
+from django.urls import reverse
+from phonenumber_field.modelfields import PhoneNumberField
+from phonenumber_field.phonenumber import PhoneNumber
+
+
+# stands in for the object id while reversing, the url is then split around it
+URL_ID_PLACEHOLDER = 987654321
+
+# (status cell, action cell) of the datamode column, per actions mode and active flag
+ACTION_TEMPLATES = {
+    'status': {
+        True: ('<div class="text-success">{status}</div>',
+               '<div class="text-end"><a href="{edit_url}" class="text-primary pe-2 ps-2">Edit</a> | <a href="javascript:void()" class="text-danger ps-2" onclick="delete_object({pk})">Inactivate</a></div>'),
+        False: ('<div class="text-danger">{status}</div>',
+                '<div class="text-end"><a href="{edit_url}" class="text-primary pe-2 ps-2">Edit</a> | <a href="javascript:void()" class="text-success ps-2" onclick="delete_object({pk})">Activate</a></div>'),
+    },
+    'edit': {
+        True: ('<div class="text-success">{status}</div>',
+               '<div class="text-end"><a href="{edit_url}" class="text-primary pe-2 ps-2">Edit</a></div>'),
+        False: ('<div class="text-success">{status}</div>',
+                '<div class="text-end"><a href="{edit_url}" class="text-primary pe-2 ps-2">Edit</a></div>'),
+    },
+}
+
+
+def url_parts(url_name):
+    """
+    (prefix, suffix) of an url taking the object id, reversed once
+    """
+    url = reverse(url_name, args=[URL_ID_PLACEHOLDER])
+    prefix, suffix = url.rsplit(str(URL_ID_PLACEHOLDER), 1)
+    return prefix, suffix
+
+
+def resolve_field(model, lookup):
+    """
+    Model field at the end of an ORM lookup, None when it is not a field
+    """
+    if lookup == 'pk':
+        return model._meta.pk
+    field = None
+    for part in lookup.split('__'):
+        if field is not None:
+            if not field.is_relation:
+                return None
+            model = field.related_model
+        try:
+            field = model._meta.get_field(part)
+        except FieldDoesNotExist:
+            return None
+        if field.many_to_many or field.one_to_many or not field.concrete:
+            return None
+    return field
+
+
+def _phone_number(value):
+    return value.national_number if isinstance(value, PhoneNumber) else value
+
+
+def converter(field):
+    """
+    Display conversion of a fetched value, None when the raw value is shown
+    """
+    if isinstance(field, PhoneNumberField):
+        return _phone_number
+    if isinstance(field, FileField):
+        storage = field.storage
+        return lambda value: storage.url(value) if value else ""
+    return None
+
+
+class RowRenderer:
+    """
+    Compiles the table columns once and renders the fetched rows
+    """
+    def __init__(self, queryset, table_data, edit_url=None, **urls):
+        self.model = queryset.model
+        self.pk_name = self.model._meta.pk.attname
+        self.urls = dict()
+        for name, url_name in dict(urls, edit_url=edit_url).items():
+            if url_name:
+                self.urls[name] = url_parts(url_name)
+
+        self.lookups = [self.pk_name]
+        self.converters = dict()
+        self.cells = [self.compile_column(column) for column in table_data['columns']]
+
+        # ordering keys are fetched too, the keyset pagination seeks on them
+        for term in queryset.query.order_by:
+            if isinstance(term, str):
+                self.fetch(term.lstrip('-'))
+        self.queryset = queryset.values(*self.lookups)
+
+    def fetch(self, lookup):
+        """
+        Adds the lookup to the fetched columns, returns False if it is not a field
+        """
+        if lookup == 'pk':
+            return True
+        field = resolve_field(self.model, lookup)
+        if field is None:
+            return False
+        if lookup not in self.lookups:
+            self.lookups.append(lookup)
+            convert = converter(field)
+            if convert is not None:
+                self.converters[lookup] = convert
+        return True
+
+    def row_value(self, row, lookup):
+        if lookup == 'pk':
+            return row[self.pk_name]
+        convert = self.converters.get(lookup)
+        if convert is not None:
+            return convert(row[lookup])
+        return row[lookup]
+
+    def row_url(self, row, name):
+        prefix, suffix = self.urls[name]
+        return "{0}{1}{2}".format(prefix, row[self.pk_name], suffix)
+
+    def compile_template(self, template):
+        """
+        Returns (format string, row lookups, url names) of a cell template
+        """
+        lookups, url_names = list(), list()
+        for literal, name, format_spec, conversion in string.Formatter().parse(template):
+            if not name:
+                continue
+            if name in self.urls:
+                url_names.append(name)
+            elif self.fetch(name):
+                lookups.append(name)
+            else:
+                raise ValueError("Unknown placeholder {0} in {1} template".format(name, self.model._meta.label))
+        return template, lookups, url_names
+
+    def compile_column(self, column):
+        """
+        Callable returning the cells of the column for a row
+        """
+        column_name = column['column_name']
+
+        if column_name == "datamode":
+            self.fetch('datamode')
+            templates = ACTION_TEMPLATES[column.get('actions', 'status')]
+            choices = dict(self.model._meta.get_field('datamode').flatchoices)
+
+            def cell(row):
+                datamode = row['datamode']
+                status, action = templates[datamode == "A"]
+                return (status.format(status=choices.get(datamode, datamode)),
+                        action.format(edit_url=self.row_url(row, 'edit_url'), pk=row[self.pk_name]))
+            return cell
+
+        if column.get('template'):
+            template, lookups, url_names = self.compile_template(column['template'])
+            empty = column.get('empty')
+
+            def cell(row):
+                values = {lookup: self.row_value(row, lookup) for lookup in lookups}
+                if empty is not None and not all(values.values()):
+                    return (empty,)
+                for name in url_names:
+                    values[name] = self.row_url(row, name)
+                return (template.format(**values),)
+            return cell
+
+        lookup = column.get('value') or column_name
+        if not self.fetch(lookup):
+            return lambda row: ("-",)
+        return lambda row: (self.row_value(row, lookup),)
+
+    def render(self, rows):
+        final_data = list()
+        cells = self.cells
+        for row in rows:
+            data = list()
+            for cell in cells:
+                data.extend(cell(row))
+            final_data.append(data)
+        return final_data
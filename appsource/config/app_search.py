@@ -0,0 +1,248 @@
+"""
+Full Text Search - pluggable search backends
+
+    settings.SEARCH_INDEXES lists the indexed fields per model, the backend is
+    taken from settings.SEARCH_BACKEND or picked from the database vendor:
+
+        sqlite      SQLite FTS5 external content table per model, kept in sync
+                    by triggers (see SqliteFTS5SearchBackend.install)
+        others      icontains fallback, register a tsvector backend for
+                    postgresql in BACKENDS when the project moves to it
+
+    The index matches words by prefix, a term without words or looking like
+    a phone / number fragment (searched inside the stored values, e.g. the
+    E.164 phones) is matched with icontains instead, see is_indexable.
+
+    Usage:
+        qs = app_search.search(Property.objects.all(), "vellore villa")
+        qs = app_search.search(qs, city, fields=['city'])
+        qs = qs.filter(app_search.search_q(Lead, term) | Q(agent__name__icontains=term))
+"""
+import re
+from django.apps import apps
+from django.conf import settings
+from django.db import connection as default_connection
+from django.db.models import F, Q
+from django.db.models.expressions import RawSQL
+from django.utils.module_loading import import_string
+
+
+BACKENDS = {
+    'sqlite': 'config.app_search.SqliteFTS5SearchBackend',
+}
+DEFAULT_BACKEND = 'config.app_search.IContainsSearchBackend'
+
+# digits and the separators of phone numbers, amounts, zip codes ..
+NUMBER_FRAGMENT_RE = re.compile(r"^[\d\s()+\-./,]+$")
+
+
+def icontains_q(fields, term):
+    q = Q()
+    for field in fields:
+        q |= Q(**{'{0}__icontains'.format(field): term})
+    return q
+
+
+class BaseSearchBackend:
+    """
+    Interface of a search backend
+    """
+    def __init__(self, connection):
+        self.connection = connection
+
+    def install(self, schema_editor, model, fields):
+        """Create the index structures (called from migrations)"""
+        pass
+
+    def uninstall(self, schema_editor, model, fields):
+        """Drop the index structures (called from migrations)"""
+        pass
+
+    def rebuild(self, model, fields):
+        """Re-index every row of the model"""
+        pass
+
+    def search_q(self, model, term, fields):
+        """Q of the rows matching the term"""
+        raise NotImplementedError
+
+    def rank(self, qs, term, fields):
+        """The queryset best matches first"""
+        return qs
+
+    def search(self, qs, term, fields, ranked=True):
+        """Filter the queryset on the term, best matches first when ranked"""
+        qs = qs.filter(self.search_q(qs.model, term, fields))
+        if ranked:
+            qs = self.rank(qs, term, fields)
+        return qs
+
+
+class IContainsSearchBackend(BaseSearchBackend):
+    """
+    OR-ed icontains lookups, used when the database has no full text index
+    """
+    def search_q(self, model, term, fields):
+        return icontains_q(fields, term)
+
+
+class SqliteFTS5SearchBackend(BaseSearchBackend):
+    """
+    External content FTS5 table `<db_table>_fts` holding the indexed columns,
+    the rowid is the primary key of the content table.
+    """
+    def index_table(self, model):
+        return "{0}_fts".format(model._meta.db_table)
+
+    def is_available(self):
+        with self.connection.cursor() as cursor:
+            cursor.execute("PRAGMA compile_options")
+            return 'ENABLE_FTS5' in [row[0] for row in cursor.fetchall()]
+
+    def install(self, schema_editor, model, fields):
+        if not self.is_available():
+            return
+        qn = schema_editor.quote_name
+        table = model._meta.db_table
+        index_table = self.index_table(model)
+        pk = model._meta.pk.column
+        columns = [model._meta.get_field(field).column for field in fields]
+        column_list = ", ".join(qn(column) for column in columns)
+        new_values = ", ".join("new.{0}".format(qn(column)) for column in columns)
+        old_values = ", ".join("old.{0}".format(qn(column)) for column in columns)
+        delete_sql = "INSERT INTO {0}({0}, rowid, {1}) VALUES ('delete', old.{2}, {3});".format(
+            qn(index_table), column_list, qn(pk), old_values)
+        insert_sql = "INSERT INTO {0}(rowid, {1}) VALUES (new.{2}, {3});".format(
+            qn(index_table), column_list, qn(pk), new_values)
+
+        schema_editor.execute(
+            "CREATE VIRTUAL TABLE {0} USING fts5({1}, content={2}, content_rowid={3}, "
+            "tokenize='unicode61 remove_diacritics 2')".format(
+                qn(index_table), column_list, qn(table), qn(pk)))
+        schema_editor.execute(
+            "CREATE TRIGGER {0} AFTER INSERT ON {1} BEGIN {2} END".format(
+                qn(index_table + "_ai"), qn(table), insert_sql))
+        schema_editor.execute(
+            "CREATE TRIGGER {0} AFTER DELETE ON {1} BEGIN {2} END".format(
+                qn(index_table + "_ad"), qn(table), delete_sql))
+        schema_editor.execute(
+            "CREATE TRIGGER {0} AFTER UPDATE OF {1} ON {2} BEGIN {3} {4} END".format(
+                qn(index_table + "_au"), column_list, qn(table), delete_sql, insert_sql))
+        schema_editor.execute("INSERT INTO {0}({0}) VALUES ('rebuild')".format(qn(index_table)))
+
+    def uninstall(self, schema_editor, model, fields):
+        qn = schema_editor.quote_name
+        index_table = self.index_table(model)
+        for suffix in ("_ai", "_ad", "_au"):
+            schema_editor.execute("DROP TRIGGER IF EXISTS {0}".format(qn(index_table + suffix)))
+        schema_editor.execute("DROP TABLE IF EXISTS {0}".format(qn(index_table)))
+
+    def rebuild(self, model, fields):
+        qn = self.connection.ops.quote_name
+        with self.connection.cursor() as cursor:
+            cursor.execute("INSERT INTO {0}({0}) VALUES ('rebuild')".format(qn(self.index_table(model))))
+
+    def match_expression(self, term, columns=None, all_columns=None):
+        """
+        Every word of the term as a prefix query, limited to the given columns
+        """
+        tokens = re.findall(r"\w+", term or "")
+        if not tokens:
+            return None
+        expression = " AND ".join('"{0}"*'.format(token) for token in tokens)
+        if columns and set(columns) != set(all_columns or []):
+            expression = "{{{0}}} : ({1})".format(" ".join(columns), expression)
+        return expression
+
+    def _match(self, model, term, fields):
+        columns = [model._meta.get_field(field).column for field in fields]
+        all_columns = [model._meta.get_field(field).column for field in indexed_fields(model)]
+        return self.match_expression(term, columns, all_columns)
+
+    def search_q(self, model, term, fields):
+        match = self._match(model, term, fields)
+        if not match:
+            return icontains_q(fields, term)
+        index_table = self.connection.ops.quote_name(self.index_table(model))
+        return Q(pk__in=RawSQL("SELECT rowid FROM {0} WHERE {0} MATCH %s".format(index_table), (match,)))
+
+    def rank(self, qs, term, fields):
+        model = qs.model
+        match = self._match(model, term, fields)
+        if not match:
+            return qs
+        qn = self.connection.ops.quote_name
+        index_table = qn(self.index_table(model))
+        # rows matched by other lookups OR-ed with search_q have no rank, last
+        qs = qs.annotate(search_rank=RawSQL(
+            "SELECT rank FROM {0} WHERE {0} MATCH %s AND rowid = {1}.{2}".format(
+                index_table, qn(model._meta.db_table), qn(model._meta.pk.column)), (match,)))
+        return qs.order_by(F('search_rank').asc(nulls_last=True))
+
+
+_backends = dict()
+
+
+def get_backend(connection=None):
+    connection = connection or default_connection
+    if connection.alias not in _backends:
+        path = getattr(settings, 'SEARCH_BACKEND', None) or BACKENDS.get(connection.vendor, DEFAULT_BACKEND)
+        backend = import_string(path)(connection)
+        if hasattr(backend, 'is_available') and not backend.is_available():
+            backend = import_string(DEFAULT_BACKEND)(connection)
+        _backends[connection.alias] = backend
+    return _backends[connection.alias]
+
+
+def indexed_fields(model):
+    return settings.SEARCH_INDEXES.get(model._meta.label, list())
+
+
+def is_indexed(model):
+    return bool(indexed_fields(model))
+
+
+def is_indexable(term):
+    """
+    Whether the index can answer the term, it has words and is not a phone or
+    number fragment
+    """
+    term = (term or "").strip()
+    return bool(re.search(r"\w", term)) and not NUMBER_FRAGMENT_RE.match(term)
+
+
+def search_q(model, term, fields=None):
+    """
+    Q of the rows of an indexed model matching the term, to OR with other lookups
+    """
+    fields = fields or indexed_fields(model)
+    if not is_indexable(term):
+        return icontains_q(fields, term)
+    return get_backend().search_q(model, term, fields)
+
+
+def rank(qs, term, fields=None):
+    """
+    The queryset best matches of the term first (search_q rows first)
+    """
+    if not is_indexable(term):
+        return qs
+    return get_backend().rank(qs, term, fields or indexed_fields(qs.model))
+
+
+def search(qs, term, fields=None, ranked=True):
+    """
+    Full text search on an indexed model, fields defaults to every indexed field
+    """
+    qs = qs.filter(search_q(qs.model, term, fields))
+    if ranked:
+        qs = rank(qs, term, fields)
+    return qs
+
+
+def rebuild(model_label=None):
+    for label in settings.SEARCH_INDEXES:
+        if model_label and label != model_label:
+            continue
+        model = apps.get_model(label)
+        get_backend().rebuild(model, indexed_fields(model))
@@ -1,98 +1,223 @@
 """
 SEO - mck P112 App
+
+    1. PAGE_TAGS holds the title / description / keywords of the pages,
+       active mck_master.PageSeo rows override them or add pages
+    2. both are compiled once per process into {page key: page_kwargs}, so a
+       lookup is a dict access; the registry version is a stamp in the cache
+       shared by every process (settings.SEO_VERSION_CACHE_ALIAS), a save /
+       delete of a PageSeo row writes a new one once committed and every
+       worker compiles again on its next lookup, settings.SEO_REGISTRY_TIMEOUT
+       is the fallback for the writes without signals; the receivers are
+       connected by the mck_master app config
+    3. property_tags builds the tags of a property page from its fields
+    4. PageTagsMixin looks the tags up per request, for the views configured
+       in a URLconf (no query while the URLconf is imported)
 """
+import time
+import uuid
 from django.conf import settings
+from django.core.cache import caches
+from django.db import DatabaseError, transaction
+from django.db.models.signals import post_save, post_delete
+from django.dispatch import receiver
+from config import app_logger
+from mck_master.models import PageSeo
+
+
+logger = app_logger.createLogger("app")
+
+DEFAULT_TAGS = dict(
+    title="Total Inspection Services",
+    description="Total Inspection Services",
+    keywords="""Total Inspection Services""",
+)
+
+PAGE_TAGS = {
+    "error_404": dict(
+        title="Page Not Found Error",
+        description="Page Not Found Error",
+        keywords="Page Not Found Error",
+    ),
+    "error_500": dict(
+        title="Internal Server Error",
+        description="Internal Server Error",
+        keywords="Internal Server Error",
+    ),
+    "downtime": dict(
+        title="Downtime",
+        description="Downtime",
+        keywords="Downtime",
+    ),
+    "privacy": dict(
+        title="Privacy Policy",
+        description="Privacy Policy of sk.com company website",
+        keywords="Privacy Policy,",
+    ),
+    "termsofuse": dict(
+        title="Terms of Use",
+        description="Terms of Use",
+        keywords="Terms of Use",
+    ),
+    "home_page": dict(
+        title="Building Inspection Services in Wisconsin | mck",
+        description="Get reliable building inspection services and zoning services in South Central Wisconsin with Total Inspection Services. Connect with our building inspectors!",
+        keywords="building inspection services",
+    ),
+    "company_page": dict(
+        title="Building Inspection & Zoning in Wisconsin | About TIS",
+        description="Total Inspection Services offers expert building inspection & zoning services in South Central Wisconsin. Book a building inspection now!",
+        keywords="building inspection and zoning services",
+    ),
+    "service_page": dict(
+        title="Building Permit & Inspection Services in Wisconsin | TIS",
+        description="Need permit & inspection services in South Central Wisconsin? Total Inspection Services ensures smooth approvals and compliance. Explore our services!",
+        keywords="permit and inspection services",
+    ),
+    "resources_page": dict(
+        title="Building Inspection | Resources | TIS",
+        description="Explore building inspection resources from Total Inspection Services, serving South Central Wisconsin. Stay informed with expert insights! ",
+        keywords="building inspection",
+    ),
+    "faq_page": dict(
+        title="Building & Municipal Inspection | Wisconsin | TIS ",
+        description="Total Inspection Services ensures safe and compliant municipal & building inspections in South Central Wisconsin.Reach out to us!",
+        keywords="building and municipal inspection",
+    ),
+    "contact_us_page": dict(
+        title="Building Inspection Services In Wisconsin | Contact TIS",
+        description="Get in touch with Total Inspection Services for expert building inspection services in South Central Wisconsin. Contact us today to schedule an inspection! ",
+        keywords="building Inspection services ",
+    ),
+    "request_an_inspection_page": dict(
+        title="Building Inspection Services In Wisconsin I TIS ",
+        description="Schedule a professional building inspection services with Total Inspection Services in South Central Wisconsin.Get expert evaluations and detailed reports.",
+        keywords="building inspection services",
+    ),
+    "apply_for_permit_page": dict(
+        title="Building Permit Services in Wisconsin I TIS ",
+        description="Apply for building permits hassle-free with Total Inspection Services in South Central Wisconsin. Get your permits approved smoothly! ",
+        keywords="building permit services",
+    ),
+}
+
+VERSION_KEY = "seo_registry_version"
+
+# (compiled on, version, {page key: page_kwargs})
+_registry = (0, None, dict())
+
+
+def _page_kwargs(func, tags):
+    return dict(
+        title=tags.get('title', ''),
+        keywords=tags.get('keywords', ''),
+        description=tags.get('description', ''),
+        media_url=settings.MEDIA_STATIC_URL,
+        uploaded_url=settings.MEDIA_URL,
+        function=func,
+    )
+
+
+def compile_registry():
+    """
+    {page key: page_kwargs} of PAGE_TAGS and the active PageSeo rows
+    """
+    tags = {key: dict(value) for key, value in PAGE_TAGS.items()}
+    try:
+        for row in PageSeo.objects.active().order_by('updated_on') \
+                                           .values('page_key', 'title', 'description', 'keywords'):
+            page_tags = tags.setdefault(row['page_key'], dict(DEFAULT_TAGS))
+            page_tags.update({name: row[name] for name in ('title', 'description', 'keywords') if row[name]})
+    except DatabaseError as e:
+        # page_seo is not migrated yet
+        logger.error("SEO rows not loaded: %s" % e)
+    return {key: _page_kwargs(key, value) for key, value in tags.items()}
+
+
+def get_version_cache():
+    return caches[settings.SEO_VERSION_CACHE_ALIAS]
+
+
+def get_version():
+    """
+    Current registry version, created on first use
+    """
+    version = get_version_cache().get(VERSION_KEY)
+    if version is None:
+        get_version_cache().add(VERSION_KEY, uuid.uuid4().hex, None)
+        version = get_version_cache().get(VERSION_KEY)
+    return version
+
+
+def get_registry():
+    global _registry
+    compiled_on, compiled_version, pages = _registry
+    version = get_version()
+    if version != compiled_version or time.time() - compiled_on > settings.SEO_REGISTRY_TIMEOUT:
+        pages = compile_registry()
+        _registry = (time.time(), version, pages)
+    return pages
+
+
+def _bump():
+    # a new stamp rather than incr(), the file based cache has no atomic incr
+    get_version_cache().set(VERSION_KEY, uuid.uuid4().hex, None)
+
+
+@receiver(post_save, sender=PageSeo)
+@receiver(post_delete, sender=PageSeo)
+def invalidate_registry(sender, **kwargs):
+    # after the commit, a process compiling meanwhile would keep the old rows
+    # under the new version
+    transaction.on_commit(_bump)
 
 
 def get_page_tags(func, dynamic_seo_kwargs=None):
     """
     Build Page SEO
     """
-    global_title="Total Inspection Services"
-    global_description = "Total Inspection Services"
-    global_keywords = """Total Inspection Services"""
-
-    page_kwargs = {}
     if dynamic_seo_kwargs:
-        title=dynamic_seo_kwargs.get('title','')
-        keywords =dynamic_seo_kwargs.get('keywords','')
-        description=dynamic_seo_kwargs.get('description','')
-
-    elif func=="error_404":
-        title="Page Not Found Error"
-        keywords = "Page Not Found Error"
-        description= "Page Not Found Error"
-
-    elif func=="error_500":
-        title="Internal Server Error"
-        keywords = "Internal Server Error"
-        description= "Internal Server Error"
-
-    elif func=="downtime":
-        title="Downtime"
-        keywords = "Downtime"
-        description= "Downtime"
-
-    elif func=="privacy":
-        title="Privacy Policy"
-        keywords = "Privacy Policy,"
-        description= "Privacy Policy of sk.com company website"
-    
-    elif func=="termsofuse":
-        title="Terms of Use"
-        keywords = "Terms of Use"
-        description= "Terms of Use"
-    
-    elif func=="home_page":
-        title="Building Inspection Services in Wisconsin | mck"
-        description = "Get reliable building inspection services and zoning services in South Central Wisconsin with Total Inspection Services. Connect with our building inspectors!"
-        keywords= "building inspection services"
-        
-    elif func=="company_page":
-        title="Building Inspection & Zoning in Wisconsin | About TIS"
-        description = "Total Inspection Services offers expert building inspection & zoning services in South Central Wisconsin. Book a building inspection now!"
-        keywords= "building inspection and zoning services"
-        
-    elif func=="service_page":
-        title="Building Permit & Inspection Services in Wisconsin | TIS"
-        description = "Need permit & inspection services in South Central Wisconsin? Total Inspection Services ensures smooth approvals and compliance. Explore our services!"
-        keywords= "permit and inspection services"
-        
-    elif func=="resources_page":
-        title="Building Inspection | Resources | TIS"
-        description = "Explore building inspection resources from Total Inspection Services, serving South Central Wisconsin. Stay informed with expert insights! "
-        keywords= "building inspection"
-        
-    elif func=="faq_page":
-        title="Building & Municipal Inspection | Wisconsin | TIS "
-        description = "Total Inspection Services ensures safe and compliant municipal & building inspections in South Central Wisconsin.Reach out to us!"
-        keywords= "building and municipal inspection"
-    
-    elif func=="contact_us_page":
-        title="Building Inspection Services In Wisconsin | Contact TIS"
-        description = "Get in touch with Total Inspection Services for expert building inspection services in South Central Wisconsin. Contact us today to schedule an inspection! "
-        keywords= "building Inspection services "
-        
-    elif func=="request_an_inspection_page":
-        title="Building Inspection Services In Wisconsin I TIS "
-        description = "Schedule a professional building inspection services with Total Inspection Services in South Central Wisconsin.Get expert evaluations and detailed reports."
-        keywords= "building inspection services"
-        
-    elif func=="apply_for_permit_page":
-        title="Building Permit Services in Wisconsin I TIS "
-        description = "Apply for building permits hassle-free with Total Inspection Services in South Central Wisconsin. Get your permits approved smoothly! "
-        keywords= "building permit services"
-        
-    else:
-        title=global_title
-        keywords = global_keywords
-        description= global_description
-
-    page_kwargs["title"] = title
-    page_kwargs["keywords"] = keywords
-    page_kwargs["description"] = description
-    page_kwargs["media_url"]= settings.MEDIA_STATIC_URL
-    page_kwargs["uploaded_url"]= settings.MEDIA_URL
-    page_kwargs["function"] = func
-
-    return page_kwargs
+        return _page_kwargs(func, dynamic_seo_kwargs)
+    pages = get_registry()
+    page_kwargs = pages.get(func)
+    if page_kwargs is None:
+        page_kwargs = pages[func] = _page_kwargs(func, DEFAULT_TAGS)
+    # a copy, the views may add to it
+    return dict(page_kwargs)
+
+
+class PageTagsMixin:
+    """
+    page_kwargs of page_key in the context of a class based view
+    """
+    page_key = None
+
+    def get_context_data(self, **kwargs):
+        context = super().get_context_data(**kwargs)
+        context['page_kwargs'] = get_page_tags(self.page_key)
+        return context
+
+
+def property_tags(property_obj):
+    """
+    dynamic_seo_kwargs of a property page from its fields, without a query:
+    the property type is only named when it was fetched with select_related
+    """
+    property_type = ""
+    if property_obj._meta.get_field('property_type').is_cached(property_obj) and property_obj.property_type:
+        property_type = property_obj.property_type.get_name_display()
+    listing = property_obj.get_listing_type_display()
+    kind = property_type or "Property"
+
+    title = "{0} | {1} {2} in {3}".format(property_obj.title, kind, listing.lower(), property_obj.city)
+    description = " ".join((property_obj.description or "").split())
+    if not description:
+        bedrooms = "{0} bedroom ".format(property_obj.bedrooms) if property_obj.bedrooms else ""
+        description = "{0}{1} {2} at {3}, {4}, {5}.".format(
+            bedrooms, kind.lower(), listing.lower(), property_obj.address, property_obj.city, property_obj.state)
+        description = description[0].upper() + description[1:]
+    if len(description) > 160:
+        description = description[:157].rsplit(" ", 1)[0] + "..."
+    keywords = ", ".join(value for value in (
+        kind, property_obj.city, "{0} {1} in {2}".format(kind.lower(), listing.lower(), property_obj.city)) if value)
+    return dict(title=title, description=description, keywords=keywords)
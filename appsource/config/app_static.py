@@ -0,0 +1,37 @@
+"""
+Static Files - fingerprinted, precompressed build of the static tree
+
+    `python manage.py collectstatic` with this storage (settings.STORAGES
+    "staticfiles", outside DEBUG) writes to STATIC_ROOT:
+
+    1. every file under its content hash, e.g. css/services.3f9a01b2c4d5.css,
+       the CSS url() references rewritten to the hashed names
+    2. staticfiles.json, the manifest {% static %} resolves the names with
+    3. .gz and, with the Brotli package installed, .br variants of the
+       compressible files
+
+    WhiteNoiseMiddleware serves the variant matching Accept-Encoding and
+    caches the hashed names as immutable for a year, so a repeat visit only
+    revalidates the page itself.
+"""
+from whitenoise.storage import CompressedManifestStaticFilesStorage
+
+
+class StaticFilesStorage(CompressedManifestStaticFilesStorage):
+    """
+    Vendored CSS referring to files that are not shipped (fonts, source maps)
+    keeps the reference as it is instead of failing the build, and names
+    missing from the manifest are served unhashed instead of being hashed
+    on every {% static %} call
+    """
+    def hashed_name(self, name, content=None, filename=None):
+        try:
+            return super().hashed_name(name, content, filename)
+        except ValueError:
+            return name
+
+    def stored_name(self, name):
+        try:
+            return super().stored_name(name)
+        except ValueError:
+            return name
@@ -0,0 +1,248 @@
+"""
+Dashboard Statistics - counters of the admin dashboard kept up to date by signals
+
+    1. METRICS lists per model the metrics a live row (datamode not 'D')
+       counts in, a metric is a total (no field) or grouped by a field:
+           property.city       one mck_admin_console.DashboardStat row per city
+           lead.day            one row per day of date_submitted (daily series)
+    2. a save moves the row out of the groups of its previous values and into
+       the new ones, a delete takes it out, with F() updates of a few
+       DashboardStat rows; the previous values are remembered when the row
+       is loaded (post_init), so no extra query is needed
+    3. queryset.update() / bulk_create() / loaddata do not send the signals,
+       script_dashboard_stats recomputes every counter from the tables (and
+       the migration creating DashboardStat fills it the first time)
+    4. the receivers are connected by the mck_admin_console app config
+    5. get_recent reads the latest live rows of RECENT_ITEMS, a few columns
+       of settings.DASHBOARD_RECENT_ITEMS rows each through the live index
+
+    Usage:
+        stats = app_stats.get_dashboard()
+        stats['totals']['lead'], stats['groups']['property.city'], stats['series']['lead.day']
+        recent = app_stats.get_recent()
+        recent['lead']
+"""
+import datetime
+from collections import Counter, defaultdict
+from django.apps import apps
+from django.conf import settings
+from django.db import IntegrityError, transaction
+from django.db.models import F
+from django.db.models.signals import post_init, pre_save, post_save, post_delete
+from config import app_gv as gv
+from config import app_reference
+from mck_admin_console.models import DashboardStat
+
+
+METRICS = {
+    'squarebox.Property': (
+        ('property', None),
+        ('property.type', 'property_type_id'),
+        ('property.city', 'city'),
+        ('property.listing_type', 'listing_type'),
+    ),
+    'squarebox.PropertyType': (
+        ('property_type', None),
+    ),
+    'squarebox.PropertyImage': (
+        ('property_image', None),
+    ),
+    'squarebox.Lead': (
+        ('lead', None),
+        ('lead.day', 'date_submitted'),
+    ),
+    'squarebox.MaintenanceRequest': (
+        ('maintenance', None),
+        ('maintenance.status', 'status'),
+        ('maintenance.urgency', 'urgency'),
+    ),
+    'mck_admin_console.Testimonial': (
+        ('testimonial', None),
+    ),
+}
+
+# grouped metrics shown on the dashboard
+GROUP_TITLES = (
+    ("Listings by type", 'property.type'),
+    ("Listings by city", 'property.city'),
+    ("Listings by listing type", 'property.listing_type'),
+    ("Maintenance by status", 'maintenance.status'),
+    ("Maintenance by urgency", 'maintenance.urgency'),
+)
+
+# latest rows shown on the dashboard, the columns read of each
+RECENT_ITEMS = {
+    'property': ('squarebox.Property', ('title', 'city', 'updated_on')),
+    'lead': ('squarebox.Lead', ('name', 'email', 'date_submitted', 'updated_on')),
+    'maintenance': ('squarebox.MaintenanceRequest', ('description', 'status', 'urgency', 'updated_on')),
+}
+
+KEY_MAX_LENGTH = 100
+
+
+def _fields(label):
+    return ['datamode'] + [attname for metric, attname in METRICS[label] if attname]
+
+
+def _key(value):
+    if value is None:
+        return ""
+    if isinstance(value, datetime.datetime):
+        value = value.date()
+    if isinstance(value, datetime.date):
+        return value.isoformat()
+    return str(value)[:KEY_MAX_LENGTH]
+
+
+def contributions(label, values):
+    """
+    {(metric, key)} a row counts in, values is {attname: value} of the row
+    """
+    if values.get('datamode') == 'D':
+        return set()
+    return {(metric, _key(values.get(attname)) if attname else "") for metric, attname in METRICS[label]}
+
+
+def _instance_values(instance, fields):
+    # deferred fields are missing, reading them would cost a query
+    if all(attname in instance.__dict__ for attname in fields):
+        return {attname: instance.__dict__[attname] for attname in fields}
+    return None
+
+
+def add(metric, key, delta):
+    updated = DashboardStat.objects.filter(metric=metric, key=key).update(value=F('value') + delta)
+    if not updated:
+        try:
+            with transaction.atomic():
+                DashboardStat.objects.create(metric=metric, key=key, value=delta)
+        except IntegrityError:
+            # created meanwhile by a concurrent save
+            DashboardStat.objects.filter(metric=metric, key=key).update(value=F('value') + delta)
+
+
+def remember_values(sender, instance, **kwargs):
+    values = _instance_values(instance, _fields(sender._meta.label))
+    if values is not None:
+        instance._stat_keys = contributions(sender._meta.label, values)
+
+
+def previous_contributions(sender, instance, raw=False, **kwargs):
+    label = sender._meta.label
+    if instance._state.adding:
+        instance._stat_previous = set()
+    elif hasattr(instance, '_stat_keys'):
+        instance._stat_previous = instance._stat_keys
+    else:
+        values = sender._base_manager.filter(pk=instance.pk).values(*_fields(label)).first()
+        instance._stat_previous = contributions(label, values) if values else set()
+
+
+def count_saved(sender, instance, raw=False, **kwargs):
+    label = sender._meta.label
+    values = _instance_values(instance, _fields(label))
+    if values is None:
+        values = sender._base_manager.filter(pk=instance.pk).values(*_fields(label)).first() or dict(datamode='D')
+    previous = getattr(instance, '_stat_previous', set())
+    current = contributions(label, values)
+    for metric, key in previous - current:
+        add(metric, key, -1)
+    for metric, key in current - previous:
+        add(metric, key, 1)
+    instance._stat_keys = current
+
+
+def count_deleted(sender, instance, **kwargs):
+    label = sender._meta.label
+    keys = getattr(instance, '_stat_keys', None)
+    if keys is None:
+        values = _instance_values(instance, _fields(label))
+        keys = contributions(label, values) if values is not None else set()
+    for metric, key in keys:
+        add(metric, key, -1)
+
+
+for _label in METRICS:
+    post_init.connect(remember_values, sender=_label, dispatch_uid="app_stats_init_%s" % _label)
+    pre_save.connect(previous_contributions, sender=_label, dispatch_uid="app_stats_pre_save_%s" % _label)
+    post_save.connect(count_saved, sender=_label, dispatch_uid="app_stats_save_%s" % _label)
+    post_delete.connect(count_deleted, sender=_label, dispatch_uid="app_stats_delete_%s" % _label)
+
+
+def rebuild(registry=None):
+    """
+    Recomputes every counter from the tables, returns the number of rows,
+    registry is the apps of a migration (historical models)
+    """
+    registry = registry or apps
+    stat_model = registry.get_model('mck_admin_console.DashboardStat')
+    counts = Counter()
+    for label in METRICS:
+        model = registry.get_model(label)
+        for values in model._base_manager.exclude(datamode='D').values(*_fields(label)).iterator():
+            counts.update(contributions(label, values))
+    with transaction.atomic():
+        stat_model.objects.all().delete()
+        stat_model.objects.bulk_create(
+            [stat_model(metric=metric, key=key, value=value) for (metric, key), value in counts.items()])
+    return len(counts)
+
+
+def _group_labels(metric):
+    if metric == 'property.type':
+        names = dict(gv.PROPERTY_TYPE_CHOICES)
+        return {str(row.id): names.get(row.name, row.name) for row in app_reference.get('squarebox.PropertyType')}
+    if metric == 'property.listing_type':
+        return dict(apps.get_model('squarebox.Property').LISTING_TYPE_CHOICES)
+    if metric == 'maintenance.status':
+        return dict(apps.get_model('squarebox.MaintenanceRequest').STATUS_CHOICES)
+    if metric == 'maintenance.urgency':
+        return dict(apps.get_model('squarebox.MaintenanceRequest').URGENCY_CHOICES)
+    return dict()
+
+
+def get_recent(limit=None):
+    """
+    {name: [row, ..] latest updated first} of RECENT_ITEMS
+    """
+    limit = limit or settings.DASHBOARD_RECENT_ITEMS
+    recent = dict()
+    for name, (label, fields) in RECENT_ITEMS.items():
+        model = apps.get_model(label)
+        recent[name] = list(model.objects.live().latest_first().only(*fields)[:limit])
+    return recent
+
+
+def get_dashboard(days=None):
+    """
+    {'totals': {metric: value},
+     'groups': {metric: [(label, value), ..] largest first},
+     'series': {metric: [(date, value), ..] of the last days, oldest first}}
+    """
+    days = days or settings.DASHBOARD_SERIES_DAYS
+    today = datetime.date.today()
+    start = today - datetime.timedelta(days=days - 1)
+    total_metrics = {metric for attnames in METRICS.values() for metric, attname in attnames if not attname}
+    series_metrics = [metric for attnames in METRICS.values() for metric, attname in attnames
+                      if metric.endswith('.day')]
+
+    totals, groups, days_values = dict(), defaultdict(list), defaultdict(dict)
+    for metric, key, value in DashboardStat.objects.exclude(metric__in=series_metrics, key__lt=start.isoformat()) \
+                                                   .values_list('metric', 'key', 'value'):
+        if metric in total_metrics:
+            totals[metric] = value
+        elif metric in series_metrics:
+            days_values[metric][key] = value
+        elif value:
+            groups[metric].append((key, value))
+
+    for metric, rows in groups.items():
+        labels = _group_labels(metric)
+        groups[metric] = sorted([(labels.get(key, key or "Not set"), value) for key, value in rows],
+                                key=lambda row: -row[1])
+
+    series = dict()
+    for metric in series_metrics:
+        dates = [start + datetime.timedelta(days=index) for index in range(days)]
+        series[metric] = [(date, days_values[metric].get(date.isoformat(), 0)) for date in dates]
+    return dict(totals=totals, groups=dict(groups), series=series)
@@ -0,0 +1,214 @@
+"""
+Content Addressed Storage - uploads stored once per content (settings.STORAGES default)
+
+    1. an upload is saved under the SHA-256 of its bytes, sharded in two
+       directory levels, whatever its upload_to path was:
+           cas/3f/a2/3fa2...e1.jpg
+       the same photo uploaded for several listings is one file on disk and
+       one immutable URL
+    2. mck_master.MediaBlob counts the references of every stored file (the
+       hash and the extension, the same bytes saved as .jpg and .jpeg are two
+       files), a file is removed from disk when its last reference goes away
+       (the row is deleted or its file replaced by a new upload); a reference
+       is taken before the file is written and the last one released with
+       the file unlinked in one transaction, so the two never interleave
+    3. names outside cas/ (the upload_to paths written before this storage)
+       are served and deleted like FileSystemStorage did, the
+       script_media_dedupe script moves them into cas/ and keeps the old
+       paths as hard links so existing URLs keep resolving
+    4. the receivers are connected to the models with file fields in this
+       storage by the mck_master app config (connect_receivers)
+
+    The image derivatives (app_images) are written with update(), they are
+    released by app_images when replaced or deleted.
+"""
+import os
+import re
+import hashlib
+import tempfile
+from django.apps import apps
+from django.core.files.storage import FileSystemStorage
+from django.db import IntegrityError, models, transaction
+from django.db.models import F
+from django.db.models.signals import post_init, pre_save, post_save, post_delete
+from mck_master.models import MediaBlob
+
+
+CAS_DIRECTORY = "cas"
+CAS_NAME_RE = re.compile(r"^{0}/[0-9a-f]{{2}}/[0-9a-f]{{2}}/(?P<sha256>[0-9a-f]{{64}})(\.\w+)?$".format(CAS_DIRECTORY))
+
+
+def content_name(sha256, name):
+    """
+    cas/<2>/<2>/<sha256><extension of the uploaded name>
+    """
+    extension = os.path.splitext(name)[1].lower()
+    if not re.match(r"^\.\w{1,10}$", extension):
+        extension = ""
+    return "{0}/{1}/{2}/{3}{4}".format(CAS_DIRECTORY, sha256[:2], sha256[2:4], sha256, extension)
+
+
+def content_hash(name):
+    """
+    SHA-256 of a content addressed name, None for the other names
+    """
+    match = CAS_NAME_RE.match(name or "")
+    return match.group('sha256') if match else None
+
+
+def file_hash(content):
+    digest = hashlib.sha256()
+    size = 0
+    for chunk in content.chunks():
+        if isinstance(chunk, str):
+            chunk = chunk.encode()
+        digest.update(chunk)
+        size += len(chunk)
+    return digest.hexdigest(), size
+
+
+class ContentAddressedStorage(FileSystemStorage):
+    """
+    FileSystemStorage writing every upload to its content address and
+    counting the references in MediaBlob
+    """
+    def get_available_name(self, name, max_length=None):
+        # the name is replaced by the content address in _save
+        return name
+
+    def _save(self, name, content):
+        sha256, size = file_hash(content)
+        name = content_name(sha256, name)
+        full_path = self.path(name)
+        with transaction.atomic():
+            # the reference first, a release of the last one unlinking the file
+            # meanwhile has committed by now and the file is written again
+            self.add_reference(sha256, name, size)
+            if not os.path.exists(full_path):
+                self._write(full_path, content)
+        return name
+
+    def _write(self, full_path, content):
+        directory = os.path.dirname(full_path)
+        os.makedirs(directory, exist_ok=True)
+        # written aside and renamed, a concurrent upload of the same content
+        # renames an identical file over it
+        fd, temp_path = tempfile.mkstemp(dir=directory, prefix=".upload-")
+        try:
+            with os.fdopen(fd, "wb") as temp_file:
+                for chunk in content.chunks():
+                    temp_file.write(chunk.encode() if isinstance(chunk, str) else chunk)
+            if self.file_permissions_mode is not None:
+                os.chmod(temp_path, self.file_permissions_mode)
+            os.replace(temp_path, full_path)
+        except Exception:
+            if os.path.exists(temp_path):
+                os.remove(temp_path)
+            raise
+
+    def add_reference(self, sha256, name, size):
+        # an update first, it takes the write lock before anything is read
+        if MediaBlob.objects.filter(name=name).update(refcount=F('refcount') + 1):
+            return
+        try:
+            with transaction.atomic():
+                MediaBlob.objects.create(sha256=sha256, name=name, size=size, refcount=1)
+        except IntegrityError:
+            # created meanwhile by a concurrent upload
+            MediaBlob.objects.filter(name=name).update(refcount=F('refcount') + 1)
+
+    def delete(self, name):
+        """
+        Releases one reference of a content, the file goes with the last one
+        """
+        if content_hash(name) is None:
+            return super().delete(name)
+        with transaction.atomic():
+            if MediaBlob.objects.filter(name=name, refcount__gt=1).update(refcount=F('refcount') - 1):
+                return
+            MediaBlob.objects.filter(name=name).delete()
+            # unlinked before the commit, an upload of the same content waits on the
+            # blob row and writes the file again
+            super().delete(name)
+
+
+_file_fields = dict()
+
+
+def file_fields(model):
+    """
+    File fields of the model stored in a ContentAddressedStorage
+    """
+    if model not in _file_fields:
+        _file_fields[model] = [field for field in model._meta.concrete_fields
+                               if isinstance(field, models.FileField)
+                               and isinstance(field.storage, ContentAddressedStorage)]
+    return _file_fields[model]
+
+
+def release(storage, name):
+    if content_hash(name):
+        transaction.on_commit(lambda: storage.delete(name))
+
+
+def _stored_names(instance, fields):
+    # deferred fields are left out, reading them would cost a query
+    return {field.attname: instance.__dict__[field.attname] for field in fields
+            if field.attname in instance.__dict__}
+
+
+def remember_stored_files(sender, instance, **kwargs):
+    fields = file_fields(sender)
+    if fields:
+        instance._stored_file_names = {attname: getattr(file, 'name', file)
+                                       for attname, file in _stored_names(instance, fields).items()}
+
+
+def release_replaced_files(sender, instance, raw=False, **kwargs):
+    """
+    A row pointing a file field at another file releases the one it had
+    """
+    fields = file_fields(sender)
+    if raw or not fields:
+        return
+    stored = getattr(instance, '_stored_file_names', dict())
+    for attname, file in _stored_names(instance, fields).items():
+        previous = stored.get(attname)
+        if not previous:
+            continue
+        uncommitted = file and not getattr(file, '_committed', True)
+        if uncommitted or getattr(file, 'name', file) != previous:
+            release(sender._meta.get_field(attname).storage, previous)
+
+
+def refresh_stored_files(sender, instance, raw=False, **kwargs):
+    fields = file_fields(sender)
+    if fields:
+        remember_stored_files(sender, instance)
+
+
+def release_deleted_files(sender, instance, **kwargs):
+    for field in file_fields(sender):
+        file = getattr(instance, field.attname)
+        if file:
+            release(field.storage, file.name)
+
+
+RECEIVERS = (
+    (post_init, remember_stored_files),
+    (pre_save, release_replaced_files),
+    (post_save, refresh_stored_files),
+    (post_delete, release_deleted_files),
+)
+
+
+def connect_receivers():
+    """
+    Connects the receivers to the models with file fields in a ContentAddressedStorage
+    """
+    for model in apps.get_models():
+        if not file_fields(model):
+            continue
+        for signal, receiver in RECEIVERS:
+            signal.connect(receiver, sender=model, dispatch_uid="app_storage_{0}_{1}".format(
+                receiver.__name__, model._meta.label))
@@ -5,6 +5,8 @@ import sys
 from django.db.models import Q
 from config import settings
 from config import app_logger
+from config import app_datatable
+from config import app_search
 logger = app_logger.createLogger("app")
 
 
@@ -132,6 +134,10 @@ def search(request, qs, column_list, is_download, admin_user_search):
                 col_data = extract_datatables_column_data(request)
             if not isinstance(qs, list):
                 q = Q()
+                # the indexed columns of a model are searched through its full text index when
+                # the index can answer the term, the other columns with icontains
+                indexed_fields = app_search.indexed_fields(qs.model)
+                use_index = bool(indexed_fields) and app_search.is_indexable(search)
                 fk_list = [field.name for field in qs.model._meta.fields if field.get_internal_type() in [
                     "ForeignKey", "OneToOneField"]]
                 for col_no, col in enumerate(col_data):
@@ -140,14 +146,20 @@ def search(request, qs, column_list, is_download, admin_user_search):
                     if col['name'] == "action":
                         col['searchable'] = False
 
-                    if search and col['searchable'] and col_data[col_no]['name'] != '':
+                    if search and col['searchable'] and col_data[col_no]['name'] != '' and not (
+                            use_index and col_data[col_no]['name'] in indexed_fields):
                         q |= Q(
                             **{'{0}__icontains'.format(col_data[col_no]['name'].replace('.', '__')): search})
                     if not is_download:
-                        if col['search.value'] and col_data[col_no]['name'] != '':
+                        if col['search.value'] and col_data[col_no]['name'] in indexed_fields:
+                            qs = app_search.search(qs, col['search.value'], fields=[col['name']], ranked=False)
+                        elif col['search.value'] and col_data[col_no]['name'] != '':
                             qs = qs.filter(
                                 **{'{0}__icontains'.format(col_data[col_no]['name'].replace('.', '__')): col['search.value']})
-                qs = qs.filter(q)
+                if use_index:
+                    qs = app_search.rank(qs.filter(q | app_search.search_q(qs.model, search)), search)
+                else:
+                    qs = qs.filter(q)
             else:
                 final_qs = list()
                 for row in qs:
@@ -197,23 +209,26 @@ def method_for_datatable_operations(request, qs, order=True, is_download=False,
     try:
         if isinstance(qs, list):
             total_records = len(qs)
-        else:
-            try:
-                total_records = qs.count()
-            except:
-                total_records = len(qs)
-        qs = search(request, qs, column_list, is_download, admin_user_search)
-        if isinstance(qs, list):
+            qs = search(request, qs, column_list, is_download, admin_user_search)
             total_display_records = len(qs)
+            if order:
+                qs = ordering(request, qs)
+            if not is_download:
+                qs = paging(request, qs)
         else:
-            try:
-                total_display_records = qs.count()
-            except:
-                total_records = len(qs)
-        if order:
-            qs = ordering(request, qs)
-        if not is_download:
-            qs = paging(request, qs)
+            total_records = app_datatable.cached_count(qs)
+            if app_datatable.has_search(request, is_download):
+                qs = search(request, qs, column_list, is_download, admin_user_search)
+                if isinstance(qs, list):
+                    total_display_records = len(qs)
+                else:
+                    total_display_records = app_datatable.cached_count(qs)
+            else:
+                total_display_records = total_records
+            if order:
+                qs = ordering(request, qs)
+            if not is_download and not isinstance(qs, list):
+                qs = app_datatable.seek_page(request, qs, total_display_records)
     except Exception as e:
         app_logger.exceptionlogs(e)
     return qs, total_records, total_display_records
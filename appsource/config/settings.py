@@ -13,16 +13,18 @@ https://docs.djangoproject.com/en/5.1/ref/settings/
 
 import os
 import sys
-import logging.config
 from pathlib import Path
 
 # Build paths inside the project like this: BASE_DIR / 'subdir'.
 BASE_DIR = Path(__file__).resolve().parent.parent
 sys.path.insert(0, str(BASE_DIR))
 
+# Settings profile: "development" (default) or "production", see the production profile below
+APP_ENV = os.environ.get('APP_ENV', 'development')
+
 # Quick-start development settings - unsuitable for production
-SECRET_KEY = 'django-insecure-adkq2p-(e(l)7xqztab_j@)x0)eu2nr@vi&6@))gz^1u&owj#-'
-DEBUG = True
+SECRET_KEY = os.environ.get('APP_SECRET_KEY', 'django-insecure-adkq2p-(e(l)7xqztab_j@)x0)eu2nr@vi&6@))gz^1u&owj#-')
+DEBUG = APP_ENV != 'production'
 ALLOWED_HOSTS = ['*']
 
 # Application definition
@@ -44,17 +46,22 @@ INSTALLED_APPS = [
     'mck_website',
     'squarebox',
 ]
+# only used from manage.py (runscript, shell_plus ..), left out of the production web workers
+DEBUG_ONLY_APPS = ['django_extensions']
 
 MIDDLEWARE = [
+    'mck_auth.middleware.MetricsMiddleware',
     'django.middleware.security.SecurityMiddleware',
+    'whitenoise.middleware.WhiteNoiseMiddleware',
     'django.contrib.sessions.middleware.SessionMiddleware',
     'django.middleware.common.CommonMiddleware',
     'django.middleware.csrf.CsrfViewMiddleware',
     'django.contrib.auth.middleware.AuthenticationMiddleware',
+    'mck_auth.middleware.ReplicaMiddleware',
     'django.contrib.messages.middleware.MessageMiddleware',
     'django.middleware.clickjacking.XFrameOptionsMiddleware',
-    'whitenoise.middleware.WhiteNoiseMiddleware',  
     'mck_auth.middleware.AdminAccessMiddleware',
+    'mck_auth.middleware.SQLProfilerMiddleware',
 ]
 
 ROOT_URLCONF = 'config.urls'
@@ -78,6 +85,7 @@ TEMPLATES = [
                 'django.template.context_processors.request',
                 'django.contrib.auth.context_processors.auth',
                 'django.contrib.messages.context_processors.messages',
+                'config.app_pagecache.context_processor',
             ],
         },
     },
@@ -89,10 +97,74 @@ WSGI_APPLICATION = 'config.wsgi.application'
 DATABASES = {
     'default': {
         'ENGINE': 'django.db.backends.sqlite3',
-        'NAME': os.path.join(BASE_DIR, 'mck_squarebox.sqlite3'),
+        'NAME': os.environ.get('APP_SQLITE_PATH', os.path.join(BASE_DIR, 'mck_squarebox.sqlite3')),
     }
 }
 
+# Production profile (APP_ENV=production)
+#   templates are compiled once per process (cached loaders) without the debug context processor,
+#   connections are kept for CONN_MAX_AGE and health checked, SQLite runs in WAL mode so readers
+#   never wait on a writer, with a relaxed fsync (synchronous=NORMAL is safe in WAL mode), a memory
+#   mapped file and a 64 MB page cache, and DEBUG_ONLY_APPS are not loaded by the web workers.
+#   python manage.py runscript script_benchmark_profiles compares it with the development profile
+if APP_ENV == 'production':
+    if os.path.basename(sys.argv[0]) != 'manage.py':
+        INSTALLED_APPS = [app for app in INSTALLED_APPS if app not in DEBUG_ONLY_APPS]
+
+    TEMPLATES[0]['APP_DIRS'] = False
+    TEMPLATES[0]['OPTIONS']['context_processors'].remove('django.template.context_processors.debug')
+    TEMPLATES[0]['OPTIONS']['loaders'] = [
+        ('django.template.loaders.cached.Loader', [
+            'django.template.loaders.filesystem.Loader',
+            'django.template.loaders.app_directories.Loader',
+        ]),
+    ]
+
+    DATABASES['default'].update({
+        'CONN_MAX_AGE': 600,
+        'CONN_HEALTH_CHECKS': True,
+        'OPTIONS': {
+            'init_command': (
+                'PRAGMA journal_mode=WAL;'
+                'PRAGMA synchronous=NORMAL;'
+                'PRAGMA mmap_size=134217728;'
+                'PRAGMA cache_size=-65536;'
+                'PRAGMA temp_store=MEMORY;'
+            ),
+            # busy_timeout in seconds, writers wait for the lock instead of failing
+            'timeout': 20,
+            # take the write lock when the transaction starts, not on its first write
+            'transaction_mode': 'IMMEDIATE',
+        },
+    })
+
+# Read replica (config/app_replica.py), opt-in with APP_DATABASE_REPLICA=1. The website views
+# read the DATABASE_REPLICA_APPS models from a copy of the database refreshed with the SQLite
+# backup API, a session that wrote is pinned to default for DATABASE_REPLICA_STICKY_SECONDS
+DATABASE_REPLICA_ENABLED = os.environ.get('APP_DATABASE_REPLICA') == '1'
+if DATABASE_REPLICA_ENABLED:
+    # the replica file is replaced by every sync: a connection per request reads the latest copy,
+    # in the rollback journal mode of the copy (no WAL, readers only)
+    DATABASES['replica'] = dict(
+        DATABASES['default'],
+        NAME=os.environ.get('APP_SQLITE_REPLICA_PATH', os.path.join(BASE_DIR, 'mck_squarebox.replica.sqlite3')),
+        CONN_MAX_AGE=0,
+        OPTIONS={'timeout': 20},
+        TEST={'MIRROR': 'default'},
+    )
+    DATABASE_ROUTERS = ['config.app_replica.ReplicaRouter']
+DATABASE_REPLICA_APPS = ['squarebox', 'mck_master', 'mck_website']
+DATABASE_REPLICA_VIEWS = [
+    'mck_website.views.HomePage',
+    'mck_website.views.PropertyPage',
+    'mck_website.views.PropertyDetailPage',
+]
+DATABASE_REPLICA_STICKY_SECONDS = 30
+DATABASE_REPLICA_SYNC_INTERVAL = 10
+# refresh the replica from a thread of every web process (one at a time, a lock file next to the
+# replica), or run script_replica_sync instead
+DATABASE_REPLICA_SYNC_IN_PROCESS = True
+
 # Password validation
 AUTH_PASSWORD_VALIDATORS = [
     {'NAME': 'django.contrib.auth.password_validation.UserAttributeSimilarityValidator'},
@@ -139,6 +211,100 @@ STATIC_ROOT = os.path.join(BASE_DIR, 'media', 'static')
 
 MEDIA_STATIC_URL = "/app-static/"
 
+# Uploads are stored once per content under media/cas (config/app_storage.py)
+STORAGES = {
+    "default": {"BACKEND": "config.app_storage.ContentAddressedStorage"},
+    # hashed, gzip / brotli compressed build of collectstatic (config/app_static.py),
+    # DEBUG serves the source tree as it is
+    "staticfiles": {"BACKEND": "django.contrib.staticfiles.storage.StaticFilesStorage" if DEBUG
+                    else "config.app_static.StaticFilesStorage"},
+}
+# max-age of the static files without a hash in their name
+WHITENOISE_MAX_AGE = 3600
+
+# Media / static file serving (config/app_media.py). Behind a front-end server set
+# MEDIA_SENDFILE to "x-sendfile" (Apache, lighttpd) or "x-accel-redirect" (nginx, with the
+# internal location of each document root in MEDIA_ACCEL_LOCATIONS)
+MEDIA_SENDFILE = None
+MEDIA_ACCEL_LOCATIONS = {
+    # MEDIA_ROOT: "/protected/site-media/",
+}
+MEDIA_CACHE_MAX_AGE = 3600
+
+# Website listings
+HOME_PAGE_PROPERTY_PAGE_SIZE = 8
+HOME_PAGE_PROPERTY_MAX = 48
+# filter sidebar counts of the property page (config/app_facets.py)
+PROPERTY_FACET_CACHE_TIMEOUT = 300
+
+# Caches, the rendered website pages go to a file based cache shared by every process
+# so script_page_cache can purge them, 'shared' holds the small values every process reads
+CACHES = {
+    'default': {
+        'BACKEND': 'django.core.cache.backends.locmem.LocMemCache',
+    },
+    'pages': {
+        'BACKEND': 'django.core.cache.backends.filebased.FileBasedCache',
+        'LOCATION': os.environ.get('APP_PAGE_CACHE_DIR', os.path.join(BASE_DIR, 'cache', 'pages')),
+        'TIMEOUT': None,
+        'OPTIONS': {'MAX_ENTRIES': 1000},
+    },
+    'shared': {
+        'BACKEND': 'django.core.cache.backends.filebased.FileBasedCache',
+        'LOCATION': os.environ.get('APP_SHARED_CACHE_DIR', os.path.join(BASE_DIR, 'cache', 'shared')),
+        'TIMEOUT': None,
+    },
+}
+
+# Reference tables (country, state, city, category, sub category, property type) are read from
+# a snapshot kept by every process (config/app_reference.py), the version stamps are in the
+# 'shared' cache and checked at most once every REFERENCE_CHECK_INTERVAL seconds
+REFERENCE_CACHE_ALIAS = 'shared'
+REFERENCE_CHECK_INTERVAL = 5
+
+# Anonymous page cache of the marketing pages (config/app_pagecache.py), off while developing.
+# Pages are fresh for PAGE_CACHE_TIMEOUT seconds then served stale for PAGE_CACHE_STALE_TIMEOUT
+# more while rendered again, PAGE_CACHE_VERSION (a release id) replaces the template hash.
+# Entries read are kept in the process memory for PAGE_CACHE_LOCAL_TIMEOUT seconds (0 disables it)
+PAGE_CACHE_ENABLED = not DEBUG
+PAGE_CACHE_ALIAS = 'pages'
+PAGE_CACHE_TIMEOUT = 600
+PAGE_CACHE_STALE_TIMEOUT = 3600
+PAGE_CACHE_BROWSER_MAX_AGE = 60
+PAGE_CACHE_LOCAL_TIMEOUT = 5
+PAGE_CACHE_VERSION = os.environ.get('APP_PAGE_CACHE_VERSION')
+PAGE_FRAGMENT_CACHE_TIMEOUT = 0 if DEBUG else 600
+
+# Resized JPEG / WebP copies of the property images (config/app_images.py)
+IMAGE_DERIVATIVE_WIDTHS = (320, 640, 1024, 1600)
+IMAGE_DERIVATIVE_QUALITY = 80
+IMAGE_DERIVATIVE_WORKERS = 2
+
+# Admin dashboard counters (config/app_stats.py), days of the daily series, latest rows listed
+DASHBOARD_SERIES_DAYS = 14
+DASHBOARD_RECENT_ITEMS = 5
+
+# SEO tags (config/app_seo.py), the registry version is in the cache shared by every process,
+# compiled again at the latest after SEO_REGISTRY_TIMEOUT seconds
+SEO_VERSION_CACHE_ALIAS = 'shared'
+SEO_REGISTRY_TIMEOUT = 300
+
+# Admin DataTables, the model versions are in the cache shared by every process
+DATATABLE_VERSION_CACHE_ALIAS = 'shared'
+DATATABLE_COUNT_CACHE_TIMEOUT = 300
+DATATABLE_CURSOR_CACHE_TIMEOUT = 900
+
+# Admin permissions, the versions are in the cache shared by every process
+PERMISSION_VERSION_CACHE_ALIAS = 'shared'
+PERMISSION_CACHE_TIMEOUT = 300
+
+# Full text search (config/app_search.py), the backend defaults to the database vendor
+SEARCH_BACKEND = None
+SEARCH_INDEXES = {
+    'squarebox.Property': ['title', 'address', 'city', 'state', 'zipcode', 'description'],
+    'squarebox.Lead': ['name', 'email', 'phone', 'location', 'message'],
+}
+
 # Security settings
 SECURE_CROSS_ORIGIN_OPENER_POLICY = None
 DEFAULT_AUTO_FIELD = 'django.db.models.BigAutoField'
@@ -146,10 +312,37 @@ DEFAULT_AUTO_FIELD = 'django.db.models.BigAutoField'
 # Crispy forms
 CRISPY_ALLOWED_TEMPLATE_PACKS = "bootstrap5"
 CRISPY_TEMPLATE_PACK = "bootstrap5"
+# the html around the fields of the layout objects (Div, Row, Column, Fieldset) and their
+# attribute strings rendered once and reused by every form (crispy_forms/utils.py), off until
+# it measurably speeds up the forms (pytest -m benchmark crispy_forms/tests/test_benchmarks.py)
+CRISPY_COMPILED_LAYOUTS = False
 
 
 APP_LOGGING_CONFIG = "logging.config.dictConfig"
-APP_LOGGING_LEVEL = "DEBUG"
+APP_LOGGING_LEVEL = "DEBUG" if DEBUG else "INFO"
+
+# Log files are written by a background thread behind a bounded queue (config/app_logger.py),
+# the sample rate is the fraction of calls whose functionlogs entry / exit lines are logged
+LOGGING_CONFIG = "config.app_logger.configure_logging"
+APP_LOGGING_QUEUE = True
+APP_LOGGING_QUEUE_SIZE = 10000
+APP_LOGGING_FUNCTION_SAMPLE_RATE = 1.0
+
+# Function and request timing histograms (config/app_metrics.py), snapshotted per process by a
+# background thread, the snapshots not rewritten for APP_METRICS_SNAPSHOT_MAX_AGE seconds are
+# from processes gone and get deleted
+APP_METRICS_ENABLED = True
+APP_METRICS_DIR = os.path.join(BASE_DIR, 'logs', 'metrics')
+APP_METRICS_FLUSH_INTERVAL = 60
+APP_METRICS_SNAPSHOT_MAX_AGE = 600
+
+# Per request SQL profile (mck_auth.middleware.SQLProfilerMiddleware), opt-in.
+# The budget is a query count or {view_name: count, "default": count}, strict mode
+# raises QueryBudgetExceeded when a view goes over it (meant for tests)
+SQL_PROFILER_ENABLED = False
+SQL_PROFILER_NPLUSONE_THRESHOLD = 5
+SQL_PROFILER_QUERY_BUDGET = None
+SQL_PROFILER_STRICT = False
 
 
 # Logging configuration (unchanged from your original)
@@ -196,8 +389,7 @@ LOGGING = {
 
      }
 }
-
-logging.config.dictConfig(LOGGING)
+# applied by LOGGING_CONFIG (app_logger.configure_logging) when django sets up
 
 # Authentication
 AUTH_USER_MODEL = 'mck_auth.User'
@@ -212,3 +404,19 @@ LOGIN_REDIRECT_URL = "/auth/login/"
 # EMAIL_HOST_PASSWORD = 'nlwyargkfxqeynjw'  # Use App Password, not your main password
 # DEFAULT_FROM_EMAIL = EMAIL_HOST_USER
 # ADMIN_EMAIL = 'admin@example.com'
+
+# Email outbox (config/app_outbox.py), enquiry emails are queued in the database with the
+# Lead and delivered in batches over one connection, by a thread of the web process and / or
+# python manage.py runscript script_outbox_worker. The file backend writes the messages to
+# EMAIL_FILE_PATH instead of sending them (development / tests)
+OUTBOX_EMAIL_BACKEND = 'django.core.mail.backends.filebased.EmailBackend' if DEBUG else 'django.core.mail.backends.smtp.EmailBackend'
+EMAIL_FILE_PATH = os.path.join(BASE_DIR, 'logs', 'emails')
+OUTBOX_SEND_IN_PROCESS = True
+OUTBOX_POLL_INTERVAL = 30
+OUTBOX_BATCH_SIZE = 50
+OUTBOX_MAX_ATTEMPTS = 6
+OUTBOX_RETRY_BASE = 60
+OUTBOX_RETRY_MAX = 3600
+OUTBOX_CLAIM_TIMEOUT = 600
+# admin notification of new enquiries, none is sent while empty
+ENQUIRY_ADMIN_EMAILS = []
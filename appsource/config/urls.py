@@ -18,20 +18,28 @@ Including another URLconf
 from django.contrib import admin
 from django.conf import settings
 from django.urls import path, re_path, include
-from django.views.static import serve
+from config.app_media import serve
 from django.contrib.auth import views as auth_views
 from config import app_seo as seo
 
+
+class PasswordChangeView(seo.PageTagsMixin, auth_views.PasswordChangeView):
+    pass
+
+
+class PasswordChangeDoneView(seo.PageTagsMixin, auth_views.PasswordChangeDoneView):
+    pass
+
+
 urlpatterns = [
     path('admin/', admin.site.urls),
     path('auth/', include('mck_auth.urls', namespace='mck_auth')),
     path('mck-master/', include('mck_master.urls', namespace='mck_master')),
 
-    path('change-password/',auth_views.PasswordChangeView.as_view(
-                                        extra_context={'page_kwargs':seo.get_page_tags("password_change")}),
+    # the SEO tags are looked up per request, not while the URLconf is imported
+    path('change-password/',PasswordChangeView.as_view(page_key="password_change"),
                                         name='password_change'),
-    path('change-password/complete/',auth_views.PasswordChangeDoneView.as_view(
-                                        extra_context={'page_kwargs':seo.get_page_tags("password_change_done")}),
+    path('change-password/complete/',PasswordChangeDoneView.as_view(page_key="password_change_done"),
                                         name='password_change_done'),
 
     path('', include('mck_website.urls', namespace='vlr_website')),
@@ -1,11 +1,16 @@
 from random import randint
 
-from django.template import Template
-from django.template.loader import render_to_string
 from django.utils.text import slugify
 
 from .layout import Div, Field, LayoutObject, TemplateNameMixin
-from .utils import TEMPLATE_PACK, flatatt, render_field
+from .utils import (
+    TEMPLATE_PACK,
+    flatatt,
+    render_field,
+    render_template_string,
+    render_wrapper,
+    resolve_template,
+)
 
 
 class PrependedAppendedText(Field):
@@ -122,7 +127,7 @@ class FormActions(LayoutObject):
         template = self.get_template_name(template_pack)
         context.update({"formactions": self, "fields_output": html})
 
-        return render_to_string(template, context.flatten())
+        return resolve_template(template, template_pack).render(context.flatten())
 
 
 class InlineCheckboxes(Field):
@@ -287,11 +292,11 @@ class StrictButton(TemplateNameMixin):
         self.flat_attrs = flatatt(kwargs)
 
     def render(self, form, form_style, context, template_pack=TEMPLATE_PACK, **kwargs):
-        self.content = Template(str(self.content)).render(context)
+        self.content = render_template_string(self.content, context)
         template = self.get_template_name(template_pack)
         context.update({"button": self})
 
-        return render_to_string(template, context.flatten())
+        return resolve_template(template, template_pack).render(context.flatten())
 
 
 class Container(Div):
@@ -375,7 +380,7 @@ class Tab(Container):
         with active if needed.
         """
         link_template = self.link_template % template_pack
-        return render_to_string(link_template, {"link": self})
+        return resolve_template(link_template, template_pack).render({"link": self})
 
 
 class TabHolder(ContainerHolder):
@@ -401,7 +406,7 @@ class TabHolder(ContainerHolder):
 
         context.update({"tabs": self, "links": links, "content": content})
         template = self.get_template_name(template_pack)
-        return render_to_string(template, context.flatten())
+        return resolve_template(template, template_pack).render(context.flatten())
 
 
 class AccordionGroup(Container):
@@ -452,7 +457,7 @@ class Accordion(ContainerHolder):
         template = self.get_template_name(template_pack)
         context.update({"accordion": self, "content": content})
 
-        return render_to_string(template, context.flatten())
+        return resolve_template(template, template_pack).render(context.flatten())
 
 
 class Alert(Div):
@@ -478,7 +483,7 @@ class Alert(Div):
         template = self.get_template_name(template_pack)
         context.update({"alert": self, "content": self.content, "dismiss": self.dismiss})
 
-        return render_to_string(template, context.flatten())
+        return resolve_template(template, template_pack).render(context.flatten())
 
 
 class UneditableField(Field):
@@ -559,4 +564,4 @@ class Modal(LayoutObject):
         fields = self.get_rendered_fields(form, form_style, context, template_pack, **kwargs)
         template = self.get_template_name(template_pack)
 
-        return render_to_string(template, {"modal": self, "fields": fields})
+        return render_wrapper(template, {"modal": self}, "fields", fields, self.get_static_key())
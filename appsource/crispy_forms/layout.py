@@ -1,9 +1,15 @@
-from django.template import Template
-from django.template.loader import render_to_string
 from django.utils.html import conditional_escape
 from django.utils.text import slugify
 
-from crispy_forms.utils import TEMPLATE_PACK, flatatt, get_template_pack, render_field
+from crispy_forms.utils import (
+    TEMPLATE_PACK,
+    flatatt,
+    get_template_pack,
+    render_field,
+    render_template_string,
+    render_wrapper,
+    resolve_template,
+)
 
 
 class TemplateNameMixin:
@@ -93,6 +99,20 @@ class LayoutObject(TemplateNameMixin):
 
         return pointers
 
+    def get_static_key(self):
+        """
+        The attributes of the layout object but its fields, the cache key of its compiled
+        html (see `render_wrapper`), None when they cannot be hashed
+        """
+        attributes = tuple(
+            sorted((name, value) for name, value in vars(self).items() if name not in ("fields", "bound_fields"))
+        )
+        try:
+            hash(attributes)
+        except TypeError:
+            return None
+        return (self.__class__,) + attributes
+
     def get_rendered_fields(self, form, form_style, context, template_pack=TEMPLATE_PACK, **kwargs):
         return "".join(
             render_field(field, form, form_style, context, template_pack=template_pack, **kwargs)
@@ -188,7 +208,7 @@ class ButtonHolder(LayoutObject):
         template = self.get_template_name(template_pack)
         context.update({"buttonholder": self, "fields_output": html})
 
-        return render_to_string(template, context.flatten())
+        return resolve_template(template, template_pack).render(context.flatten())
 
 
 class BaseInput(TemplateNameMixin):
@@ -244,11 +264,11 @@ class BaseInput(TemplateNameMixin):
         Renders an `<input />` if container is used as a Layout object.
         Input button value can be a variable in context.
         """
-        self.value = Template(str(self.value)).render(context)
+        self.value = render_template_string(self.value, context)
         template = self.get_template_name(template_pack)
         context.update({"input": self})
 
-        return render_to_string(template, context.flatten())
+        return resolve_template(template, template_pack).render(context.flatten())
 
 
 class Submit(BaseInput):
@@ -565,11 +585,14 @@ class Fieldset(LayoutObject):
 
         legend = ""
         if self.legend:
-            legend = "%s" % Template(str(self.legend)).render(context)
+            legend = "%s" % render_template_string(self.legend, context)
 
         template = self.get_template_name(template_pack)
-        return render_to_string(
-            template, {"fieldset": self, "legend": legend, "fields": fields, "form_style": form_style}
+        key = self.get_static_key()
+        if key is not None:
+            key += (legend, form_style)
+        return render_wrapper(
+            template, {"fieldset": self, "legend": legend, "form_style": form_style}, "fields", fields, key
         )
 
 
@@ -612,7 +635,7 @@ class MultiField(LayoutObject):
         template = self.get_template_name(template_pack)
         context.update({"multifield": self, "fields_output": fields_output})
 
-        return render_to_string(template, context.flatten())
+        return resolve_template(template, template_pack).render(context.flatten())
 
 
 class Div(LayoutObject):
@@ -686,7 +709,7 @@ class Div(LayoutObject):
         fields = self.get_rendered_fields(form, form_style, context, template_pack, **kwargs)
 
         template = self.get_template_name(template_pack)
-        return render_to_string(template, {"div": self, "fields": fields})
+        return render_wrapper(template, {"div": self}, "fields", fields, self.get_static_key())
 
 
 class Row(Div):
@@ -810,7 +833,7 @@ class HTML:
         self.html = html
 
     def render(self, form, form_style, context, template_pack=TEMPLATE_PACK, **kwargs):
-        return Template(str(self.html)).render(context)
+        return render_template_string(self.html, context)
 
 
 class Field(LayoutObject):
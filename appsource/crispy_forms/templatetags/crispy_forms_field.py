@@ -1,52 +1,49 @@
-from django import forms, template
-from django.conf import settings
-from django.template import Context, loader
+from django import template
+from django.template import Context
 
-from crispy_forms.utils import get_template_pack
+from crispy_forms.utils import get_template_pack, get_widget_css_class, get_widget_kinds, resolve_template
 
 register = template.Library()
 
 
 @register.filter
 def is_checkbox(field):
-    return isinstance(field.field.widget, forms.CheckboxInput)
+    return "checkbox" in get_widget_kinds(field.field.widget.__class__)
 
 
 @register.filter
 def is_password(field):
-    return isinstance(field.field.widget, forms.PasswordInput)
+    return "password" in get_widget_kinds(field.field.widget.__class__)
 
 
 @register.filter
 def is_radioselect(field):
-    return isinstance(field.field.widget, forms.RadioSelect) and not isinstance(
-        field.field.widget, forms.CheckboxSelectMultiple
-    )
+    return "radioselect" in get_widget_kinds(field.field.widget.__class__)
 
 
 @register.filter
 def is_select(field):
-    return isinstance(field.field.widget, forms.Select)
+    return "select" in get_widget_kinds(field.field.widget.__class__)
 
 
 @register.filter
 def is_checkboxselectmultiple(field):
-    return isinstance(field.field.widget, forms.CheckboxSelectMultiple)
+    return "checkboxselectmultiple" in get_widget_kinds(field.field.widget.__class__)
 
 
 @register.filter
 def is_file(field):
-    return isinstance(field.field.widget, forms.FileInput)
+    return "file" in get_widget_kinds(field.field.widget.__class__)
 
 
 @register.filter
 def is_clearable_file(field):
-    return isinstance(field.field.widget, forms.ClearableFileInput)
+    return "clearable_file" in get_widget_kinds(field.field.widget.__class__)
 
 
 @register.filter
 def is_multivalue(field):
-    return isinstance(field.field.widget, forms.MultiWidget)
+    return "multivalue" in get_widget_kinds(field.field.widget.__class__)
 
 
 @register.filter
@@ -95,11 +92,8 @@ class CrispyFieldNode(template.Node):
         if isinstance(attrs, dict):
             attrs = [attrs] * len(widgets)
 
-        converters = getattr(settings, "CRISPY_CLASS_CONVERTERS", {})
-
         for widget, attr in zip(widgets, attrs):
-            class_name = widget.__class__.__name__.lower()
-            class_name = converters.get(class_name, class_name)
+            class_name = get_widget_css_class(widget.__class__)
             css_class = widget.attrs.get("class", "")
             if css_class:
                 if css_class.find(class_name) == -1:
@@ -156,7 +150,7 @@ def crispy_addon(field, append="", prepend="", form_show_labels=True):
     """
     if field:
         context = Context({"field": field, "form_show_errors": True, "form_show_labels": form_show_labels})
-        template = loader.get_template("%s/layout/prepended_appended_text.html" % get_template_pack())
+        template = resolve_template("%s/layout/prepended_appended_text.html", get_template_pack())
         context["crispy_prepended_text"] = prepend
         context["crispy_appended_text"] = append
 
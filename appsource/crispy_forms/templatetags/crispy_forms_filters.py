@@ -1,25 +1,20 @@
-from functools import lru_cache
-
 from django import template
 from django.conf import settings
 from django.forms import boundfield
 from django.forms.formsets import BaseFormSet
 from django.template import Context
-from django.template.loader import get_template
 from django.utils.safestring import mark_safe
 
 from crispy_forms.exceptions import CrispyError
-from crispy_forms.utils import TEMPLATE_PACK, flatatt
+from crispy_forms.utils import TEMPLATE_PACK, flatatt, resolve_template
 
 
-@lru_cache()
 def uni_formset_template(template_pack=TEMPLATE_PACK):
-    return get_template("%s/uni_formset.html" % template_pack)
+    return resolve_template("%s/uni_formset.html", template_pack)
 
 
-@lru_cache()
 def uni_form_template(template_pack=TEMPLATE_PACK):
-    return get_template("%s/uni_form.html" % template_pack)
+    return resolve_template("%s/uni_form.html", template_pack)
 
 
 register = template.Library()
@@ -77,10 +72,10 @@ def as_crispy_errors(form, template_pack=TEMPLATE_PACK):
         {{ form|as_crispy_errors:"bootstrap4" }}
     """
     if isinstance(form, BaseFormSet):
-        template = get_template("%s/errors_formset.html" % template_pack)
+        template = resolve_template("%s/errors_formset.html", template_pack)
         c = Context({"formset": form}).flatten()
     else:
-        template = get_template("%s/errors.html" % template_pack)
+        template = resolve_template("%s/errors.html", template_pack)
         c = Context({"form": form}).flatten()
 
     return template.render(c)
@@ -115,8 +110,8 @@ def as_crispy_field(field, template_pack=TEMPLATE_PACK, label_class="", field_cl
         attributes.update(helper.get_attributes(template_pack))
         template_path = helper.field_template
     if not template_path:
-        template_path = "%s/field.html" % template_pack
-    template = get_template(template_path)
+        template_path = "%s/field.html"
+    template = resolve_template(template_path, template_pack)
 
     c = Context(attributes).flatten()
     return template.render(c)
@@ -1,12 +1,9 @@
-from functools import lru_cache
-
 from django import template
 from django.conf import settings
 from django.forms.formsets import BaseFormSet
-from django.template.loader import get_template
 
 from crispy_forms.helper import FormHelper
-from crispy_forms.utils import TEMPLATE_PACK, get_template_pack
+from crispy_forms.utils import TEMPLATE_PACK, get_template_pack, resolve_template
 
 register = template.Library()
 
@@ -187,14 +184,12 @@ class BasicNode(template.Node):
         return response_dict
 
 
-@lru_cache()
 def whole_uni_formset_template(template_pack=TEMPLATE_PACK):
-    return get_template("%s/whole_uni_formset.html" % template_pack)
+    return resolve_template("%s/whole_uni_formset.html", template_pack)
 
 
-@lru_cache()
 def whole_uni_form_template(template_pack=TEMPLATE_PACK):
-    return get_template("%s/whole_uni_form.html" % template_pack)
+    return resolve_template("%s/whole_uni_form.html", template_pack)
 
 
 class CrispyFormNode(BasicNode):
@@ -202,7 +197,7 @@ class CrispyFormNode(BasicNode):
         c = self.get_render(context).flatten()
 
         if self.actual_helper is not None and getattr(self.actual_helper, "template", False):
-            template = get_template(self.actual_helper.template)
+            template = resolve_template(self.actual_helper.template, self.template_pack)
         else:
             if c["is_formset"]:
                 template = whole_uni_formset_template(self.template_pack)
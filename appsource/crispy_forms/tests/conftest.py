@@ -35,3 +35,16 @@ def check_template_pack(node, template_pack):
     if mark:
         if template_pack not in mark.args:
             pytest.skip("Requires %s template pack" % " or ".join(mark.args))
+
+
+def pytest_configure(config):
+    config.addinivalue_line("markers", "benchmark: timings, skipped unless selected with -m benchmark")
+
+
+def pytest_collection_modifyitems(config, items):
+    if "benchmark" in (config.getoption("markexpr") or ""):
+        return
+    skip_benchmark = pytest.mark.skip(reason="Benchmark, run with -m benchmark")
+    for item in items:
+        if item.get_closest_marker("benchmark"):
+            item.add_marker(skip_benchmark)
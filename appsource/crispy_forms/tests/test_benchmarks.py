@@ -0,0 +1,149 @@
+"""
+Benchmarks of the layout rendering, skipped unless selected, run them with
+``pytest -m benchmark -s`` to see the timings
+"""
+import timeit
+from pathlib import Path
+
+import pytest
+from django import forms
+from django.template import Context, Template
+from django.utils.autoreload import file_changed
+
+from crispy_forms.helper import FormHelper
+from crispy_forms.layout import HTML, ButtonHolder, Column, Div, Field, Fieldset, Layout, Row, Submit
+from crispy_forms.templatetags.crispy_forms_filters import as_crispy_errors, as_crispy_field
+from crispy_forms.utils import _templates, clear_template_cache, get_template_pack, render_field, resolve_template
+
+FIELD_COUNT = 32
+
+
+class BenchmarkForm(forms.Form):
+    """
+    A form as large as the admin create / update pages, one column per field
+    """
+
+    def __init__(self, *args, **kwargs):
+        field_kwargs = {"template": kwargs.pop("field_template")} if "field_template" in kwargs else {}
+        super().__init__(*args, **kwargs)
+        for index in range(FIELD_COUNT):
+            self.fields["field_%s" % index] = forms.CharField(label="Field %s" % index, required=index % 2 == 0)
+
+        self.helper = FormHelper(self)
+        self.helper.form_tag = False
+        self.helper.layout = Layout(
+            Fieldset(
+                "",
+                Row(*[Column(Field(name, **field_kwargs), css_class="col-12") for name in self.fields]),
+            ),
+            ButtonHolder(
+                Div(
+                    HTML('<a class="btn btn-secondary me-3" href="#" onclick="history.back()">CANCEL</a>'),
+                    Submit("create_button", "SAVE", css_class="btn btn-lg btn-primary"),
+                    css_class="d-flex text-right justify-content-end pt-10 col-12",
+                ),
+                css_class="row col-12 pe-5",
+            ),
+        )
+
+
+def render_benchmark_form(**kwargs):
+    template = Template("{% load crispy_forms_tags %}{% crispy form %}")
+    return template.render(Context({"form": BenchmarkForm(**kwargs)}))
+
+
+def best_time(function, number=10, repeat=3):
+    return min(timeit.repeat(function, number=number, repeat=repeat)) / number
+
+
+def benchmark(settings, name, **kwargs):
+    """
+    Seconds per rendering of the form without and with the compiled layouts
+    """
+    timings = {}
+    for compiled in (False, True):
+        settings.CRISPY_COMPILED_LAYOUTS = compiled
+        render_benchmark_form(**kwargs)
+        timings[compiled] = best_time(lambda: render_benchmark_form(**kwargs))
+    print(
+        "\n%s (%s fields): %.3f ms, compiled %.3f ms (x%.1f)"
+        % (name, FIELD_COUNT, timings[False] * 1000, timings[True] * 1000, timings[False] / timings[True])
+    )
+    return timings
+
+
+def test_compiled_layout_renders_the_same(settings):
+    settings.CRISPY_COMPILED_LAYOUTS = False
+    expected = render_benchmark_form()
+    settings.CRISPY_COMPILED_LAYOUTS = True
+    assert render_benchmark_form() == expected
+    # the second rendering reads the compiled html
+    assert render_benchmark_form() == expected
+
+
+@pytest.mark.benchmark
+def test_benchmark_layout(settings):
+    # the fields render a name only, what is left is the work of the layout objects
+    benchmark(settings, "layout", field_template="benchmark_field.html")
+
+
+@pytest.mark.benchmark
+def test_benchmark_form(settings):
+    benchmark(settings, "form")
+
+
+def benchmark_per_field(name, render):
+    """
+    Seconds per field of `render(form, field_name)` looking up the templates every time
+    and from the template cache
+    """
+    form = BenchmarkForm(data={})
+    form.is_valid()
+    # set by the helper when it renders the layout
+    form.crispy_field_template = None
+
+    def render_fields(cached):
+        for field_name in form.fields:
+            if not cached:
+                clear_template_cache()
+            render(form, field_name)
+
+    timings = {}
+    for cached in (False, True):
+        render_fields(cached)
+        timings[cached] = best_time(lambda: render_fields(cached)) / FIELD_COUNT
+    print(
+        "\n%s per field: %.1f us, cached templates %.1f us (x%.1f)"
+        % (name, timings[False] * 1e6, timings[True] * 1e6, timings[False] / timings[True])
+    )
+    return timings
+
+
+@pytest.mark.benchmark
+def test_benchmark_render_field():
+    template_pack = get_template_pack()
+    benchmark_per_field(
+        "render_field",
+        lambda form, field_name: render_field(field_name, form, "", Context(), template_pack=template_pack),
+    )
+
+
+@pytest.mark.benchmark
+def test_benchmark_as_crispy_field():
+    template_pack = get_template_pack()
+    benchmark_per_field("as_crispy_field", lambda form, field_name: as_crispy_field(form[field_name], template_pack))
+
+
+@pytest.mark.benchmark
+def test_benchmark_as_crispy_errors():
+    template_pack = get_template_pack()
+    benchmark_per_field("as_crispy_errors", lambda form, field_name: as_crispy_errors(form, template_pack))
+
+
+def test_template_cache_cleared_on_template_change():
+    template_pack = get_template_pack()
+    template = resolve_template("%s/field.html", template_pack)
+    assert resolve_template("%s/field.html", template_pack) is template
+    file_changed.send(sender=None, file_path=Path("templates", template_pack, "field.html"))
+    assert not _templates
+    assert resolve_template("%s/field.html", template_pack) is not template
@@ -2,11 +2,16 @@ import logging
 import sys
 from functools import lru_cache
 
+from django import forms
 from django.conf import settings
+from django.core.signals import setting_changed
+from django.dispatch import receiver
 from django.forms.utils import flatatt as _flatatt
-from django.template import Context
+from django.template import Context, Template
 from django.template.loader import get_template
+from django.utils.autoreload import file_changed
 from django.utils.functional import SimpleLazyObject
+from django.utils.safestring import mark_safe
 
 from .base import KeepContext
 
@@ -17,12 +22,152 @@ def get_template_pack():
 
 TEMPLATE_PACK = SimpleLazyObject(get_template_pack)
 
+# Widget kinds the field templates choose their markup by, see `get_widget_kinds`
+WIDGET_KINDS = (
+    ("checkbox", forms.CheckboxInput),
+    ("password", forms.PasswordInput),
+    ("radioselect", forms.RadioSelect),
+    ("select", forms.Select),
+    ("checkboxselectmultiple", forms.CheckboxSelectMultiple),
+    ("file", forms.FileInput),
+    ("clearable_file", forms.ClearableFileInput),
+    ("multivalue", forms.MultiWidget),
+)
+
+_templates = {}
+_widget_kinds = {}
+_widget_css_classes = {}
+
+
+def resolve_template(template_name, template_pack=TEMPLATE_PACK):
+    """
+    Returns the template `template_name` ("%s" is replaced by the template pack), looked up
+    once per template name and template pack
+    """
+    key = (template_name, str(template_pack))
+    template = _templates.get(key)
+    if template is None:
+        if "%s" in template_name:
+            template = get_template(template_name % key[1])
+        else:
+            template = get_template(template_name)
+        _templates[key] = template
+    return template
+
+
+def get_widget_kinds(widget_class):
+    """
+    Returns the kinds of `WIDGET_KINDS` a widget class is of, worked out once per class
+    """
+    kinds = _widget_kinds.get(widget_class)
+    if kinds is None:
+        kinds = {kind for kind, kind_class in WIDGET_KINDS if issubclass(widget_class, kind_class)}
+        if "checkboxselectmultiple" in kinds:
+            # CheckboxSelectMultiple is a RadioSelect to Django, not to the templates
+            kinds.discard("radioselect")
+        kinds = frozenset(kinds)
+        _widget_kinds[widget_class] = kinds
+    return kinds
+
+
+def get_widget_css_class(widget_class):
+    """
+    Returns the CSS class added to the widgets of a class, its lowercased name unless
+    settings.CRISPY_CLASS_CONVERTERS maps it to another
+    """
+    css_class = _widget_css_classes.get(widget_class)
+    if css_class is None:
+        class_name = widget_class.__name__.lower()
+        css_class = getattr(settings, "CRISPY_CLASS_CONVERTERS", {}).get(class_name, class_name)
+        _widget_css_classes[widget_class] = css_class
+    return css_class
+
+
+def clear_template_cache():
+    _templates.clear()
+    _widget_kinds.clear()
+    _widget_css_classes.clear()
+
+
+# Wrapped in the html of the compiled layout objects instead of their fields, the
+# "<" tells apart the templates escaping their fields, those are never compiled
+FIELDS_PLACEHOLDER = "<crispy-compiled-fields/>"
+WRAPPER_CACHE_SIZE = 1024
+
+_wrappers = {}
+
+
+def compiled_layouts():
+    return getattr(settings, "CRISPY_COMPILED_LAYOUTS", False)
+
+
+@lru_cache(maxsize=1024)
+def template_from_string(template_string):
+    return Template(template_string)
+
+
+def render_template_string(template_string, context):
+    """
+    Renders a template string of a layout object (`HTML`, a `Fieldset` legend, a button value)
+    compiling it once, text without template syntax is returned as it is
+    """
+    template_string = str(template_string)
+    if not compiled_layouts():
+        return Template(template_string).render(context)
+    if "{" not in template_string:
+        return mark_safe(template_string)
+    return template_from_string(template_string).render(context)
+
+
+def render_wrapper(template, context, fields_name, fields, key):
+    """
+    Renders `template` with `context` and the html of the fields as `fields_name`
+
+    In the compiled mode (settings.CRISPY_COMPILED_LAYOUTS) the html around the fields is
+    rendered once per template and `key`, the attributes of the layout object the template
+    reads, and reused by every form rendering the same layout object.
+    """
+    if key is None or not fields or not compiled_layouts():
+        return resolve_template(template).render(dict(context, **{fields_name: fields}))
+
+    key = (template, fields_name) + key
+    wrapper = _wrappers.get(key)
+    if wrapper is None:
+        html = resolve_template(template).render(dict(context, **{fields_name: FIELDS_PLACEHOLDER}))
+        wrapper = tuple(html.split(FIELDS_PLACEHOLDER))
+        if len(_wrappers) >= WRAPPER_CACHE_SIZE:
+            _wrappers.clear()
+        _wrappers[key] = wrapper
+
+    if len(wrapper) != 2:
+        # the template does not output the fields once as they are
+        return resolve_template(template).render(dict(context, **{fields_name: fields}))
+    return mark_safe(wrapper[0] + fields + wrapper[1])
+
+
+def clear_compiled_layouts():
+    _wrappers.clear()
+    template_from_string.cache_clear()
+    _cached_flatatt.cache_clear()
+
+
+@receiver(setting_changed)
+def clear_caches_on_setting_changed(setting, **kwargs):
+    if setting == "TEMPLATES" or setting.startswith("CRISPY_"):
+        clear_template_cache()
+        clear_compiled_layouts()
+
+
+@receiver(file_changed)
+def clear_caches_on_template_changed(file_path, **kwargs):
+    # The development server reloads the templates instead of restarting
+    if file_path.suffix != ".py":
+        clear_template_cache()
+        clear_compiled_layouts()
+
 
-# By caching we avoid loading the template every time render_field
-# is called without a template
-@lru_cache()
 def default_field_template(template_pack=TEMPLATE_PACK):
-    return get_template("%s/field.html" % template_pack)
+    return resolve_template("%s/field.html", template_pack)
 
 
 def render_field(  # noqa: C901
@@ -114,9 +259,9 @@ def render_field(  # noqa: C901
                 if form.crispy_field_template is None:
                     template = default_field_template(template_pack)
                 else:  # FormHelper.field_template set
-                    template = get_template(form.crispy_field_template)
+                    template = resolve_template(form.crispy_field_template, template_pack)
             else:
-                template = get_template(template)
+                template = resolve_template(template, template_pack)
 
             # We save the Layout object's bound fields in the layout object's `bound_fields` list
             if layout_object is not None:
@@ -146,10 +291,24 @@ def flatatt(attrs):
 
     Passed attributes are redirected to `django.forms.utils.flatatt()`
     with replaced "_" (underscores) by "-" (dashes) in their names.
+
+    In the compiled mode the string of the same attributes is built once.
     """
+    if compiled_layouts():
+        # the type is part of the key, True and 1 are rendered differently
+        items = tuple((k, type(v), v) for k, v in attrs.items())
+        try:
+            return _cached_flatatt(items)
+        except TypeError:
+            pass
     return _flatatt({k.replace("_", "-"): v for k, v in attrs.items()})
 
 
+@lru_cache(maxsize=1024)
+def _cached_flatatt(items):
+    return _flatatt({k.replace("_", "-"): v for k, _type, v in items})
+
+
 def render_crispy_form(form, helper=None, context=None):
     """
     Renders a form and returns its HTML output.
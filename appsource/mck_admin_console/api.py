@@ -1,9 +1,8 @@
 import sys
-from phonenumber_field.phonenumber import PhoneNumber
-from django.urls import reverse
-from django.forms.models import model_to_dict
 from config import app_utils
+from config import app_rows
 from config import app_logger
+from config import app_reference
 from mck_auth import api as auth_api
 from mck_admin_console.models import *
 
@@ -19,34 +18,12 @@ def faq_category_load_data(request, table_data):
     error_msg = 'Internal Server Error'
     fResult = list()
     try:
-        queryset = FAQCategory.objects.exclude(datamode='D').order_by('-updated_on')
+        queryset = FAQCategory.objects.live().latest_first()
+        renderer = app_rows.RowRenderer(queryset, table_data, edit_url='mck_admin_console:mck_faq_category_update')
         qs, total_records, total_display_records = app_utils.method_for_datatable_operations(
-            request, queryset)
-
-        final_data = list()
-        for qs_instance in qs:
-            qs_data = model_to_dict(qs_instance)
-            data = list()
-            edit_url = reverse('mck_admin_console:mck_faq_category_update', args=[qs_data['id']])
-
-            for column in table_data['columns']:
-                if column['column_name'] == "datamode":
-                    data.append('<div class="text-success">'+qs_instance.get_datamode_display()+'</div>')
-                    data.append('<div class="text-end"><a href="'+edit_url+'" class="text-primary pe-2 ps-2">Edit</a>')
-                    # if qs_instance.datamode == "A":
-                    #     data.append('<div class="text-success">'+qs_instance.get_datamode_display()+'</div>')
-                    #     data.append('<div class="text-end"><a href="'+edit_url+'" class="text-primary pe-2 ps-2">Edit</a> | <a href="javascript:void()" class="text-danger ps-2" onclick="delete_object('+str(qs_data['id'])+')">Inactivate</a></div>')
-                    # else:
-                    #     data.append('<div class="text-danger">'+qs_instance.get_datamode_display()+'</div>')
-                    #     data.append('<div class="text-end"><a href="'+edit_url+'" class="text-primary pe-2 ps-2">Edit</a> | <a href="javascript:void()" class="text-success ps-2" onclick="delete_object('+str(qs_data['id'])+')">Activate</a></div>')
-                else:
-                    if isinstance(qs_data.get(column['column_name']), PhoneNumber):
-                        data.append(qs_data.get(column['column_name']).national_number)
-                    elif isinstance(qs_data.get(column['column_name']), models.ImageField):
-                        pass
-                    else:
-                        data.append(qs_data.get(column['column_name'], "-"))
-            final_data.append(data)
+            request, renderer.queryset)
+
+        final_data = renderer.render(qs)
         fResult = app_utils.final_dict(request, total_records, total_display_records, final_data)
 
         result, msg = True, success_msg
@@ -137,34 +114,12 @@ def faq_load_data(request, table_data):
     error_msg = 'Internal Server Error'
     fResult = list()
     try:
-        queryset = FAQ.objects.exclude(datamode='D').order_by('-updated_on')
+        queryset = FAQ.objects.live().latest_first()
+        renderer = app_rows.RowRenderer(queryset, table_data, edit_url='mck_admin_console:mck_faq_update')
         qs, total_records, total_display_records = app_utils.method_for_datatable_operations(
-            request, queryset)
-
-        final_data = list()
-        for qs_instance in qs:
-            qs_data = model_to_dict(qs_instance)
-            data = list()
-            edit_url = reverse('mck_admin_console:mck_faq_update', args=[qs_data['id']])
-
-            for column in table_data['columns']:
-                if column['column_name'] == "datamode":
-                    if qs_instance.datamode == "A":
-                        data.append('<div class="text-success">'+qs_instance.get_datamode_display()+'</div>')
-                        data.append('<div class="text-end"><a href="'+edit_url+'" class="text-primary pe-2 ps-2">Edit</a> | <a href="javascript:void()" class="text-danger ps-2" onclick="delete_object('+str(qs_data['id'])+')">Inactivate</a></div>')
-                    else:
-                        data.append('<div class="text-danger">'+qs_instance.get_datamode_display()+'</div>')
-                        data.append('<div class="text-end"><a href="'+edit_url+'" class="text-primary pe-2 ps-2">Edit</a> | <a href="javascript:void()" class="text-success ps-2" onclick="delete_object('+str(qs_data['id'])+')">Activate</a></div>')
-                elif column['column_name'] == "faqcategory":
-                    data.append(qs_instance.faqcategory.name)
-                else:
-                    if isinstance(qs_data.get(column['column_name']), PhoneNumber):
-                        data.append(qs_data.get(column['column_name']).national_number)
-                    elif isinstance(qs_data.get(column['column_name']), models.ImageField):
-                        pass
-                    else:
-                        data.append(qs_data.get(column['column_name'], "-"))
-            final_data.append(data)
+            request, renderer.queryset)
+
+        final_data = renderer.render(qs)
         fResult = app_utils.final_dict(request, total_records, total_display_records, final_data)
 
         result, msg = True, success_msg
@@ -256,34 +211,12 @@ def area_load_data(request, table_data):
     error_msg = 'Internal Server Error'
     fResult = list()
     try:
-        queryset = Area.objects.exclude(datamode='D').order_by('-updated_on')
+        queryset = Area.objects.live().latest_first()
+        renderer = app_rows.RowRenderer(queryset, table_data, edit_url='mck_admin_console:mck_area_update')
         qs, total_records, total_display_records = app_utils.method_for_datatable_operations(
-            request, queryset)
-
-        final_data = list()
-        for qs_instance in qs:
-            qs_data = model_to_dict(qs_instance)
-            data = list()
-            edit_url = reverse('mck_admin_console:mck_area_update', args=[qs_data['id']])
-
-            for column in table_data['columns']:
-                if column['column_name'] == "datamode":
-                    if qs_instance.datamode == "A":
-                        data.append('<div class="text-success">'+qs_instance.get_datamode_display()+'</div>')
-                        data.append('<div class="text-end"><a href="'+edit_url+'" class="text-primary pe-2 ps-2">Edit</a> | <a href="javascript:void()" class="text-danger ps-2" onclick="delete_object('+str(qs_data['id'])+')">Inactivate</a></div>')
-                    else:
-                        data.append('<div class="text-danger">'+qs_instance.get_datamode_display()+'</div>')
-                        data.append('<div class="text-end"><a href="'+edit_url+'" class="text-primary pe-2 ps-2">Edit</a> | <a href="javascript:void()" class="text-success ps-2" onclick="delete_object('+str(qs_data['id'])+')">Activate</a></div>')
-                elif column['column_name'] == "county":
-                    data.append(qs_instance.county.name)
-                else:
-                    if isinstance(qs_data.get(column['column_name']), PhoneNumber):
-                        data.append(qs_data.get(column['column_name']).national_number)
-                    elif isinstance(qs_data.get(column['column_name']), models.ImageField):
-                        pass
-                    else:
-                        data.append(qs_data.get(column['column_name'], "-"))
-            final_data.append(data)
+            request, renderer.queryset)
+
+        final_data = renderer.render(qs)
         fResult = app_utils.final_dict(request, total_records, total_display_records, final_data)
 
         result, msg = True, success_msg
@@ -379,37 +312,12 @@ def testimonial_load_data(request, table_data):
     error_msg = 'Internal Server Error'
     fResult = list()
     try:
-        queryset = Testimonial.objects.exclude(datamode='D').order_by('-updated_on')
+        queryset = Testimonial.objects.live().latest_first()
+        renderer = app_rows.RowRenderer(queryset, table_data, edit_url='mck_admin_console:mck_testimonial_update')
         qs, total_records, total_display_records = app_utils.method_for_datatable_operations(
-            request, queryset)
-
-        final_data = list()
-        for qs_instance in qs:
-            qs_data = model_to_dict(qs_instance)
-            data = list()
-            edit_url = reverse('mck_admin_console:mck_testimonial_update', args=[qs_data['id']])
-
-            for column in table_data['columns']:
-                if column['column_name'] == "datamode":
-                    if qs_instance.datamode == "A":
-                        data.append('<div class="text-success">'+qs_instance.get_datamode_display()+'</div>')
-                        data.append('<div class="text-end"><a href="'+edit_url+'" class="text-primary pe-2 ps-2">Edit</a> | <a href="javascript:void()" class="text-danger ps-2" onclick="delete_object('+str(qs_data['id'])+')">Inactivate</a></div>')
-                    else:
-                        data.append('<div class="text-danger">'+qs_instance.get_datamode_display()+'</div>')
-                        data.append('<div class="text-end"><a href="'+edit_url+'" class="text-primary pe-2 ps-2">Edit</a> | <a href="javascript:void()" class="text-success ps-2" onclick="delete_object('+str(qs_data['id'])+')">Activate</a></div>')
-                elif column["column_name"] == "photo":
-                    if qs_instance.photo:
-                        data.append(f'<a href="{qs_instance.photo.url}" target="_blank">View photo</a>')
-                    else:
-                        data.append("No photo Uploaded")
-                else:
-                    if isinstance(qs_data.get(column['column_name']), PhoneNumber):
-                        data.append(qs_data.get(column['column_name']).national_number)
-                    elif isinstance(qs_data.get(column['column_name']), models.ImageField):
-                        pass
-                    else:
-                        data.append(qs_data.get(column['column_name'], "-"))
-            final_data.append(data)
+            request, renderer.queryset)
+
+        final_data = renderer.render(qs)
         fResult = app_utils.final_dict(request, total_records, total_display_records, final_data)
 
         result, msg = True, success_msg
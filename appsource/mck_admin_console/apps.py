@@ -4,3 +4,7 @@ from django.apps import AppConfig
 class mckAdminConsoleConfig(AppConfig):
     default_auto_field = 'django.db.models.BigAutoField'
     name = 'mck_admin_console'
+
+    def ready(self):
+        # the dashboard counters receivers, connected for the scripts and the shell too
+        from config import app_stats  # noqa: F401
@@ -0,0 +1,53 @@
+# Indexes of the datamode / updated_on lists, see config/app_models.py
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('mck_admin_console', '0001_initial'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='area',
+            index=models.Index(fields=['datamode', '-updated_on'], name='area_dm_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='area',
+            index=models.Index(condition=models.Q(('datamode', 'D'), _negated=True), fields=['-updated_on'], name='area_live_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='county',
+            index=models.Index(fields=['datamode', '-updated_on'], name='county_dm_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='county',
+            index=models.Index(condition=models.Q(('datamode', 'D'), _negated=True), fields=['-updated_on'], name='county_live_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='faq',
+            index=models.Index(fields=['datamode', '-updated_on'], name='faq_dm_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='faq',
+            index=models.Index(condition=models.Q(('datamode', 'D'), _negated=True), fields=['-updated_on'], name='faq_live_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='faqcategory',
+            index=models.Index(fields=['datamode', '-updated_on'], name='faqcategory_dm_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='faqcategory',
+            index=models.Index(condition=models.Q(('datamode', 'D'), _negated=True), fields=['-updated_on'], name='faqcategory_live_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='testimonial',
+            index=models.Index(fields=['datamode', '-updated_on'], name='testimonial_dm_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='testimonial',
+            index=models.Index(condition=models.Q(('datamode', 'D'), _negated=True), fields=['-updated_on'], name='testimonial_live_idx'),
+        ),
+    ]
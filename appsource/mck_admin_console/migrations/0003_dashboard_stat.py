@@ -0,0 +1,34 @@
+# Materialized dashboard counters, see config/app_stats.py
+
+from django.db import migrations, models
+
+
+def rebuild_stats(apps, schema_editor):
+    from config import app_stats
+    app_stats.rebuild(apps)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('mck_admin_console', '0002_datamode_indexes'),
+        ('squarebox', '0004_datamode_indexes'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='DashboardStat',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('metric', models.CharField(help_text='See config/app_stats.py', max_length=50)),
+                ('key', models.CharField(blank=True, default='', help_text='Group of the metric, empty for the total', max_length=100)),
+                ('value', models.IntegerField(default=0)),
+                ('updated_on', models.DateTimeField(auto_now=True)),
+            ],
+            options={
+                'db_table': 'dashboard_stat',
+                'unique_together': {('metric', 'key')},
+            },
+        ),
+        migrations.RunPython(rebuild_stats, migrations.RunPython.noop),
+    ]
@@ -2,6 +2,7 @@ from django.db import models
 from phonenumber_field.modelfields import PhoneNumberField
 from multiselectfield import MultiSelectField
 from config import app_gv as gv
+from config.app_models import ActiveManager, datamode_indexes
 
 
 class FAQCategory(models.Model):
@@ -11,9 +12,11 @@ class FAQCategory(models.Model):
     created_on = models.DateTimeField(auto_now_add=True)
     updated_on = models.DateTimeField(auto_now=True)
     datamode = models.CharField(max_length=20, default='A', choices=gv.DATAMODE_CHOICES)
+    objects = ActiveManager()
     
     class Meta:
         db_table = 'faqcategory'
+        indexes = datamode_indexes('faqcategory')
 
     def __str__(self):
         return self.name
@@ -28,9 +31,11 @@ class FAQ(models.Model):
     created_on = models.DateTimeField(auto_now_add=True)
     updated_on = models.DateTimeField(auto_now=True)
     datamode = models.CharField(max_length=20, default='A', choices=gv.DATAMODE_CHOICES)
+    objects = ActiveManager()
     
     class Meta:
         db_table = 'faq'
+        indexes = datamode_indexes('faq')
 
     def __str__(self):
         return self.question
@@ -43,9 +48,11 @@ class County(models.Model):
     created_on = models.DateTimeField(auto_now_add=True)
     updated_on = models.DateTimeField(auto_now=True)
     datamode = models.CharField(max_length=20, default='A', choices=gv.DATAMODE_CHOICES)
+    objects = ActiveManager()
     
     class Meta:
         db_table = 'county'
+        indexes = datamode_indexes('county')
 
     def __str__(self):
         return self.name
@@ -63,9 +70,11 @@ class Area(models.Model):
     created_on = models.DateTimeField(auto_now_add=True)
     updated_on = models.DateTimeField(auto_now=True)
     datamode = models.CharField(max_length=20, default='A', choices=gv.DATAMODE_CHOICES)
+    objects = ActiveManager()
 
     class Meta:
         db_table = 'area'
+        indexes = datamode_indexes('area')
 
     def __str__(self):
         return self.name
@@ -83,9 +92,25 @@ class Testimonial(models.Model):
     created_on = models.DateTimeField(auto_now_add=True)
     updated_on = models.DateTimeField(auto_now=True)
     datamode = models.CharField(max_length=20, default='A', choices=gv.DATAMODE_CHOICES)
+    objects = ActiveManager()
 
     class Meta:
         db_table = 'testimonial'
+        indexes = datamode_indexes('testimonial')
 
     def __str__(self):
         return f"{self.name} - {self.area.name}"
+
+
+class DashboardStat(models.Model):
+    metric = models.CharField(max_length=50, help_text="See config/app_stats.py")
+    key = models.CharField(max_length=100, blank=True, default="", help_text="Group of the metric, empty for the total")
+    value = models.IntegerField(default=0)
+    updated_on = models.DateTimeField(auto_now=True)
+
+    class Meta:
+        db_table = 'dashboard_stat'
+        unique_together = ('metric', 'key')
+
+    def __str__(self):
+        return "{0} [{1}] = {2}".format(self.metric, self.key, self.value)
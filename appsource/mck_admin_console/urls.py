@@ -7,6 +7,7 @@ app_name = "mck_admin_console"
 urlpatterns = [
     path('', views.LandingPage.as_view(), name='mck_landing_page'),
     path('dashboard/', views.DashboardView.as_view(), name='mck_dashboard'),
+    path('metrics/', views.MetricsView.as_view(), name='mck_metrics'),
     
     path('faq_category/list/', views.FAQCategoryList.as_view(),name='mck_faq_category_list'),
     path('faq_category/create/', views.FAQCategoryCreateView.as_view(),name='mck_faq_category_create'),
@@ -5,7 +5,7 @@ import json
 import sys
 from django.shortcuts import render
 from django.views.generic import TemplateView
-from django.http import HttpResponse, JsonResponse, HttpResponseRedirect
+from django.http import HttpResponse, JsonResponse, HttpResponseRedirect, HttpResponseForbidden
 from django.urls import reverse
 from django.shortcuts import redirect
 from django.views.generic.base import RedirectView
@@ -13,6 +13,8 @@ from django.contrib.auth import logout as auth_logout
 from django.utils.decorators import method_decorator
 from django.contrib.auth.decorators import login_required
 from config import app_logger
+from config import app_metrics
+from config import app_stats
 from config import app_seo as seo
 from config import settings
 from mck_auth import build_table as bt
@@ -55,11 +57,12 @@ class DashboardView(TemplateView):
         context['page_kwargs'] = seo.get_page_tags("DashboardView")
         has_permission, accountuser = rv.validate_requested_user_function(request)
         if not has_permission: return render(request, "access_denied.html", context)
-        context["property"] = Property.objects.exclude(datamode='D').order_by('-updated_on')
-        context["property_type"] = PropertyType.objects.exclude(datamode='D').order_by('-updated_on')
-        context["property_images"] = PropertyImage.objects.exclude(datamode='D').order_by('-updated_on')
-        context["lead"] = Lead.objects.exclude(datamode='D').order_by('-updated_on')
-        context["maintenance"] = MaintenanceRequest.objects.exclude(datamode='D').order_by('-updated_on')
+        stats = app_stats.get_dashboard()
+        context["stats"] = stats
+        context["lead_series"] = stats['series']['lead.day']
+        context["lead_series_max"] = max([value for day, value in context["lead_series"]] + [1])
+        context["stat_groups"] = [(title, stats['groups'].get(metric, [])) for title, metric in app_stats.GROUP_TITLES]
+        context["recent"] = app_stats.get_recent()
 
         return render(request, self.template_name, context)
 
@@ -620,3 +623,16 @@ class TestimonialDeleteView(TemplateView):
             exc_type, exc_obj, exc_traceback = sys.exc_info()
             logger.error('Error at %s:%s' % (exc_traceback.tb_lineno, e))
         return render(request, template_name, context)
+
+
+@method_decorator(login_required(login_url=settings.LOGIN_REDIRECT_URL), name='dispatch')
+class MetricsView(TemplateView):
+    """
+    Function and request timings in Prometheus text format, staff only
+    """
+    @app_logger.functionlogs(log=LOG_NAME)
+    def get(self, request, *args, **kwargs):
+        has_permission, accountuser = rv.validate_requested_user_function(request)
+        if not has_permission or not request.user.is_staff:
+            return HttpResponseForbidden("Metrics are only available to admin users.")
+        return HttpResponse(app_metrics.prometheus_text(), content_type="text/plain; version=0.0.4; charset=utf-8")
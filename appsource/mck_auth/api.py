@@ -1,10 +1,10 @@
 import sys
-from phonenumber_field.phonenumber import PhoneNumber
-from django.urls import reverse
+from django.db import transaction
 from django.contrib.auth import authenticate, login
-from django.forms.models import model_to_dict
 from config import app_utils
+from config import app_rows
 from config import app_logger
+from mck_auth import permission_cache
 
 from mck_auth.models import *
 
@@ -14,8 +14,9 @@ logger = app_logger.createLogger(log_name)
 
 @app_logger.functionlogs(log=log_name)
 def get_request_accountuser(request):
+    accountuser = None
     try:
-        accountuser = AccountUser.objects.filter(user=request.user, is_current_account=True, datamode='A').first()
+        accountuser = permission_cache.get_accountuser(request)
     except Exception as e:
         exc_type, exc_obj, exc_traceback = sys.exc_info()
         logger.error('Error at %s:%s' % (exc_traceback.tb_lineno, e))
@@ -158,31 +159,12 @@ def role_load_data(request, table_data):
     fResult = list()
     try:
         queryset = AccountTypeRole.objects.exclude(account_type__code='mck').exclude(datamode='D').order_by('-updated_on')
+        renderer = app_rows.RowRenderer(queryset, table_data, edit_url='mck_auth:mck_role_update',
+                                        permission_url='mck_auth:mck_role_update_permission')
         qs, total_records, total_display_records = app_utils.method_for_datatable_operations(
-            request, queryset)
-
-        final_data = list()
-        for qs_instance in qs:
-            qs_data = model_to_dict(qs_instance)
-            data = list()
-            edit_url = reverse('mck_auth:mck_role_update', args=[qs_data['id']])
-            permission_url = reverse('mck_auth:mck_role_update_permission', args=[qs_data['id']])
-
-
-            for column in table_data['columns']:
-                if column['column_name'] == "datamode":
-                    if qs_instance.datamode == "A":
-                        data.append('<div class="text-success">'+qs_instance.get_datamode_display()+'</div>')
-                        data.append('<div class="text-end"><a href="'+edit_url+'" class="text-primary pe-2 ps-2">Edit</a> | <a href="javascript:void()" class="text-danger ps-2" onclick="delete_object('+str(qs_data['id'])+')">Inactivate</a></div>')
-                    else:
-                        data.append('<div class="text-danger">'+qs_instance.get_datamode_display()+'</div>')
-                        data.append('<div class="text-end"><a href="'+edit_url+'" class="text-primary pe-2 ps-2">Edit</a> | <a href="javascript:void()" class="text-success ps-2" onclick="delete_object('+str(qs_data['id'])+')">Activate</a></div>')
-                else:
-                    if column['column_name'] == "permissions":
-                        data.append('<div class=""><a href="'+permission_url+'" class="text-primary">Update Permission</a></div>')
-                    else:
-                        data.append(qs_data.get(column['column_name'], "-"))
-            final_data.append(data)
+            request, renderer.queryset)
+
+        final_data = renderer.render(qs)
         fResult = app_utils.final_dict(request, total_records, total_display_records, final_data)
 
         result, msg = True, success_msg
@@ -281,33 +263,7 @@ def role_premission_retrieve_data(request, id):
         role = AccountTypeRole.objects.exclude(account_type__code='mck').filter(id=id).first()
         if role:
             data['role'] = role
-
-            master_permissions = MasterPermission.objects.filter(datamode='A').order_by("id")
-            role_permission = dict()
-
-            for mp in master_permissions:
-
-                if mp.app_name not in role_permission:
-                    role_permission[mp.app_name] = dict()
-                    role_permission[mp.app_name]["name"] = mp.app_name.replace("mck_", "").upper()
-                    role_permission[mp.app_name]["module"] = dict()
-
-                if mp.module_name not in role_permission[mp.app_name]["module"]:
-                    module_obj = dict()
-                    role_permission[mp.app_name]["module"][mp.module_name] = dict()
-                    role_permission[mp.app_name]["module"][mp.module_name]["name"] = mp.module_name.upper()
-                    role_permission[mp.app_name]["module"][mp.module_name]["function"] = dict()
-
-                if mp.function_name not in role_permission[mp.app_name]["module"][mp.module_name]["function"]:
-                    role_permission[mp.app_name]["module"][mp.module_name]["function"][mp.function_name] = dict()
-
-                role_permission[mp.app_name]["module"][mp.module_name]["function"][mp.function_name]["has_permission"] = False
-                role_permission[mp.app_name]["module"][mp.module_name]["function"][mp.function_name]["function_id"] = mp.id
-
-                if AccountTypeRolePermission.objects.filter(account_type_role=role, master_permission=mp, datamode='A').exists():
-                    role_permission[mp.app_name]["module"][mp.module_name]["function"][mp.function_name]["has_permission"] = True
-
-            data['role_permission'] = role_permission
+            data['role_permission'] = permission_cache.build_role_permission_matrix(role.id)
             result, msg = True, success_msg
         else:
             result, msg, data = True, success_msg, data
@@ -331,16 +287,25 @@ def role_update_permission(request, id):
         role = AccountTypeRole.objects.filter(id=id).first()
         if role:
             data['role'] = role
-            AccountTypeRolePermission.objects.filter(account_type_role=role).delete()
-
-            for mp_id in mp_id_list:
-                at_rp = AccountTypeRolePermission()
-                at_rp.account_type_role = role
-                at_rp.master_permission = MasterPermission.objects.filter(id=mp_id, datamode='A').first()
-                at_rp.has_permission = True
-                at_rp.created_by = request.user
-                at_rp.updated_by = request.user
-                at_rp.save()
+            with transaction.atomic():
+                selected_ids = set(MasterPermission.objects.filter(
+                    id__in=mp_id_list, datamode='A').values_list('id', flat=True))
+                granted_ids = set(AccountTypeRolePermission.objects.filter(
+                    account_type_role=role, has_permission=True, datamode='A').values_list('master_permission_id', flat=True))
+
+                # revoked permissions and stale (not granted) rows go in one delete
+                AccountTypeRolePermission.objects.filter(account_type_role=role).exclude(
+                    master_permission_id__in=selected_ids & granted_ids, has_permission=True, datamode='A').delete()
+
+                AccountTypeRolePermission.objects.bulk_create([
+                    AccountTypeRolePermission(account_type_role=role,
+                                              master_permission_id=mp_id,
+                                              has_permission=True,
+                                              created_by=request.user,
+                                              updated_by=request.user)
+                    for mp_id in sorted(selected_ids - granted_ids)])
+                # bulk_create sends no post_save, the deleted rows bump the version themselves
+                transaction.on_commit(lambda: permission_cache.invalidate_role(role.id))
 
             result, msg = True, success_msg
         else:
@@ -4,3 +4,7 @@ from django.apps import AppConfig
 class mckAuthConfig(AppConfig):
     default_auto_field = 'django.db.models.BigAutoField'
     name = 'mck_auth'
+
+    def ready(self):
+        # the signal receivers, connected for the scripts, the shell and the admin too
+        from mck_auth import permission_cache  # noqa: F401
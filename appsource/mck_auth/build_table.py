@@ -36,7 +36,8 @@ def build_role_table(request):
                                         can_show=True,
                                         class_name="",
                                         column_name="permissions",
-                                        search_key=""))
+                                        search_key="",
+                                        template='<div class=""><a href="{permission_url}" class="text-primary">Update Permission</a></div>'))
 
         table_data["columns"].append(dict(display_name="Status",
                                         can_show=True,
@@ -66,7 +67,10 @@ def build_category_table(request):
                                         can_show=True,
                                         class_name="",
                                         column_name="name",
-                                        search_key="name"))
+                                        search_key="name",
+                                        template=('<div class="d-flex align-items-center"><a href="#" class="symbol symbol-50px">'
+                                                 '<span class="symbol-label" style="background-image:url({image});"></span></a>'
+                                                 '<div class="ms-5"><span class="fw-bold">{name}</span></div></div>')))
 
         table_data["columns"].append(dict(display_name="Status",
                                         can_show=True,
@@ -157,7 +161,10 @@ def build_sub_category_table(request):
                                         can_show=True,
                                         class_name="",
                                         column_name="category",
-                                        search_key="category"))
+                                        search_key="category",
+                                        template=('<div class="d-flex align-items-center"><a href="#" class="symbol symbol-50px">'
+                                                 '<span class="symbol-label" style="background-image:url({category__image});"></span></a>'
+                                                 '<div class="ms-5"><span class="fw-bold">{category__name}</span></div></div>')))
 
         table_data["columns"].append(dict(display_name="Name",
                                         can_show=True,
@@ -331,7 +338,8 @@ def build_state_table(request):
                                           can_show=True,
                                           class_name="",
                                           column_name="country",
-                                          search_key="country"))  # Assuming you have a 'description' field
+                                          search_key="country",
+                                          value="country__name"))  # Assuming you have a 'description' field
 
         table_data["columns"].append(dict(display_name="Status",
                                           can_show=True,
@@ -373,7 +381,8 @@ def build_city_table(request):
                                           can_show=True,
                                           class_name="",
                                           column_name="state",
-                                          search_key="state"))
+                                          search_key="state",
+                                          value="state__name"))
         
         table_data["columns"].append(dict(display_name="Status",
                                           can_show=True,
@@ -486,7 +495,8 @@ def build_faq_category_table(request):
                                           can_show=True,
                                           class_name="",
                                           column_name="datamode",
-                                          search_key="datamode"))
+                                          search_key="datamode",
+                                          actions="edit"))
 
     except Exception as e:
         exc_type, exc_obj, exc_traceback = sys.exc_info()
@@ -510,7 +520,8 @@ def build_faq_table(request):
                                           can_show=True,
                                           class_name="",
                                           column_name="faqcategory",
-                                          search_key="faqcategory"))  
+                                          search_key="faqcategory",
+                                          value="faqcategory__name"))  
         
         table_data["columns"].append(dict(display_name="Question",  
                                           can_show=True,
@@ -555,7 +566,8 @@ def build_area_table(request):
                                           can_show=True,
                                           class_name="",
                                           column_name="county",
-                                          search_key="county"))  
+                                          search_key="county",
+                                          value="county__name"))  
         
         table_data["columns"].append(dict(display_name="Name",  
                                           can_show=True,
@@ -727,7 +739,8 @@ def build_property_table(request):
                                           can_show=True,
                                           class_name="",
                                           column_name="property_type",
-                                          search_key="property_type"))  # Assuming you have a 'description' field
+                                          search_key="property_type",
+                                          value="property_type__name"))  # Assuming you have a 'description' field
 
         table_data["columns"].append(dict(display_name="Status",
                                           can_show=True,
@@ -765,7 +778,8 @@ def build_property_type_table(request):
                                           can_show=True,
                                           class_name="",
                                           column_name="datamode",
-                                          search_key="datamode"))
+                                          search_key="datamode",
+                                          actions="edit"))
 
     except Exception as e:
         exc_type, exc_obj, exc_traceback = sys.exc_info()
@@ -804,7 +818,8 @@ def build_lead_table(request):
                                           can_show=True,
                                           class_name="",
                                           column_name="datamode",
-                                          search_key="datamode"))
+                                          search_key="datamode",
+                                          actions="edit"))
 
     except Exception as e:
         exc_type, exc_obj, exc_traceback = sys.exc_info()
@@ -828,13 +843,15 @@ def build_property_image_table(request):
                                           can_show=True,
                                           class_name="",
                                           column_name="property",
-                                          search_key="proeprty"))  
+                                          search_key="proeprty",
+                                          value="property__title"))  
         
         table_data["columns"].append(dict(display_name="Status",  
                                           can_show=True,
                                           class_name="",
                                           column_name="datamode",
-                                          search_key="datamode"))
+                                          search_key="datamode",
+                                          actions="edit"))
 
     except Exception as e:
         exc_type, exc_obj, exc_traceback = sys.exc_info()
@@ -1,7 +1,20 @@
 # mck_auth/middleware.py
+import os
+import re
+import time
+import traceback
+from collections import defaultdict
+from contextlib import ExitStack
+from django.conf import settings
+from django.db import connections
 from django.http import HttpResponseForbidden
 from django.urls import reverse
 from django.shortcuts import redirect
+from config import app_logger
+from config import app_metrics
+from config import app_replica
+
+logger = app_logger.createLogger("app")
 
 class AdminAccessMiddleware:
     def __init__(self, get_response):
@@ -23,4 +36,178 @@ class AdminAccessMiddleware:
             # return redirect('mck_admin_console:mck_dashboard')
             pass
             
-        return None
\ No newline at end of file
+        return None
+
+
+class MetricsMiddleware:
+    """
+    Observes the duration, SQL query count and SQL time of every request per view
+    """
+    def __init__(self, get_response):
+        self.get_response = get_response
+
+    def __call__(self, request):
+        if not settings.APP_METRICS_ENABLED:
+            return self.get_response(request)
+
+        timer = app_metrics.QueryTimer()
+        start = time.perf_counter()
+        with ExitStack() as stack:
+            for connection in connections.all():
+                stack.enter_context(connection.execute_wrapper(timer))
+            response = self.get_response(request)
+        match = getattr(request, 'resolver_match', None)
+        view_name = match.view_name if match else "unresolved"
+        app_metrics.observe_request(view_name, time.perf_counter() - start, timer.count, timer.seconds)
+        return response
+
+
+class ReplicaMiddleware:
+    """
+    Sends the reads of the website views to the replica (config/app_replica.py)
+    and pins the session to the default database after a write
+    """
+    def __init__(self, get_response):
+        self.get_response = get_response
+        if app_replica.is_enabled() and settings.DATABASE_REPLICA_SYNC_IN_PROCESS:
+            if not os.path.exists(settings.DATABASES[app_replica.REPLICA]['NAME']):
+                app_replica.sync_replica(wait=True)
+            app_replica.replica_sync.start()
+
+    def __call__(self, request):
+        if not app_replica.is_enabled():
+            return self.get_response(request)
+
+        writes = list()
+        wrote_token = app_replica.wrote.set(writes)
+        replica_token = app_replica.use_replica.set(False)
+        try:
+            response = self.get_response(request)
+        finally:
+            app_replica.use_replica.reset(replica_token)
+            app_replica.wrote.reset(wrote_token)
+        if writes:
+            app_replica.pin(request)
+        return response
+
+    def process_view(self, request, view_func, view_args, view_kwargs):
+        if (app_replica.is_enabled() and request.method in ('GET', 'HEAD')
+                and request.resolver_match._func_path in settings.DATABASE_REPLICA_VIEWS
+                and not app_replica.is_pinned(request)):
+            app_replica.use_replica.set(True)
+        return None
+
+
+class QueryBudgetExceeded(Exception):
+    pass
+
+
+_STRING_LITERAL = re.compile(r"'(?:[^']|'')*'")
+_NUMBER_LITERAL = re.compile(r"\b\d+(?:\.\d+)?\b")
+_PLACEHOLDER_LIST = re.compile(r"\((?:\s*(?:%s|\?)\s*,)+\s*(?:%s|\?)\s*\)")
+
+
+def query_shape(sql):
+    """
+    SQL with literals and IN lists collapsed, equal for queries differing only in values
+    """
+    sql = _STRING_LITERAL.sub("?", sql)
+    sql = _NUMBER_LITERAL.sub("?", sql)
+    return _PLACEHOLDER_LIST.sub("(...)", sql)
+
+
+# frames of the query wrappers themselves are never the origin
+_WRAPPER_FILES = (os.path.abspath(__file__), os.path.abspath(app_metrics.__file__))
+
+
+def query_origin():
+    """
+    Innermost frame of the project's own code that issued the query
+    """
+    base_dir = str(settings.BASE_DIR)
+    for frame in reversed(traceback.extract_stack()):
+        filename = os.path.abspath(frame.filename)
+        if filename in _WRAPPER_FILES or not filename.startswith(base_dir) or "site-packages" in filename:
+            continue
+        return "{0}:{1} {2}".format(os.path.relpath(filename, base_dir), frame.lineno, frame.name)
+    return "-"
+
+
+class QueryRecorder:
+    """
+    connection.execute_wrapper keeping every query of a request with its shape and origin
+    """
+    def __init__(self):
+        self.queries = list()
+
+    def __call__(self, execute, sql, params, many, context):
+        start = time.perf_counter()
+        try:
+            return execute(sql, params, many, context)
+        finally:
+            self.queries.append(dict(sql=sql,
+                                     shape=query_shape(sql),
+                                     seconds=time.perf_counter() - start,
+                                     origin=query_origin()))
+
+    def repeated_shapes(self, threshold):
+        """
+        [(shape, count, origins)] of the shapes run at least threshold times, N+1 suspects
+        """
+        shapes = defaultdict(list)
+        for query in self.queries:
+            shapes[query['shape']].append(query['origin'])
+        repeated = [(shape, len(origins), sorted(set(origins)))
+                    for shape, origins in shapes.items() if len(origins) >= threshold]
+        return sorted(repeated, key=lambda item: item[1], reverse=True)
+
+
+def query_budget(view_name):
+    """
+    Query budget of a view, SQL_PROFILER_QUERY_BUDGET is a number or a
+    {view_name: budget} dict with an optional "default" entry
+    """
+    budget = settings.SQL_PROFILER_QUERY_BUDGET
+    if isinstance(budget, dict):
+        return budget.get(view_name, budget.get("default"))
+    return budget
+
+
+class SQLProfilerMiddleware:
+    """
+    Opt-in (SQL_PROFILER_ENABLED) per request SQL profile, adds an X-SQL-Profile
+    header and a log line, warns about repeated query shapes (N+1) and with
+    SQL_PROFILER_STRICT raises QueryBudgetExceeded when a view runs more
+    queries than its budget
+    """
+    def __init__(self, get_response):
+        self.get_response = get_response
+
+    def __call__(self, request):
+        if not settings.SQL_PROFILER_ENABLED:
+            return self.get_response(request)
+
+        recorder = QueryRecorder()
+        with ExitStack() as stack:
+            for connection in connections.all():
+                stack.enter_context(connection.execute_wrapper(recorder))
+            response = self.get_response(request)
+
+        match = getattr(request, 'resolver_match', None)
+        view_name = match.view_name if match else "unresolved"
+        count = len(recorder.queries)
+        seconds = sum(query['seconds'] for query in recorder.queries)
+        repeated = recorder.repeated_shapes(settings.SQL_PROFILER_NPLUSONE_THRESHOLD)
+
+        response['X-SQL-Profile'] = "queries={0}; time={1:.2f}ms; repeated={2}".format(count, seconds * 1000, len(repeated))
+        logger.info("SQL profile %s %s: %s queries in %.2fms, %s repeated shapes",
+                    request.method, request.path, count, seconds * 1000, len(repeated))
+        for shape, shape_count, origins in repeated:
+            logger.warning("Possible N+1 in %s: %s x %s from %s", view_name, shape_count, shape, ", ".join(origins))
+
+        budget = query_budget(view_name)
+        if budget is not None and count > budget:
+            logger.warning("%s ran %s queries, over its budget of %s", view_name, count, budget)
+            if settings.SQL_PROFILER_STRICT:
+                raise QueryBudgetExceeded("{0} ran {1} queries, over its budget of {2}".format(view_name, count, budget))
+        return response
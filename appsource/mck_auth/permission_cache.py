@@ -0,0 +1,186 @@
+"""
+Permission Cache - current account user and role permissions of a request
+
+    1. the AccountUser of a request is loaded once and kept on the request,
+       between requests it is cached per user until the user's AccountUser
+       rows change
+    2. the permissions of a role are cached as a set of class names per role
+       version, a save / delete of the role or of its AccountTypeRolePermission
+       rows writes a new version once committed (bulk_create sends no signal,
+       role_update_permission calls invalidate_role)
+    3. both live in a process local dict in front of the django cache, so a
+       permission check is a set lookup without queries on the hot path; the
+       versions are stamps in the cache shared by every process
+       (settings.PERMISSION_VERSION_CACHE_ALIAS), a revoked permission is
+       refused by every worker on its next check
+    4. the app -> module -> function tree of the MasterPermission catalogue
+       is cached once for every role, a role's permission matrix is the tree
+       with the granted ids of the role loaded in one query
+"""
+import time
+import uuid
+from django.conf import settings
+from django.core.cache import cache, caches
+from django.db import transaction
+from django.db.models.signals import post_save, post_delete
+from django.dispatch import receiver
+from mck_master.models import MasterPermission
+from mck_auth.models import AccountUser, AccountTypeRole, AccountTypeRolePermission
+
+
+_local = dict()
+LOCAL_MAX_ENTRIES = 1000
+
+
+def get_version_cache():
+    return caches[settings.PERMISSION_VERSION_CACHE_ALIAS]
+
+
+def _version(key):
+    """
+    Current version of a cache key family, created on first use
+    """
+    version = get_version_cache().get(key)
+    if version is None:
+        get_version_cache().add(key, uuid.uuid4().hex, None)
+        version = get_version_cache().get(key)
+    return version
+
+
+def _bump(key):
+    # a new stamp rather than incr(), the file based cache has no atomic incr
+    get_version_cache().set(key, uuid.uuid4().hex, None)
+
+
+def _bump_on_commit(key):
+    # after the commit, a process reading the rows meanwhile would cache them
+    # under the new version
+    transaction.on_commit(lambda: _bump(key))
+
+
+def _cached(key, loader):
+    """
+    Value of the key from the process local dict, then the django cache,
+    loaded and stored in both on a miss
+    """
+    now = time.time()
+    entry = _local.get(key)
+    if entry is not None and entry[0] > now:
+        return entry[1]
+
+    timeout = settings.PERMISSION_CACHE_TIMEOUT
+    value = cache.get(key)
+    if value is None:
+        value = loader()
+        cache.set(key, value, timeout)
+    if len(_local) >= LOCAL_MAX_ENTRIES:
+        _local.clear()
+    _local[key] = (now + timeout, value)
+    return value
+
+
+def role_version(role_id):
+    return _version("role_version:{0}".format(role_id))
+
+
+def invalidate_role(role_id):
+    """
+    To be called whenever the permissions of a role change
+    """
+    _bump("role_version:{0}".format(role_id))
+
+
+def get_role_permissions(role_id):
+    """
+    Class names the role has permission on
+    """
+    key = "role_permissions:{0}:{1}:{2}".format(role_id, role_version(role_id), _version("master_permission_version"))
+    return _cached(key, lambda: frozenset(AccountTypeRolePermission.objects.filter(
+        account_type_role_id=role_id, has_permission=True).values_list('master_permission__class_name', flat=True)))
+
+
+def _load_master_permission_tree():
+    tree = dict()
+    master_permissions = MasterPermission.objects.filter(datamode='A').order_by("id").values_list(
+        'id', 'app_name', 'module_name', 'function_name')
+    for mp_id, app_name, module_name, function_name in master_permissions:
+        if app_name not in tree:
+            tree[app_name] = dict(name=app_name.replace("mck_", "").upper(), module=dict())
+        modules = tree[app_name]["module"]
+        if module_name not in modules:
+            modules[module_name] = dict(name=module_name.upper(), function=dict())
+        modules[module_name]["function"][function_name] = mp_id
+    return tree
+
+
+def get_master_permission_tree():
+    """
+    {app_name: {name, module: {module_name: {name, function: {function_name: id}}}}}
+    of the active MasterPermission rows, shared by every role
+    """
+    key = "master_permission_tree:{0}".format(_version("master_permission_version"))
+    return _cached(key, _load_master_permission_tree)
+
+
+def build_role_permission_matrix(role_id):
+    """
+    Permission tree of the role, every function with its function_id and has_permission
+    """
+    granted = set(AccountTypeRolePermission.objects.filter(
+        account_type_role_id=role_id, datamode='A').values_list('master_permission_id', flat=True))
+    matrix = dict()
+    for app_name, app in get_master_permission_tree().items():
+        modules = dict()
+        for module_name, module in app["module"].items():
+            functions = {function_name: dict(has_permission=mp_id in granted, function_id=mp_id)
+                         for function_name, mp_id in module["function"].items()}
+            modules[module_name] = dict(name=module["name"], function=functions)
+        matrix[app_name] = dict(name=app["name"], module=modules)
+    return matrix
+
+
+def get_accountuser(request):
+    """
+    Current AccountUser of the requested user, None for anonymous users
+    """
+    if hasattr(request, '_accountuser'):
+        return request._accountuser
+
+    accountuser = None
+    if request.user.is_authenticated:
+        user = request.user
+        key = "accountuser:{0}:{1}".format(user.pk, _version("accountuser_version:{0}".format(user.pk)))
+        # False marks users without an account, None is a cache miss
+        accountuser = _cached(key, lambda: AccountUser.objects.select_related('role').filter(
+            user=user, is_current_account=True, datamode='A').first() or False) or None
+    request._accountuser = accountuser
+    return accountuser
+
+
+def has_permission(request, class_name):
+    accountuser = get_accountuser(request)
+    return accountuser is not None and class_name in get_role_permissions(accountuser.role_id)
+
+
+@receiver(post_save, sender=AccountUser)
+@receiver(post_delete, sender=AccountUser)
+def invalidate_accountuser(sender, instance, **kwargs):
+    _bump_on_commit("accountuser_version:{0}".format(instance.user_id))
+
+
+@receiver(post_save, sender=MasterPermission)
+@receiver(post_delete, sender=MasterPermission)
+def invalidate_master_permission(sender, **kwargs):
+    _bump_on_commit("master_permission_version")
+
+
+@receiver(post_save, sender=AccountTypeRole)
+@receiver(post_delete, sender=AccountTypeRole)
+def invalidate_role_saved(sender, instance, **kwargs):
+    _bump_on_commit("role_version:{0}".format(instance.pk))
+
+
+@receiver(post_save, sender=AccountTypeRolePermission)
+@receiver(post_delete, sender=AccountTypeRolePermission)
+def invalidate_role_permission(sender, instance, **kwargs):
+    _bump_on_commit("role_version:{0}".format(instance.account_type_role_id))
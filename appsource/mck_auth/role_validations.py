@@ -4,6 +4,7 @@ from django.urls import reverse
 from django.forms.models import model_to_dict
 from config import app_utils
 from config import app_logger
+from mck_auth import permission_cache
 
 from mck_auth.models import *
 
@@ -18,8 +19,8 @@ def validate_requested_user_function(request):
     try:
         if request.user.is_authenticated:
             class_name = request.resolver_match._func_path.split(".")[-1]
-            accountuser = AccountUser.objects.filter(user=request.user, is_current_account=True, datamode='A').first()
-            if accountuser and AccountTypeRolePermission.objects.filter(account_type_role=accountuser.role, master_permission__class_name=class_name, has_permission=True).exists():
+            accountuser = permission_cache.get_accountuser(request)
+            if accountuser and permission_cache.has_permission(request, class_name):
                 has_permission = True
     except Exception as e:
         exc_type, exc_obj, exc_traceback = sys.exc_info()
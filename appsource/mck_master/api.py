@@ -1,9 +1,8 @@
 import sys
-from phonenumber_field.phonenumber import PhoneNumber
-from django.urls import reverse
-from django.forms.models import model_to_dict
 from config import app_utils
+from config import app_rows
 from config import app_logger
+from config import app_reference
 from mck_auth import api as auth_api
 from mck_master.models import *
 
@@ -19,32 +18,12 @@ def support_page_content_load_data(request, table_data):
     error_msg = 'Internal Server Error'
     fResult = list()
     try:
-        queryset = SupportPageContent.objects.exclude(datamode='D').order_by('-updated_on')
+        queryset = SupportPageContent.objects.live().latest_first()
+        renderer = app_rows.RowRenderer(queryset, table_data, edit_url='mck_master:mck_support_page_content_update')
         qs, total_records, total_display_records = app_utils.method_for_datatable_operations(
-            request, queryset)
-
-        final_data = list()
-        for qs_instance in qs:
-            qs_data = model_to_dict(qs_instance)
-            data = list()
-            edit_url = reverse('mck_master:mck_support_page_content_update', args=[qs_data['id']])
-
-            for column in table_data['columns']:
-                if column['column_name'] == "datamode":
-                    if qs_instance.datamode == "A":
-                        data.append('<div class="text-success">'+qs_instance.get_datamode_display()+'</div>')
-                        data.append('<div class="text-end"><a href="'+edit_url+'" class="text-primary pe-2 ps-2">Edit</a> | <a href="javascript:void()" class="text-danger ps-2" onclick="delete_object('+str(qs_data['id'])+')">Inactivate</a></div>')
-                    else:
-                        data.append('<div class="text-danger">'+qs_instance.get_datamode_display()+'</div>')
-                        data.append('<div class="text-end"><a href="'+edit_url+'" class="text-primary pe-2 ps-2">Edit</a> | <a href="javascript:void()" class="text-success ps-2" onclick="delete_object('+str(qs_data['id'])+')">Activate</a></div>')
-                else:
-                    if isinstance(qs_data.get(column['column_name']), PhoneNumber):
-                        data.append(qs_data.get(column['column_name']).national_number)
-                    elif isinstance(qs_data.get(column['column_name']), models.ImageField):
-                        pass
-                    else:
-                        data.append(qs_data.get(column['column_name'], "-"))
-            final_data.append(data)
+            request, renderer.queryset)
+
+        final_data = renderer.render(qs)
         fResult = app_utils.final_dict(request, total_records, total_display_records, final_data)
 
         result, msg = True, success_msg
@@ -141,44 +120,12 @@ def category_load_data(request, table_data):
     error_msg = 'Internal Server Error'
     fResult = list()
     try:
-        queryset = Category.objects.exclude(datamode='D').order_by('-updated_on')
+        queryset = Category.objects.live().latest_first()
+        renderer = app_rows.RowRenderer(queryset, table_data, edit_url='mck_master:mck_category_update')
         qs, total_records, total_display_records = app_utils.method_for_datatable_operations(
-            request, queryset)
-
-        final_data = list()
-        for qs_instance in qs:
-            qs_data = model_to_dict(qs_instance)
-            data = list()
-            edit_url = reverse('mck_master:mck_category_update', args=[qs_data['id']])
-
-            for column in table_data['columns']:
-                if column['column_name'] == "datamode":
-                    if qs_instance.datamode == "A":
-                        data.append('<div class="text-success">'+qs_instance.get_datamode_display()+'</div>')
-                        data.append('<div class="text-end"><a href="'+edit_url+'" class="text-primary pe-2 ps-2">Edit</a> | <a href="javascript:void()" class="text-danger ps-2" onclick="delete_object('+str(qs_data['id'])+')">Inactivate</a></div>')
-                    else:
-                        data.append('<div class="text-danger">'+qs_instance.get_datamode_display()+'</div>')
-                        data.append('<div class="text-end"><a href="'+edit_url+'" class="text-primary pe-2 ps-2">Edit</a> | <a href="javascript:void()" class="text-success ps-2" onclick="delete_object('+str(qs_data['id'])+')">Activate</a></div>')
-                elif column['column_name'] == "name":
-                    html_str = ""
-                    html_str += '<div class="d-flex align-items-center">';
-                    html_str += '<a href="#" class="symbol symbol-50px">';
-                    html_str += f'<span class="symbol-label" style="background-image:url({qs_instance.image.url});"></span>';
-                    html_str += '</a>';
-                    html_str += '<div class="ms-5">';
-                    html_str += f'<span class="fw-bold">{qs_instance.name}</span>';
-                    html_str += '</div>';
-                    html_str += '</div>';
-                    data.append(html_str)
-                
-                else:
-                    if isinstance(qs_data.get(column['column_name']), PhoneNumber):
-                        data.append(qs_data.get(column['column_name']).national_number)
-                    elif isinstance(qs_data.get(column['column_name']), models.ImageField):
-                        pass
-                    else:
-                        data.append(qs_data.get(column['column_name'], "-"))
-            final_data.append(data)
+            request, renderer.queryset)
+
+        final_data = renderer.render(qs)
         fResult = app_utils.final_dict(request, total_records, total_display_records, final_data)
 
         result, msg = True, success_msg
@@ -272,43 +219,12 @@ def sub_category_load_data(request, table_data):
     error_msg = 'Internal Server Error'
     fResult = list()
     try:
-        queryset = SubCategory.objects.exclude(datamode='D').order_by('-updated_on')
+        queryset = SubCategory.objects.live().latest_first()
+        renderer = app_rows.RowRenderer(queryset, table_data, edit_url='mck_master:mck_sub_category_update')
         qs, total_records, total_display_records = app_utils.method_for_datatable_operations(
-            request, queryset)
-
-        final_data = list()
-        for qs_instance in qs:
-            qs_data = model_to_dict(qs_instance)
-            data = list()
-            edit_url = reverse('mck_master:mck_sub_category_update', args=[qs_data['id']])
-
-            for column in table_data['columns']:
-                if column['column_name'] == "datamode":
-                    if qs_instance.datamode == "A":
-                        data.append('<div class="text-success">'+qs_instance.get_datamode_display()+'</div>')
-                        data.append('<div class="text-end"><a href="'+edit_url+'" class="text-primary pe-2 ps-2">Edit</a> | <a href="javascript:void()" class="text-danger ps-2" onclick="delete_object('+str(qs_data['id'])+')">Inactivate</a></div>')
-                    else:
-                        data.append('<div class="text-danger">'+qs_instance.get_datamode_display()+'</div>')
-                        data.append('<div class="text-end"><a href="'+edit_url+'" class="text-primary pe-2 ps-2">Edit</a> | <a href="javascript:void()" class="text-success ps-2" onclick="delete_object('+str(qs_data['id'])+')">Activate</a></div>')
-                elif column['column_name'] == "category":
-                    html_str = ""
-                    html_str += '<div class="d-flex align-items-center">';
-                    html_str += '<a href="#" class="symbol symbol-50px">';
-                    html_str += f'<span class="symbol-label" style="background-image:url({qs_instance.category.image.url});"></span>';
-                    html_str += '</a>';
-                    html_str += '<div class="ms-5">';
-                    html_str += f'<span class="fw-bold">{qs_instance.category.name}</span>';
-                    html_str += '</div>';
-                    html_str += '</div>';
-                    data.append(html_str)
-                else:
-                    if isinstance(qs_data.get(column['column_name']), PhoneNumber):
-                        data.append(qs_data.get(column['column_name']).national_number)
-                    elif isinstance(qs_data.get(column['column_name']), models.ImageField):
-                        pass
-                    else:
-                        data.append(qs_data.get(column['column_name'], "-"))
-            final_data.append(data)
+            request, renderer.queryset)
+
+        final_data = renderer.render(qs)
         fResult = app_utils.final_dict(request, total_records, total_display_records, final_data)
 
         result, msg = True, success_msg
@@ -400,7 +316,8 @@ def ajax_category_based_sub_category(request):
     sub_category_list = list()
     try:
         category_id = request.GET.get('category_id')
-        sub_category_list = SubCategory.objects.filter(category_id=category_id).values('id', 'name')
+        sub_category_list = [dict(id=row.id, name=row.name)
+                             for row in app_reference.get('mck_master.SubCategory').children(category_id)]
         
         result = True
         message = 'Sucesss'
@@ -418,32 +335,12 @@ def banner_load_data(request, table_data):
     error_msg = 'Internal Server Error'
     fResult = list()
     try:
-        queryset = Banner.objects.exclude(datamode='D').order_by('-updated_on')
+        queryset = Banner.objects.live().latest_first()
+        renderer = app_rows.RowRenderer(queryset, table_data, edit_url='mck_master:mck_banner_update')
         qs, total_records, total_display_records = app_utils.method_for_datatable_operations(
-            request, queryset)
-
-        final_data = list()
-        for qs_instance in qs:
-            qs_data = model_to_dict(qs_instance)
-            data = list()
-            edit_url = reverse('mck_master:mck_banner_update', args=[qs_data['id']])
-
-            for column in table_data['columns']:
-                if column['column_name'] == "datamode":
-                    if qs_instance.datamode == "A":
-                        data.append('<div class="text-success">'+qs_instance.get_datamode_display()+'</div>')
-                        data.append('<div class="text-end"><a href="'+edit_url+'" class="text-primary pe-2 ps-2">Edit</a> | <a href="javascript:void()" class="text-danger ps-2" onclick="delete_object('+str(qs_data['id'])+')">Inactivate</a></div>')
-                    else:
-                        data.append('<div class="text-danger">'+qs_instance.get_datamode_display()+'</div>')
-                        data.append('<div class="text-end"><a href="'+edit_url+'" class="text-primary pe-2 ps-2">Edit</a> | <a href="javascript:void()" class="text-success ps-2" onclick="delete_object('+str(qs_data['id'])+')">Activate</a></div>')
-                else:
-                    if isinstance(qs_data.get(column['column_name']), PhoneNumber):
-                        data.append(qs_data.get(column['column_name']).national_number)
-                    elif isinstance(qs_data.get(column['column_name']), models.ImageField):
-                        pass
-                    else:
-                        data.append(qs_data.get(column['column_name'], "-"))
-            final_data.append(data)
+            request, renderer.queryset)
+
+        final_data = renderer.render(qs)
         fResult = app_utils.final_dict(request, total_records, total_display_records, final_data)
 
         result, msg = True, success_msg
@@ -537,32 +434,12 @@ def gallery_load_data(request, table_data):
     error_msg = 'Internal Server Error'
     fResult = list()
     try:
-        queryset = Gallery.objects.exclude(datamode='D').order_by('-updated_on')
+        queryset = Gallery.objects.live().latest_first()
+        renderer = app_rows.RowRenderer(queryset, table_data, edit_url='mck_master:mck_gallery_update')
         qs, total_records, total_display_records = app_utils.method_for_datatable_operations(
-            request, queryset)
-
-        final_data = list()
-        for qs_instance in qs:
-            qs_data = model_to_dict(qs_instance)
-            data = list()
-            edit_url = reverse('mck_master:mck_gallery_update', args=[qs_data['id']])
-
-            for column in table_data['columns']:
-                if column['column_name'] == "datamode":
-                    if qs_instance.datamode == "A":
-                        data.append('<div class="text-success">'+qs_instance.get_datamode_display()+'</div>')
-                        data.append('<div class="text-end"><a href="'+edit_url+'" class="text-primary pe-2 ps-2">Edit</a> | <a href="javascript:void()" class="text-danger ps-2" onclick="delete_object('+str(qs_data['id'])+')">Inactivate</a></div>')
-                    else:
-                        data.append('<div class="text-danger">'+qs_instance.get_datamode_display()+'</div>')
-                        data.append('<div class="text-end"><a href="'+edit_url+'" class="text-primary pe-2 ps-2">Edit</a> | <a href="javascript:void()" class="text-success ps-2" onclick="delete_object('+str(qs_data['id'])+')">Activate</a></div>')
-                else:
-                    if isinstance(qs_data.get(column['column_name']), PhoneNumber):
-                        data.append(qs_data.get(column['column_name']).national_number)
-                    elif isinstance(qs_data.get(column['column_name']), models.ImageField):
-                        pass
-                    else:
-                        data.append(qs_data.get(column['column_name'], "-"))
-            final_data.append(data)
+            request, renderer.queryset)
+
+        final_data = renderer.render(qs)
         fResult = app_utils.final_dict(request, total_records, total_display_records, final_data)
 
         result, msg = True, success_msg
@@ -656,32 +533,11 @@ def state_load_data(request, table_data):
     error_msg = 'Internal Server Error'
     fResult = list()
     try:
-        queryset = State.objects.exclude(datamode='D').order_by('-updated_on')
-        qs, total_records, total_display_records = app_utils.method_for_datatable_operations(request, queryset)
-
-        final_data = list()
-        for qs_instance in qs:
-            qs_data = model_to_dict(qs_instance)
-            data = list()
-            edit_url = reverse('mck_master:mck_state_update', args=[qs_data['id']])
-
-            for column in table_data['columns']:
-                if column['column_name'] == "datamode":
-                    if qs_instance.datamode == "A":
-                        data.append('<div class="text-success">' + qs_instance.get_datamode_display() + '</div>')
-                        data.append('<div class="text-end"><a href="' + edit_url + '" class="text-primary pe-2 ps-2">Edit</a> | <a href="javascript:void()" class="text-danger ps-2" onclick="delete_object(' + str(qs_data['id']) + ')">Inactivate</a></div>')
-                    else:
-                        data.append('<div class="text-danger">' + qs_instance.get_datamode_display() + '</div>')
-                        data.append('<div class="text-end"><a href="' + edit_url + '" class="text-primary pe-2 ps-2">Edit</a> | <a href="javascript:void()" class="text-success ps-2" onclick="delete_object(' + str(qs_data['id']) + ')">Activate</a></div>')
-                elif column['column_name'] == "name":
-                    data.append(qs_instance.name)
-                elif column['column_name'] == "code":
-                    data.append(qs_instance.code)  # Retrieve and display the state code
-                elif column['column_name'] == "country":
-                    data.append(qs_instance.country.name)  # Assuming `country` is a ForeignKey relation
-                else:
-                    data.append(qs_data.get(column['column_name'], "-"))
-            final_data.append(data)
+        queryset = State.objects.live().latest_first()
+        renderer = app_rows.RowRenderer(queryset, table_data, edit_url='mck_master:mck_state_update')
+        qs, total_records, total_display_records = app_utils.method_for_datatable_operations(request, renderer.queryset)
+
+        final_data = renderer.render(qs)
 
         fResult = app_utils.final_dict(request, total_records, total_display_records, final_data)
         result, msg = True, success_msg
@@ -777,32 +633,11 @@ def city_load_data(request, table_data):
     error_msg = 'Internal Server Error'
     fResult = list()
     try:
-        queryset = City.objects.exclude(datamode='D').order_by('-updated_on')
-        qs, total_records, total_display_records = app_utils.method_for_datatable_operations(request, queryset)
-
-        final_data = list()
-        for qs_instance in qs:
-            qs_data = model_to_dict(qs_instance)
-            data = list()
-            edit_url = reverse('mck_master:mck_city_update', args=[qs_data['id']])
-
-            for column in table_data['columns']:
-                if column['column_name'] == "datamode":
-                    if qs_instance.datamode == "A":
-                        data.append('<div class="text-success">' + qs_instance.get_datamode_display() + '</div>')
-                        data.append('<div class="text-end"><a href="' + edit_url + '" class="text-primary pe-2 ps-2">Edit</a> | <a href="javascript:void()" class="text-danger ps-2" onclick="delete_object(' + str(qs_data['id']) + ')">Inactivate</a></div>')
-                    else:
-                        data.append('<div class="text-danger">' + qs_instance.get_datamode_display() + '</div>')
-                        data.append('<div class="text-end"><a href="' + edit_url + '" class="text-primary pe-2 ps-2">Edit</a> | <a href="javascript:void()" class="text-success ps-2" onclick="delete_object(' + str(qs_data['id']) + ')">Activate</a></div>')
-                elif column['column_name'] == "name":
-                    data.append(qs_instance.name)
-                elif column['column_name'] == "state":
-                    data.append(qs_instance.state.name)  # Assuming state is a ForeignKey relation
-                elif column['column_name'] == "code":
-                    data.append(qs_instance.code)  # Retrieve and display the city code
-                else:
-                    data.append(qs_data.get(column['column_name'], "-"))
-            final_data.append(data)
+        queryset = City.objects.live().latest_first()
+        renderer = app_rows.RowRenderer(queryset, table_data, edit_url='mck_master:mck_city_update')
+        qs, total_records, total_display_records = app_utils.method_for_datatable_operations(request, renderer.queryset)
+
+        final_data = renderer.render(qs)
 
         fResult = app_utils.final_dict(request, total_records, total_display_records, final_data)
         result, msg = True, success_msg
@@ -896,32 +731,12 @@ def offer_load_data(request, table_data):
     error_msg = 'Internal Server Error'
     fResult = list()
     try:
-        queryset = Offers.objects.exclude(datamode='D').order_by('-updated_on')
+        queryset = Offers.objects.live().latest_first()
+        renderer = app_rows.RowRenderer(queryset, table_data, edit_url='mck_master:mck_offer_update')
         qs, total_records, total_display_records = app_utils.method_for_datatable_operations(
-            request, queryset)
-
-        final_data = list()
-        for qs_instance in qs:
-            qs_data = model_to_dict(qs_instance)
-            data = list()
-            edit_url = reverse('mck_master:mck_offer_update', args=[qs_data['id']])
-
-            for column in table_data['columns']:
-                if column['column_name'] == "datamode":
-                    if qs_instance.datamode == "A":
-                        data.append('<div class="text-success">'+qs_instance.get_datamode_display()+'</div>')
-                        data.append('<div class="text-end"><a href="'+edit_url+'" class="text-primary pe-2 ps-2">Edit</a> | <a href="javascript:void()" class="text-danger ps-2" onclick="delete_object('+str(qs_data['id'])+')">Inactivate</a></div>')
-                    else:
-                        data.append('<div class="text-danger">'+qs_instance.get_datamode_display()+'</div>')
-                        data.append('<div class="text-end"><a href="'+edit_url+'" class="text-primary pe-2 ps-2">Edit</a> | <a href="javascript:void()" class="text-success ps-2" onclick="delete_object('+str(qs_data['id'])+')">Activate</a></div>')
-                else:
-                    if isinstance(qs_data.get(column['column_name']), PhoneNumber):
-                        data.append(qs_data.get(column['column_name']).national_number)
-                    elif isinstance(qs_data.get(column['column_name']), models.ImageField):
-                        pass
-                    else:
-                        data.append(qs_data.get(column['column_name'], "-"))
-            final_data.append(data)
+            request, renderer.queryset)
+
+        final_data = renderer.render(qs)
         fResult = app_utils.final_dict(request, total_records, total_display_records, final_data)
 
         result, msg = True, success_msg
@@ -1012,27 +827,12 @@ def clientfeedback_load_data(request, table_data):
     error_msg = 'Internal Server Error'
     fResult = list()
     try:
-        queryset = ClientFeedback.objects.exclude(datamode='D').order_by('-updated_on')
+        queryset = ClientFeedback.objects.live().latest_first()
+        renderer = app_rows.RowRenderer(queryset, table_data, edit_url='mck_master:mck_client_feedback_update')
         qs, total_records, total_display_records = app_utils.method_for_datatable_operations(
-            request, queryset)
-
-        final_data = list()
-        for qs_instance in qs:
-            qs_data = model_to_dict(qs_instance)
-            data = list()
-            edit_url = reverse('mck_master:mck_client_feedback_update', args=[qs_data['id']])
-
-            for column in table_data['columns']:
-                if column['column_name'] == "datamode":
-                    if qs_instance.datamode == "A":
-                        data.append('<div class="text-success">'+qs_instance.get_datamode_display()+'</div>')
-                        data.append('<div class="text-end"><a href="'+edit_url+'" class="text-primary pe-2 ps-2">Edit</a> | <a href="javascript:void()" class="text-danger ps-2" onclick="delete_object('+str(qs_data['id'])+')">Inactivate</a></div>')
-                    else:
-                        data.append('<div class="text-danger">'+qs_instance.get_datamode_display()+'</div>')
-                        data.append('<div class="text-end"><a href="'+edit_url+'" class="text-primary pe-2 ps-2">Edit</a> | <a href="javascript:void()" class="text-success ps-2" onclick="delete_object('+str(qs_data['id'])+')">Activate</a></div>')
-                else:
-                    data.append(qs_data.get(column['column_name'], "-"))
-            final_data.append(data)
+            request, renderer.queryset)
+
+        final_data = renderer.render(qs)
         fResult = app_utils.final_dict(request, total_records, total_display_records, final_data)
 
         result, msg = True, success_msg
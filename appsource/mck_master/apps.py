@@ -1,6 +1,20 @@
 from django.apps import AppConfig
+from django.conf import settings
+from django.core.signals import request_started
 
 
 class mckMasterConfig(AppConfig):
     default_auto_field = 'django.db.models.BigAutoField'
     name = 'mck_master'
+
+    def ready(self):
+        from config import app_storage
+        app_storage.connect_receivers()
+        # the PageSeo receivers, connected for the scripts and the shell too
+        from config import app_seo  # noqa: F401
+
+        # the outbox worker of a web process starts with its first request, not in the
+        # management commands (migrate, runscript ..) and after the fork of the workers
+        if settings.OUTBOX_SEND_IN_PROCESS:
+            from config import app_outbox
+            request_started.connect(app_outbox.start_worker, dispatch_uid="app_outbox_start_worker")
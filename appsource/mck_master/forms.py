@@ -6,6 +6,7 @@ from crispy_forms.helper import *
 from crispy_forms.layout import *
 from crispy_forms.bootstrap import *
 from mck_master import models
+from config import app_reference
 
 
 class SupportPageContentCreateUpdateForm(forms.ModelForm):
@@ -77,6 +78,7 @@ class SubCategoryCreateUpdateForm(forms.ModelForm):
     def __init__(self, *args, **kwargs):
         mode = kwargs.pop('mode', None)
         super(SubCategoryCreateUpdateForm, self).__init__(*args, **kwargs)
+        app_reference.bind(self.fields['category'])
         for field_name in self.fields:
             self.fields[field_name].label = str(self.fields[field_name].label).upper()
             self.fields[field_name].widget.attrs['class'] = "form-control form-control-solid"
@@ -169,6 +171,7 @@ class StateCreateUpdateForm(forms.ModelForm):
         mode = kwargs.pop('mode', None)
         super(StateCreateUpdateForm, self).__init__(*args, **kwargs)
         self.fields['country'].empty_label = "Please select"
+        app_reference.bind(self.fields['country'])
 
         # Apply Bootstrap styles to all fields
         for field_name in self.fields:
@@ -211,6 +214,7 @@ class CityCreateUpdateForm(forms.ModelForm):
         mode = kwargs.pop('mode', None)
         super(CityCreateUpdateForm, self).__init__(*args, **kwargs)
         self.fields['state'].empty_label = "Please select"
+        app_reference.bind(self.fields['state'])
         
         # Apply Bootstrap styles to all fields
         for field_name in self.fields:
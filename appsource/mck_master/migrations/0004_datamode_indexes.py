@@ -0,0 +1,101 @@
+# Indexes of the datamode / updated_on lists, see config/app_models.py
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('mck_master', '0003_media_blob'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='banner',
+            index=models.Index(fields=['datamode', '-updated_on'], name='banner_dm_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='banner',
+            index=models.Index(condition=models.Q(('datamode', 'D'), _negated=True), fields=['-updated_on'], name='banner_live_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='category',
+            index=models.Index(fields=['datamode', '-updated_on'], name='category_dm_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='category',
+            index=models.Index(condition=models.Q(('datamode', 'D'), _negated=True), fields=['-updated_on'], name='category_live_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='city',
+            index=models.Index(fields=['datamode', '-updated_on'], name='city_dm_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='city',
+            index=models.Index(condition=models.Q(('datamode', 'D'), _negated=True), fields=['-updated_on'], name='city_live_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='clientfeedback',
+            index=models.Index(fields=['datamode', '-updated_on'], name='client_feedback_dm_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='clientfeedback',
+            index=models.Index(condition=models.Q(('datamode', 'D'), _negated=True), fields=['-updated_on'], name='client_feedback_live_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='country',
+            index=models.Index(fields=['datamode', '-updated_on'], name='country_dm_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='country',
+            index=models.Index(condition=models.Q(('datamode', 'D'), _negated=True), fields=['-updated_on'], name='country_live_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='gallery',
+            index=models.Index(fields=['datamode', '-updated_on'], name='gallery_dm_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='gallery',
+            index=models.Index(condition=models.Q(('datamode', 'D'), _negated=True), fields=['-updated_on'], name='gallery_live_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='masterpermission',
+            index=models.Index(fields=['datamode', '-updated_on'], name='master_permission_dm_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='masterpermission',
+            index=models.Index(condition=models.Q(('datamode', 'D'), _negated=True), fields=['-updated_on'], name='master_permission_live_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='offers',
+            index=models.Index(fields=['datamode', '-updated_on'], name='offers_dm_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='offers',
+            index=models.Index(condition=models.Q(('datamode', 'D'), _negated=True), fields=['-updated_on'], name='offers_live_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='state',
+            index=models.Index(fields=['datamode', '-updated_on'], name='state_dm_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='state',
+            index=models.Index(condition=models.Q(('datamode', 'D'), _negated=True), fields=['-updated_on'], name='state_live_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='subcategory',
+            index=models.Index(fields=['datamode', '-updated_on'], name='sub_category_dm_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='subcategory',
+            index=models.Index(condition=models.Q(('datamode', 'D'), _negated=True), fields=['-updated_on'], name='sub_category_live_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='supportpagecontent',
+            index=models.Index(fields=['datamode', '-updated_on'], name='support_page_content_dm_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='supportpagecontent',
+            index=models.Index(condition=models.Q(('datamode', 'D'), _negated=True), fields=['-updated_on'], name='support_page_content_live_idx'),
+        ),
+    ]
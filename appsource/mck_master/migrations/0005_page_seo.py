@@ -0,0 +1,32 @@
+# SEO tags managed from the database, see config/app_seo.py
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('mck_master', '0004_datamode_indexes'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='PageSeo',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('page_key', models.CharField(db_index=True, help_text='Key given to app_seo.get_page_tags, e.g. home_page', max_length=255)),
+                ('title', models.CharField(max_length=255)),
+                ('description', models.TextField(blank=True, default='')),
+                ('keywords', models.CharField(blank=True, default='', max_length=255)),
+                ('created_on', models.DateTimeField(auto_now_add=True)),
+                ('updated_on', models.DateTimeField(auto_now=True)),
+                ('created_by', models.CharField(max_length=8)),
+                ('updated_by', models.CharField(max_length=8)),
+                ('datamode', models.CharField(choices=[('A', 'Active'), ('I', 'Inactivated'), ('D', 'Deleted')], default='A', max_length=1)),
+            ],
+            options={
+                'db_table': 'page_seo',
+                'indexes': [models.Index(fields=['datamode', '-updated_on'], name='page_seo_dm_idx'), models.Index(condition=models.Q(('datamode', 'D'), _negated=True), fields=['-updated_on'], name='page_seo_live_idx')],
+            },
+        ),
+    ]
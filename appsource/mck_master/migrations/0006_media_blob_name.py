@@ -0,0 +1,23 @@
+# Generated by Django 5.1.4 on 2026-10-18 20:44
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('mck_master', '0005_page_seo'),
+    ]
+
+    operations = [
+        migrations.AlterField(
+            model_name='mediablob',
+            name='name',
+            field=models.CharField(help_text='Storage name of the content, see config/app_storage.py', max_length=255, unique=True),
+        ),
+        migrations.AlterField(
+            model_name='mediablob',
+            name='sha256',
+            field=models.CharField(db_index=True, max_length=64),
+        ),
+    ]
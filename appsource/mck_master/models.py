@@ -1,5 +1,6 @@
 from django.db import models
 from config import app_gv as gv
+from config.app_models import ActiveManager, datamode_indexes
 
 
 # Create your models here.
@@ -15,9 +16,11 @@ class Country(models.Model):
     created_on = models.DateTimeField(auto_now_add=True)
     updated_on = models.DateTimeField(auto_now=True)
     datamode = models.CharField(max_length=20, default='A', choices=gv.DATAMODE_CHOICES)
+    objects = ActiveManager()
 
     class Meta:
         db_table = 'country'
+        indexes = datamode_indexes('country')
 
     def __str__(self):
         return self.name
@@ -30,9 +33,11 @@ class State(models.Model):
     created_on = models.DateTimeField(auto_now_add=True)
     updated_on = models.DateTimeField(auto_now=True)
     datamode = models.CharField(max_length=20, default='A', choices=gv.DATAMODE_CHOICES)
+    objects = ActiveManager()
 
     class Meta:
         db_table = 'state'
+        indexes = datamode_indexes('state')
 
     def __str__(self):
         return self.name
@@ -45,6 +50,7 @@ class City(models.Model):
     created_on = models.DateTimeField(auto_now_add=True)
     updated_on = models.DateTimeField(auto_now=True)
     datamode = models.CharField(max_length=20, default='A', choices=gv.DATAMODE_CHOICES)
+    objects = ActiveManager()
 
     
 
@@ -53,6 +59,7 @@ class City(models.Model):
     
     class Meta:
         db_table = 'city'
+        indexes = datamode_indexes('city')
 
 class SupportPageContent(models.Model):
     support_key = models.CharField(max_length=255)
@@ -65,12 +72,34 @@ class SupportPageContent(models.Model):
     created_by = models.CharField(max_length=8)
     updated_by = models.CharField(max_length=8)
     datamode = models.CharField(max_length=1, default='A', choices=gv.DATAMODE_CHOICES)
+    objects = ActiveManager()
 
     def __str__(self):
         return "{0}".format(self.support_value)
 
     class Meta:
         db_table = 'support_page_content'
+        indexes = datamode_indexes('support_page_content')
+
+
+class PageSeo(models.Model):
+    page_key = models.CharField(max_length=255, db_index=True, help_text="Key given to app_seo.get_page_tags, e.g. home_page")
+    title = models.CharField(max_length=255)
+    description = models.TextField(blank=True, default="")
+    keywords = models.CharField(max_length=255, blank=True, default="")
+    created_on = models.DateTimeField(auto_now_add=True)
+    updated_on = models.DateTimeField(auto_now=True)
+    created_by = models.CharField(max_length=8)
+    updated_by = models.CharField(max_length=8)
+    datamode = models.CharField(max_length=1, default='A', choices=gv.DATAMODE_CHOICES)
+    objects = ActiveManager()
+
+    class Meta:
+        db_table = 'page_seo'
+        indexes = datamode_indexes('page_seo')
+
+    def __str__(self):
+        return self.page_key
 
 
 class VersionControl(models.Model):
@@ -86,6 +115,50 @@ class VersionControl(models.Model):
         return "{0}-{1}".format(self.app, self.version)
 
 
+class EmailOutbox(models.Model):
+    subject = models.CharField(max_length=255)
+    body = models.TextField()
+    from_email = models.CharField(max_length=255)
+    to = models.TextField(help_text="Comma separated recipients")
+    status = models.CharField(max_length=10, default='PENDING', choices=gv.EMAIL_STATUS)
+    attempts = models.PositiveSmallIntegerField(default=0)
+    next_attempt_on = models.DateTimeField(db_index=True)
+    claimed_by = models.CharField(max_length=64, blank=True, default="")
+    claimed_on = models.DateTimeField(blank=True, null=True)
+    last_error = models.TextField(blank=True, default="")
+    sent_on = models.DateTimeField(blank=True, null=True)
+    created_on = models.DateTimeField(auto_now_add=True)
+    updated_on = models.DateTimeField(auto_now=True)
+    datamode = models.CharField(max_length=20, default='A', choices=gv.DATAMODE_CHOICES)
+
+    class Meta:
+        db_table = 'email_outbox'
+        indexes = [models.Index(fields=['status', 'next_attempt_on'], name='email_outbox_due_idx')]
+
+    def __str__(self):
+        return "{0} - {1}".format(self.to, self.subject)
+
+    @property
+    def recipients(self):
+        return [email.strip() for email in self.to.split(",") if email.strip()]
+
+
+class MediaBlob(models.Model):
+    sha256 = models.CharField(max_length=64, db_index=True)
+    # one row per stored file, the same content saved with another extension is another file
+    name = models.CharField(max_length=255, unique=True, help_text="Storage name of the content, see config/app_storage.py")
+    size = models.PositiveBigIntegerField(default=0)
+    refcount = models.PositiveIntegerField(default=0)
+    created_on = models.DateTimeField(auto_now_add=True)
+    updated_on = models.DateTimeField(auto_now=True)
+
+    class Meta:
+        db_table = 'media_blob'
+
+    def __str__(self):
+        return "{0} ({1})".format(self.name, self.refcount)
+
+
 class MasterPermission(models.Model):
     app_name = models.CharField(max_length=255, db_index=True) # App Name
     class_name = models.CharField(max_length=255, unique=True, db_index=True) # Class Name
@@ -94,12 +167,14 @@ class MasterPermission(models.Model):
     created_on = models.DateTimeField(auto_now_add=True)
     updated_on = models.DateTimeField(auto_now=True)
     datamode = models.CharField(max_length=20, default='A', choices=gv.DATAMODE_CHOICES)
+    objects = ActiveManager()
 
     def __str__(self):
         return f"{self.class_name} - {self.function_name}"
 
     class Meta:
         db_table = 'master_permission'
+        indexes = datamode_indexes('master_permission')
 
 
 
@@ -111,9 +186,11 @@ class Category(models.Model):
     created_on = models.DateTimeField(auto_now_add=True)
     updated_on = models.DateTimeField(auto_now=True)
     datamode = models.CharField(max_length=20, default='A', choices=gv.DATAMODE_CHOICES)
+    objects = ActiveManager()
 
     class Meta:
         db_table = 'category'
+        indexes = datamode_indexes('category')
 
     def __str__(self):
         return self.name
@@ -128,9 +205,11 @@ class SubCategory(models.Model):
     created_on = models.DateTimeField(auto_now_add=True)
     updated_on = models.DateTimeField(auto_now=True)
     datamode = models.CharField(max_length=20, default='A', choices=gv.DATAMODE_CHOICES)
+    objects = ActiveManager()
 
     class Meta:
         db_table = 'sub_category'
+        indexes = datamode_indexes('sub_category')
 
     def __str__(self):
         return self.name
@@ -144,9 +223,11 @@ class Banner(models.Model):
     created_on = models.DateTimeField(auto_now_add=True)
     updated_on = models.DateTimeField(auto_now=True)
     datamode = models.CharField(max_length=20, default='A', choices=gv.DATAMODE_CHOICES)
+    objects = ActiveManager()
 
     class Meta:
         db_table = 'banner'
+        indexes = datamode_indexes('banner')
 
     def __str__(self):
         return self.name
@@ -160,9 +241,11 @@ class Gallery(models.Model):
     created_on = models.DateTimeField(auto_now_add=True)
     updated_on = models.DateTimeField(auto_now=True)
     datamode = models.CharField(max_length=20, default='A', choices=gv.DATAMODE_CHOICES)
+    objects = ActiveManager()
 
     class Meta:
         db_table = 'gallery'
+        indexes = datamode_indexes('gallery')
 
     def __str__(self):
         return self.name
@@ -176,9 +259,11 @@ class Offers(models.Model):
     created_on = models.DateTimeField(auto_now_add=True)
     updated_on = models.DateTimeField(auto_now=True)
     datamode = models.CharField(max_length=20, default='A', choices=gv.DATAMODE_CHOICES)
+    objects = ActiveManager()
 
     class Meta:
         db_table = 'offers'
+        indexes = datamode_indexes('offers')
     
     def __str__(self):
         return self.name
@@ -194,6 +279,7 @@ class ClientFeedback(models.Model):
     created_on = models.DateTimeField(auto_now_add=True)
     updated_on = models.DateTimeField(auto_now=True)
     datamode = models.CharField(max_length=20, default='A', choices=gv.DATAMODE_CHOICES)
+    objects = ActiveManager()
 
     
     def __str__(self):
@@ -201,4 +287,5 @@ class ClientFeedback(models.Model):
     
     class Meta:
         db_table = 'client_feedback'
+        indexes = datamode_indexes('client_feedback')
         
@@ -5,6 +5,7 @@ from django.contrib.auth import authenticate, login
 from django.forms.models import model_to_dict
 from config import app_utils
 from config import app_logger
+from config import app_reference
 from mck_auth.models import *
 from mck_auth import api as auth_api
 from mck_website.models import *
@@ -13,12 +14,49 @@ from mck_master.models import *
 from django.http import JsonResponse
 from django.http import HttpResponse
 from django.db import transaction
+from django.db.models import F, JSONField, OuterRef, Subquery
+from django.core.paginator import Paginator
+from django.conf import settings
 from datetime import datetime
 
 
 log_name = "app"
 logger = app_logger.createLogger(log_name)
 
+@app_logger.functionlogs(log=log_name)
+def home_page_property_list(request):
+    """
+    Featured / hot selling / latest listings for the home page.
+
+    The listing is capped at HOME_PAGE_PROPERTY_MAX rows and paginated, and each
+    row carries a `cover_image` (path of its latest active PropertyImage) and its
+    `cover_image_derivatives` fetched through correlated subqueries, so the page
+    never loads the image tables.
+    """
+    result = False
+    success_msg = "Success"
+    error_msg = 'Internal Server Error'
+    data = dict()
+    try:
+        cover = PropertyImage.objects.filter(property=OuterRef('pk')).live().latest_first()
+        queryset = Property.objects.live() \
+                                   .select_related('property_type') \
+                                   .annotate(cover_image=Subquery(cover.values('image')[:1]),
+                                             cover_image_derivatives=Subquery(
+                                                 cover.values('image_derivatives')[:1], output_field=JSONField())) \
+                                   .order_by(F('is_hot_selling').desc(nulls_last=True), '-updated_on')
+        queryset = queryset[:settings.HOME_PAGE_PROPERTY_MAX]
+
+        paginator = Paginator(queryset, settings.HOME_PAGE_PROPERTY_PAGE_SIZE)
+        data['properties'] = paginator.get_page(request.GET.get('page'))
+        result, msg = True, success_msg
+    except Exception as e:
+        result, msg = False, error_msg
+        exc_type, exc_obj, exc_traceback = sys.exc_info()
+        logger.error('Error at %s:%s' % (exc_traceback.tb_lineno, e))
+    return result, msg, data
+
+
 # @app_logger.functionlogs(log=log_name)
 # def ajax_property_save(request):
 #     result = False
@@ -0,0 +1,50 @@
+from django import template
+from django.core.files.storage import default_storage
+from django.utils.html import format_html
+from config import app_images
+
+register = template.Library()
+
+
+def _storage(image):
+    return getattr(image, 'storage', default_storage)
+
+
+def _url(image):
+    if hasattr(image, 'url'):
+        return image.url
+    return default_storage.url(image)
+
+
+@register.simple_tag
+def srcset(image, derivatives, image_format="webp"):
+    """
+    srcset attribute value of the image derivatives in one format (webp / jpeg)
+    """
+    return app_images.srcset(_storage(image), derivatives or dict(), image_format)
+
+
+@register.simple_tag
+def responsive_image(image, derivatives=None, alt="", sizes="100vw", width=None, loading="lazy"):
+    """
+    <picture> with the WebP and JPEG derivatives of the image, a plain <img>
+    of the original while they are not generated yet.
+    The image is a FieldFile or a storage name (e.g. an annotated image path),
+    width picks the fallback src for browsers without srcset.
+
+        {% responsive_image property.main_image property.image_derivatives alt=property.title sizes="(max-width: 768px) 100vw, 25vw" width=640 %}
+    """
+    if not image:
+        return ""
+    derivatives = derivatives or dict()
+    storage = _storage(image)
+    src = app_images.fallback_url(storage, derivatives, width)
+    if src is None:
+        return format_html('<img src="{}" alt="{}" loading="{}">', _url(image), alt, loading)
+    return format_html(
+        '<picture style="display: contents">'
+        '<source type="image/webp" srcset="{}" sizes="{}">'
+        '<img src="{}" srcset="{}" sizes="{}" alt="{}" loading="{}">'
+        '</picture>',
+        app_images.srcset(storage, derivatives, 'webp'), sizes,
+        src, app_images.srcset(storage, derivatives, 'jpeg'), sizes, alt, loading)
@@ -10,10 +10,15 @@ from django.views.generic import TemplateView
 from django.shortcuts import render, get_object_or_404
 from config import app_logger
 from config import app_seo as seo
+from config import app_search
+from config import app_facets
+from config import app_pagecache
 from squarebox.models import *
 from mck_website.api import *
+from mck_website import api as website_api
 from mck_website.models import *
 from django.urls import reverse 
+from django.utils.decorators import method_decorator
 from django.db.models import Prefetch
 from django.http import HttpResponse, JsonResponse, HttpResponseRedirect
 from mck_auth import build_table as bt
@@ -50,21 +55,12 @@ class HomePage(TemplateView):
         context = super().get_context_data(**kwargs)
         context['page_kwargs'] = seo.get_page_tags("home_page")
 
-        context["property"] = Property.objects.exclude(datamode='D').order_by('-updated_on')
-        context["property_type"] = PropertyType.objects.exclude(datamode='D').order_by('-updated_on')
-        context["property_image"] = PropertyImage.objects.exclude(datamode='D').order_by('-updated_on')
-        context["lead"] = Lead.objects.exclude(datamode='D').order_by('-updated_on')
-        context["cities"] = Property.objects.exclude(datamode='D') \
+        result, msg, data = website_api.home_page_property_list(request)
+        context["property"] = data.get('properties', [])
+        context["cities"] = Property.objects.live() \
                                             .values_list('city', flat=True) \
                                             .distinct() \
                                             .order_by('city')
-        context["property"] = (
-            Property.objects.exclude(datamode='D')
-            .prefetch_related(
-                Prefetch('images', queryset=PropertyImage.objects.exclude(datamode='D'))
-            )
-            .order_by('-updated_on')
-)
 
         logger.info(request.GET)
         return render(request, self.template_name, context)
@@ -76,40 +72,21 @@ class PropertyPage(TemplateView):
     def get(self, request, *args, **kwargs):
         context = super().get_context_data(**kwargs)
         
-        # Get all properties excluding deleted ones
-        qs = Property.objects.exclude(datamode='D')
-        
-        # Apply filters
-        city = request.GET.get('city')
-        listing_type = request.GET.get("listing_type")
-        property_type = request.GET.get('property_type')
-        budget = request.GET.get('budget')
-        sort = request.GET.get('sort', 'newest')
-
-        if city:
-            qs = qs.filter(city__icontains=city)
-
-        if property_type:
-            qs = qs.filter(property_type__name__iexact=property_type)
-
-        if listing_type:
-            qs = qs.filter(listing_type__iexact=listing_type)
-
-        if budget:
-            if budget == "Below 100k":
-                qs = qs.filter(price__lt=100000)
-            elif budget == "100k - 300k":
-                qs = qs.filter(price__range=(100000, 300000))
-            elif budget == "Above 300k":
-                qs = qs.filter(price__gt=300000)
+        # Get all properties excluding deleted ones, with the sidebar filters
+        filters = app_facets.get_filters(request.GET)
+        city = filters.get('city')
+        sort = request.GET.get('sort')
+        qs = app_facets.filter_queryset(Property.objects.live().select_related('property_type'),
+                                        filters, ranked=True)
 
         # Apply sorting
         if sort == 'price_low':
             qs = qs.order_by('price')
         elif sort == 'price_high':
             qs = qs.order_by('-price')
-        else:  # newest
+        elif sort == 'newest' or not city:
             qs = qs.order_by('-updated_on')
+        # otherwise keep the best city matches first
 
        
 
@@ -122,19 +99,14 @@ class PropertyPage(TemplateView):
         properties.object_list = properties.object_list.prefetch_related(
             Prefetch(
                 'images',  
-                queryset=PropertyImage.objects.exclude(datamode='D').order_by('-updated_on'),
+                queryset=PropertyImage.objects.live().latest_first(),
                 to_attr='property_images_list'  
             )
         )
 
         context["properties"] = properties
-        context["property_types"] = PropertyType.objects.exclude(datamode='D').order_by('-updated_on')
-        context["cities"] = (
-            Property.objects.exclude(datamode='D')
-            .values_list('city', flat=True)
-            .distinct()
-            .order_by('city')
-        )
+        context["filters"] = filters
+        context["facets"] = app_facets.get_facets(filters)
 
         return render(request, self.template_name, context)
 
@@ -147,16 +119,17 @@ class PropertyDetailPage(TemplateView):
 
         property_id = kwargs.get('pk')  # from URL
         property_obj = get_object_or_404(
-            Property.objects.prefetch_related(
+            Property.objects.select_related('property_type').prefetch_related(
                 Prefetch(
                     'images',
-                    queryset=PropertyImage.objects.exclude(datamode='D').order_by('-updated_on')
+                    queryset=PropertyImage.objects.live().latest_first()
                 )
             ),
             pk=property_id
         )
 
         context["property"] = property_obj
+        context['page_kwargs'] = seo.get_page_tags("property_detail", seo.property_tags(property_obj))
         return render(request, self.template_name, context)
 
 class PropertyCreatePage(TemplateView):
@@ -166,7 +139,7 @@ class PropertyCreatePage(TemplateView):
     def get(self, request, *args, **kwargs):
         context = super().get_context_data(**kwargs)
         context["page_kwargs"] = seo.get_page_tags("property_create")
-        property = Property.objects.exclude(datamode='D').order_by('-updated_on')
+        property = Property.objects.live().latest_first()
         context["property"] = property
         logger.info(request.GET)
         return render(request, self.template_name, context)
@@ -179,7 +152,7 @@ class MaintenancesCreatePage(TemplateView):
     def get(self, request, *args, **kwargs):
         context = super().get_context_data(**kwargs)
         context["page_kwargs"] = seo.get_page_tags("maintenance")
-        maintenance = MaintenanceRequest.objects.exclude(datamode='D').order_by('-updated_on')
+        maintenance = MaintenanceRequest.objects.live().latest_first()
         context["maintenance"] = maintenance
         logger.info(request.GET)
         return render(request, self.template_name, context)
@@ -232,7 +205,7 @@ class EnquiryCreatePage(TemplateView):
     def get(self, request, *args, **kwargs):
         context = super().get_context_data(**kwargs)
         context["page_kwargs"] = seo.get_page_tags("lead")
-        lead = Lead.objects.exclude(datamode='D').order_by('-updated_on')
+        lead = Lead.objects.live().latest_first()
         context["lead"] = lead
         property_type = request.GET.get('property_type', '')
         context["selected_property_type"] = property_type  
@@ -258,6 +231,7 @@ class EnquirySaveView(TemplateView):
             logger.exception("Unexpected error in leadSaveView")
             return JsonResponse({"status": "error", "message": str(e)}, status=500)
 
+@method_decorator(app_pagecache.cache_page, name='dispatch')
 class AboutPage(TemplateView):
     """
     About Page
@@ -271,6 +245,7 @@ class AboutPage(TemplateView):
         logger.info(request.GET)
         return render(request, self.template_name, context)
     
+@method_decorator(app_pagecache.cache_page, name='dispatch')
 class OurServicesPage(TemplateView):
     """
     ourservices Page
@@ -285,6 +260,7 @@ class OurServicesPage(TemplateView):
         return render(request, self.template_name, context)
     
 
+@method_decorator(app_pagecache.cache_page, name='dispatch')
 class PrivacyPolicyPage(TemplateView):
     """
     ourservices Page
@@ -298,6 +274,7 @@ class PrivacyPolicyPage(TemplateView):
         logger.info(request.GET)
         return render(request, self.template_name, context)
 
+@method_decorator(app_pagecache.cache_page, name='dispatch')
 class TermsPage(TemplateView):
     """
     terms Page
@@ -311,6 +288,7 @@ class TermsPage(TemplateView):
         logger.info(request.GET)
         return render(request, self.template_name, context)
     
+@method_decorator(app_pagecache.cache_page, name='dispatch')
 class PropertyLegalServicesPage(TemplateView):
     """
     terms Page
@@ -324,6 +302,7 @@ class PropertyLegalServicesPage(TemplateView):
         logger.info(request.GET)
         return render(request, self.template_name, context)
 
+@method_decorator(app_pagecache.cache_page, name='dispatch')
 class SolarPage(TemplateView):
     template_name = "solar.html"
     @app_logger.functionlogs(log=LOG_NAME)
@@ -334,6 +313,7 @@ class SolarPage(TemplateView):
         return render(request, self.template_name, context)
 
 
+@method_decorator(app_pagecache.cache_page, name='dispatch')
 class FencingPage(TemplateView):
     template_name = "fencing.html"
     @app_logger.functionlogs(log=LOG_NAME)
@@ -343,6 +323,7 @@ class FencingPage(TemplateView):
         logger.info(request.GET)
         return render(request, self.template_name, context)
     
+@method_decorator(app_pagecache.cache_page, name='dispatch')
 class LandLevellingPage(TemplateView):
     template_name = "pages/land_leveling.html"
     @app_logger.functionlogs(log=LOG_NAME)
@@ -0,0 +1,95 @@
+import os
+import sys
+import json
+import time
+import shutil
+import tempfile
+import traceback
+import subprocess
+from django.conf import settings
+from config import app_logger
+
+
+logger = app_logger.createLogger("app_scripts")
+
+PROFILES = ('development', 'production')
+URLS = ['/', '/properties/', '/about/', '/our-services/', '/terms/']
+WARMUP = 20
+
+
+def measure(requests, urls):
+    """
+    Requests per second of the urls through the WSGI handler of this process
+    """
+    from django.test import Client
+    client = Client()
+    for index in range(WARMUP):
+        client.get(urls[index % len(urls)])
+    results = dict()
+    for url in urls:
+        start = time.perf_counter()
+        for index in range(requests):
+            response = client.get(url)
+        seconds = time.perf_counter() - start
+        results[url] = dict(status=response.status_code, rps=requests / seconds)
+    return results
+
+
+def manage(profile, database, *args):
+    environ = dict(os.environ, APP_ENV=profile, APP_SQLITE_PATH=database)
+    command = [sys.executable, os.path.join(settings.BASE_DIR, 'manage.py')] + list(args)
+    process = subprocess.run(command, env=environ, capture_output=True, text=True)
+    if process.returncode:
+        raise RuntimeError(process.stderr)
+    return process.stdout
+
+
+def run_profile(profile, requests, urls, database):
+    """
+    Measures the urls in a new process running the settings profile
+    """
+    output = manage(profile, database, 'runscript', 'script_benchmark_profiles',
+                    '--script-args', 'measure', str(requests), *urls)
+    return json.loads(output.strip().splitlines()[-1])
+
+
+@app_logger.functionlogs(log="app_scripts")
+def benchmark_profiles(requests=200, urls=None):
+    try:
+        urls = urls or URLS
+        # both profiles run on a copy, WAL mode must not touch the project database
+        directory = tempfile.mkdtemp(prefix="benchmark-")
+        database = os.path.join(directory, "benchmark.sqlite3")
+        shutil.copy(settings.DATABASES['default']['NAME'], database)
+        manage('development', database, 'migrate', '--noinput')
+        try:
+            results = {profile: run_profile(profile, requests, urls, database) for profile in PROFILES}
+        finally:
+            shutil.rmtree(directory)
+
+        lines = ["{0:<20} {1:>8} {2:>14} {3:>14} {4:>8}".format("url", "status", *PROFILES, "speedup")]
+        for url in urls:
+            before, after = results['development'][url], results['production'][url]
+            lines.append("{0:<20} {1:>8} {2:>14.1f} {3:>14.1f} {4:>7.2f}x".format(
+                url, after['status'], before['rps'], after['rps'], after['rps'] / before['rps']))
+        report = "\n".join(lines)
+        logger.info("Requests per second, %s requests per url\n%s" % (requests, report))
+        print(report)
+    except Exception as error:
+       logger.error(traceback.format_exc())
+       raise error
+
+@app_logger.functionlogs(log="app_scripts")
+def run(*args):
+    """
+    python manage.py runscript script_benchmark_profiles [--script-args <requests> <url> ..]
+
+    Requests per second of the website pages in the development and the
+    production settings profile (APP_ENV), each in its own process
+    """
+    if args and args[0] == 'measure':
+        print(json.dumps(measure(int(args[1]), list(args[2:]))))
+        return
+    logger.info("Starting ...")
+    benchmark_profiles(int(args[0]) if args else 200, list(args[1:]))
+    logger.info("End !!!")
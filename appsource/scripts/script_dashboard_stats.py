@@ -0,0 +1,29 @@
+import traceback
+from config import app_logger
+from config import app_stats
+
+
+logger = app_logger.createLogger("app_scripts")
+
+
+@app_logger.functionlogs(log="app_scripts")
+def rebuild_dashboard_stats():
+    try:
+        rows = app_stats.rebuild()
+        logger.info("%s dashboard counters rebuilt" % rows)
+    except Exception as error:
+       logger.error(traceback.format_exc())
+       raise error
+
+@app_logger.functionlogs(log="app_scripts")
+def run(*args):
+    """
+    python manage.py runscript script_dashboard_stats
+
+    Recomputes the dashboard counters (config/app_stats.py) from the tables,
+    after a deploy of the stats or rows written without the model signals
+    (queryset.update(), bulk_create(), loaddata)
+    """
+    logger.info("Starting ...")
+    rebuild_dashboard_stats()
+    logger.info("End !!!")
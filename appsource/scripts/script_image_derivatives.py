@@ -0,0 +1,39 @@
+import traceback
+from django.apps import apps
+from config import app_logger
+from config import app_images
+
+
+logger = app_logger.createLogger("app_scripts")
+
+
+@app_logger.functionlogs(log="app_scripts")
+def generate_image_derivatives(model_label=None):
+    try:
+        for label, field_name in app_images.IMAGE_FIELDS.items():
+            if model_label and label != model_label:
+                continue
+            model = apps.get_model(label)
+            rows = model.objects.exclude(**{field_name: ""}).exclude(**{field_name: None}).only(
+                'pk', field_name, 'image_derivatives')
+            for row in rows.iterator():
+                if not app_images.is_stale(row, field_name):
+                    continue
+                try:
+                    app_images.process(label, row.pk)
+                except Exception as e:
+                    # a missing or broken upload must not stop the others
+                    logger.error("Image derivatives of %s %s failed: %s" % (label, row.pk, e))
+            logger.info("Image derivatives of %s generated" % label)
+    except Exception as error:
+       logger.error(traceback.format_exc())
+       raise error
+
+@app_logger.functionlogs(log="app_scripts")
+def run(*args):
+    """
+    python manage.py runscript script_image_derivatives [--script-args squarebox.Property]
+    """
+    logger.info("Starting ...")
+    generate_image_derivatives(args[0] if args else None)
+    logger.info("End !!!")
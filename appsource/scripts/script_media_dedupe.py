@@ -0,0 +1,161 @@
+import os
+import shutil
+import traceback
+from collections import Counter
+from django.apps import apps
+from django.core.files import File
+from django.core.files.storage import default_storage
+from config import app_logger
+from config import app_images
+from config import app_storage
+from mck_master.models import MediaBlob
+
+
+logger = app_logger.createLogger("app_scripts")
+
+LEGACY_DIRECTORY = "ddata"
+
+
+def _link(source, target):
+    """
+    Makes target a hard link of source, a copy on file systems without links
+    """
+    temp_path = "{0}.dedupe-tmp".format(target)
+    try:
+        os.link(source, temp_path)
+    except OSError:
+        shutil.copy2(source, temp_path)
+    os.replace(temp_path, target)
+
+
+def move_to_content_addresses():
+    """
+    Stores every file of media/ddata under its content address, the old path
+    becomes a hard link of it. Returns {old name: content addressed name}
+    """
+    names = dict()
+    root = default_storage.path(LEGACY_DIRECTORY)
+    for directory, dirnames, filenames in os.walk(root):
+        for filename in filenames:
+            path = os.path.join(directory, filename)
+            name = os.path.relpath(path, default_storage.location).replace(os.sep, "/")
+            with open(path, "rb") as source:
+                sha256, size = app_storage.file_hash(File(source))
+            cas_name = app_storage.content_name(sha256, name)
+            cas_path = default_storage.path(cas_name)
+            if not os.path.exists(cas_path):
+                os.makedirs(os.path.dirname(cas_path), exist_ok=True)
+                _link(path, cas_path)
+            elif not os.path.samefile(path, cas_path):
+                _link(cas_path, path)
+            names[name] = cas_name
+    logger.info("%s files of %s stored by content" % (len(names), LEGACY_DIRECTORY))
+    return names
+
+
+def _remap_derivatives(derivatives, names):
+    remapped = dict()
+    for key, value in derivatives.items():
+        if isinstance(value, dict):
+            remapped[key] = {width: names.get(name, name) for width, name in value.items()}
+        elif isinstance(value, str):
+            remapped[key] = names.get(value, value)
+        else:
+            remapped[key] = value
+    return remapped
+
+
+def rewrite_references(names):
+    """
+    Points the file fields (and the image derivatives) of every row at the content addresses
+    """
+    for model in apps.get_models():
+        fields = app_storage.file_fields(model)
+        label = model._meta.label
+        derivatives_field = 'image_derivatives' if label in app_images.IMAGE_FIELDS else None
+        if not fields:
+            continue
+        lookups = [field.attname for field in fields] + ([derivatives_field] if derivatives_field else [])
+        updated = 0
+        for row in model._base_manager.values('pk', *lookups).iterator():
+            changes = dict()
+            for field in fields:
+                if row[field.attname] in names:
+                    changes[field.attname] = names[row[field.attname]]
+            if derivatives_field and row[derivatives_field]:
+                derivatives = _remap_derivatives(row[derivatives_field], names)
+                if derivatives != row[derivatives_field]:
+                    changes[derivatives_field] = derivatives
+            if changes:
+                # update() keeps updated_on and skips the save signals
+                model._base_manager.filter(pk=row['pk']).update(**changes)
+                updated += 1
+        logger.info("%s rows of %s rewritten" % (updated, label))
+
+
+def recount_references():
+    """
+    Recomputes MediaBlob from the rows and drops the contents nothing refers to
+    """
+    references = Counter()
+    for model in apps.get_models():
+        fields = app_storage.file_fields(model)
+        for field in fields:
+            for name in model._base_manager.exclude(**{field.attname: ""}).values_list(field.attname, flat=True):
+                if app_storage.content_hash(name):
+                    references[name] += 1
+        if fields and model._meta.label in app_images.IMAGE_FIELDS:
+            for derivatives in model._base_manager.values_list('image_derivatives', flat=True):
+                for key in app_images.FORMATS:
+                    for name in (derivatives or dict()).get(key, dict()).values():
+                        if app_storage.content_hash(name):
+                            references[name] += 1
+
+    blobs = {blob.name: blob for blob in MediaBlob.objects.all()}
+    for name, refcount in references.items():
+        if not default_storage.exists(name):
+            logger.error("Missing content %s (%s references)" % (name, refcount))
+            continue
+        blob = blobs.pop(name, None) or MediaBlob(name=name)
+        blob.sha256, blob.size, blob.refcount = app_storage.content_hash(name), default_storage.size(name), refcount
+        blob.save()
+
+    # the rest is not referenced anymore
+    removed = 0
+    for blob in blobs.values():
+        if default_storage.exists(blob.name):
+            os.remove(default_storage.path(blob.name))
+        blob.delete()
+        removed += 1
+    root = default_storage.path(app_storage.CAS_DIRECTORY)
+    for directory, dirnames, filenames in os.walk(root):
+        for filename in filenames:
+            name = os.path.relpath(os.path.join(directory, filename), default_storage.location).replace(os.sep, "/")
+            if name not in references:
+                os.remove(default_storage.path(name))
+                removed += 1
+    logger.info("%s contents referenced, %s removed" % (len(references), removed))
+
+
+@app_logger.functionlogs(log="app_scripts")
+def dedupe_media(mode="migrate"):
+    try:
+        if mode == "migrate":
+            names = move_to_content_addresses()
+            rewrite_references(names)
+        recount_references()
+    except Exception as error:
+       logger.error(traceback.format_exc())
+       raise error
+
+@app_logger.functionlogs(log="app_scripts")
+def run(*args):
+    """
+    python manage.py runscript script_media_dedupe [--script-args recount]
+
+    migrate (default) moves media/ddata to content addressed storage and
+    recounts the references, recount only recomputes them
+    """
+    logger.info("Starting ...")
+    dedupe_media(args[0] if args else "migrate")
+    logger.info("End !!!")
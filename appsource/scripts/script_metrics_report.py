@@ -0,0 +1,27 @@
+import traceback
+from config import app_logger
+from config import app_metrics
+
+
+logger = app_logger.createLogger("app_scripts")
+
+
+@app_logger.functionlogs(log="app_scripts")
+def metrics_report(limit):
+    try:
+        report = app_metrics.top_report(limit)
+        logger.info(report)
+        print(report)
+    except Exception as error:
+       logger.error(traceback.format_exc())
+       raise error
+
+@app_logger.functionlogs(log="app_scripts")
+def run(*args):
+    """
+    python manage.py runscript script_metrics_report [--script-args 50]
+    Top N functions and views by total time, merged from the snapshots in settings.APP_METRICS_DIR
+    """
+    logger.info("Starting ...")
+    metrics_report(int(args[0]) if args else 20)
+    logger.info("End !!!")
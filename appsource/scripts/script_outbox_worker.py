@@ -0,0 +1,34 @@
+import time
+import traceback
+from config import settings
+from config import app_logger
+from config import app_outbox
+
+
+logger = app_logger.createLogger("app_scripts")
+
+
+@app_logger.functionlogs(log="app_scripts")
+def send_outbox(loop=False):
+    try:
+        while True:
+            sent = app_outbox.send_pending()
+            if sent:
+                logger.info("Sent %s emails" % sent)
+            if not loop:
+                break
+            time.sleep(settings.OUTBOX_POLL_INTERVAL)
+    except Exception as error:
+       logger.error(traceback.format_exc())
+       raise error
+
+@app_logger.functionlogs(log="app_scripts")
+def run(*args):
+    """
+    python manage.py runscript script_outbox_worker [--script-args loop]
+
+    Sends the due emails of the outbox once, or keeps polling with loop
+    """
+    logger.info("Starting ...")
+    send_outbox(loop="loop" in args)
+    logger.info("End !!!")
@@ -0,0 +1,34 @@
+import traceback
+from config import settings
+from config import app_logger
+from config import app_pagecache
+
+
+logger = app_logger.createLogger("app_scripts")
+
+
+@app_logger.functionlogs(log="app_scripts")
+def purge_pages(paths):
+    try:
+        app_pagecache.purge(paths)
+        logger.info("Purged %s" % (", ".join(paths) if paths else "every cached page"))
+        if settings.PAGE_CACHE_LOCAL_TIMEOUT:
+            logger.info("The workers serve their copy in memory for up to %ss more"
+                        % settings.PAGE_CACHE_LOCAL_TIMEOUT)
+    except Exception as error:
+       logger.error(traceback.format_exc())
+       raise error
+
+@app_logger.functionlogs(log="app_scripts")
+def run(*args):
+    """
+    python manage.py runscript script_page_cache [--script-args /about/ /terms/ ..]
+
+    Purges the anonymous page cache (config/app_pagecache.py), every page
+    or only the given paths; the web workers keep their copy in memory for
+    up to PAGE_CACHE_LOCAL_TIMEOUT seconds, the header / footer fragments
+    for PAGE_FRAGMENT_CACHE_TIMEOUT
+    """
+    logger.info("Starting ...")
+    purge_pages(list(args))
+    logger.info("End !!!")
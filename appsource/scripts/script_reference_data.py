@@ -0,0 +1,32 @@
+import traceback
+from config import app_logger
+from config import app_reference
+
+
+logger = app_logger.createLogger("app_scripts")
+
+
+@app_logger.functionlogs(log="app_scripts")
+def bump_reference_versions(labels):
+    try:
+        for label in labels:
+            app_reference.bump(label)
+            logger.info("%s reference data version bumped" % label)
+    except Exception as error:
+       logger.error(traceback.format_exc())
+       raise error
+
+@app_logger.functionlogs(log="app_scripts")
+def run(*args):
+    """
+    python manage.py runscript script_reference_data
+    python manage.py runscript script_reference_data --script-args mck_master.City squarebox.PropertyType
+
+    Writes new version stamps of the reference tables (config/app_reference.py),
+    every process reloads its snapshot, after rows written without the model
+    signals (queryset.update(), bulk_create(), loaddata)
+    """
+    logger.info("Starting ...")
+    labels = [label for label in app_reference.REFERENCE_MODELS if not args or label in args]
+    bump_reference_versions(labels)
+    logger.info("End !!!")
@@ -0,0 +1,36 @@
+import time
+import traceback
+from config import settings
+from config import app_logger
+from config import app_replica
+
+
+logger = app_logger.createLogger("app_scripts")
+
+
+@app_logger.functionlogs(log="app_scripts")
+def sync_replica(loop=False):
+    try:
+        if not app_replica.is_enabled():
+            logger.info("No replica database, set APP_DATABASE_REPLICA=1")
+            return
+        while True:
+            app_replica.sync_replica(wait=True)
+            if not loop:
+                break
+            time.sleep(settings.DATABASE_REPLICA_SYNC_INTERVAL)
+    except Exception as error:
+       logger.error(traceback.format_exc())
+       raise error
+
+@app_logger.functionlogs(log="app_scripts")
+def run(*args):
+    """
+    python manage.py runscript script_replica_sync [--script-args loop]
+
+    Copies the default database into the replica once, or every
+    DATABASE_REPLICA_SYNC_INTERVAL seconds with loop
+    """
+    logger.info("Starting ...")
+    sync_replica(loop="loop" in args)
+    logger.info("End !!!")
@@ -0,0 +1,29 @@
+import traceback
+from config import settings
+from config import app_logger
+from config import app_search
+
+
+logger = app_logger.createLogger("app_scripts")
+
+
+@app_logger.functionlogs(log="app_scripts")
+def rebuild_search_index(model_label=None):
+    try:
+        for label in settings.SEARCH_INDEXES:
+            if model_label and label != model_label:
+                continue
+            logger.info("Rebuilding search index of %s" % label)
+        app_search.rebuild(model_label)
+    except Exception as error:
+       logger.error(traceback.format_exc())
+       raise error
+
+@app_logger.functionlogs(log="app_scripts")
+def run(*args):
+    """
+    python manage.py runscript script_search_rebuild [--script-args squarebox.Property]
+    """
+    logger.info("Starting ...")
+    rebuild_search_index(args[0] if args else None)
+    logger.info("End !!!")
@@ -1,13 +1,13 @@
 import sys
-from phonenumber_field.phonenumber import PhoneNumber
-from django.urls import reverse
-from django.forms.models import model_to_dict
 from config import app_utils
+from config import app_rows
 from config import app_logger
+from config import app_reference
+from config import app_outbox
 from mck_auth import api as auth_api
 from django.utils.dateparse import parse_datetime
 from squarebox.models import *
-from django.core.mail import send_mail, EmailMessage
+from django.db import transaction
 from django.conf import settings
 
 log_name = "app"
@@ -23,34 +23,12 @@ def property_load_data(request, table_data):
     error_msg = 'Internal Server Error'
     fResult = list()
     try:
-        queryset = Property.objects.exclude(datamode='D').order_by('-updated_on')
+        queryset = Property.objects.live().latest_first()
+        renderer = app_rows.RowRenderer(queryset, table_data, edit_url='squarebox:property_update')
         qs, total_records, total_display_records = app_utils.method_for_datatable_operations(
-            request, queryset)
-
-        final_data = list()
-        for qs_instance in qs:
-            qs_data = model_to_dict(qs_instance)
-            data = list()
-            edit_url = reverse('squarebox:property_update', args=[qs_data['id']])
-
-            for column in table_data['columns']:
-                if column['column_name'] == "datamode":
-                    if qs_instance.datamode == "A":
-                        data.append('<div class="text-success">'+qs_instance.get_datamode_display()+'</div>')
-                        data.append('<div class="text-end"><a href="'+edit_url+'" class="text-primary pe-2 ps-2">Edit</a> | <a href="javascript:void()" class="text-danger ps-2" onclick="delete_object('+str(qs_data['id'])+')">Inactivate</a></div>')
-                    else:
-                        data.append('<div class="text-danger">'+qs_instance.get_datamode_display()+'</div>')
-                        data.append('<div class="text-end"><a href="'+edit_url+'" class="text-primary pe-2 ps-2">Edit</a> | <a href="javascript:void()" class="text-success ps-2" onclick="delete_object('+str(qs_data['id'])+')">Activate</a></div>')
-                # elif column['column_name'] == "property_type":
-                #     data.append(qs_instance.name)
-                else:
-                    if isinstance(qs_data.get(column['column_name']), PhoneNumber):
-                        data.append(qs_data.get(column['column_name']).national_number)
-                    elif isinstance(qs_data.get(column['column_name']), models.ImageField):
-                        pass
-                    else:
-                        data.append(qs_data.get(column['column_name'], "-"))
-            final_data.append(data)
+            request, renderer.queryset)
+
+        final_data = renderer.render(qs)
         fResult = app_utils.final_dict(request, total_records, total_display_records, final_data)
 
         result, msg = True, success_msg
@@ -223,34 +201,12 @@ def property_type_load_data(request, table_data):
     error_msg = 'Internal Server Error'
     fResult = list()
     try:
-        queryset = PropertyType.objects.exclude(datamode='D').order_by('-updated_on')
+        queryset = PropertyType.objects.live().latest_first()
+        renderer = app_rows.RowRenderer(queryset, table_data, edit_url='squarebox:property_type_update')
         qs, total_records, total_display_records = app_utils.method_for_datatable_operations(
-            request, queryset)
-
-        final_data = list()
-        for qs_instance in qs:
-            qs_data = model_to_dict(qs_instance)
-            data = list()
-            edit_url = reverse('squarebox:property_type_update', args=[qs_data['id']])
-
-            for column in table_data['columns']:
-                if column['column_name'] == "datamode":
-                    data.append('<div class="text-success">'+qs_instance.get_datamode_display()+'</div>')
-                    data.append('<div class="text-end"><a href="'+edit_url+'" class="text-primary pe-2 ps-2">Edit</a>')
-                    if qs_instance.datamode == "A":
-                        data.append('<div class="text-success">'+qs_instance.get_datamode_display()+'</div>')
-                        data.append('<div class="text-end"><a href="'+edit_url+'" class="text-primary pe-2 ps-2">Edit</a> | <a href="javascript:void()" class="text-danger ps-2" onclick="delete_object('+str(qs_data['id'])+')">Inactivate</a></div>')
-                    else:
-                        data.append('<div class="text-danger">'+qs_instance.get_datamode_display()+'</div>')
-                        data.append('<div class="text-end"><a href="'+edit_url+'" class="text-primary pe-2 ps-2">Edit</a> | <a href="javascript:void()" class="text-success ps-2" onclick="delete_object('+str(qs_data['id'])+')">Activate</a></div>')
-                else:
-                    if isinstance(qs_data.get(column['column_name']), PhoneNumber):
-                        data.append(qs_data.get(column['column_name']).national_number)
-                    elif isinstance(qs_data.get(column['column_name']), models.ImageField):
-                        pass
-                    else:
-                        data.append(qs_data.get(column['column_name'], "-"))
-            final_data.append(data)
+            request, renderer.queryset)
+
+        final_data = renderer.render(qs)
         fResult = app_utils.final_dict(request, total_records, total_display_records, final_data)
 
         result, msg = True, success_msg
@@ -343,36 +299,12 @@ def lead_load_data(request, table_data):
     error_msg = 'Internal Server Error'
     fResult = list()
     try:
-        queryset = Lead.objects.exclude(datamode='D').order_by('-updated_on')
+        queryset = Lead.objects.live().latest_first()
+        renderer = app_rows.RowRenderer(queryset, table_data, edit_url='squarebox:lead_update')
         qs, total_records, total_display_records = app_utils.method_for_datatable_operations(
-            request, queryset)
-
-        final_data = list()
-        for qs_instance in qs:
-            qs_data = model_to_dict(qs_instance)
-            data = list()
-            edit_url = reverse('squarebox:lead_update', args=[qs_data['id']])
-
-            for column in table_data['columns']:
-                if column['column_name'] == "datamode":
-                    data.append('<div class="text-success">'+qs_instance.get_datamode_display()+'</div>')
-                    data.append('<div class="text-end"><a href="'+edit_url+'" class="text-primary pe-2 ps-2">Edit</a>')
-                    if qs_instance.datamode == "A":
-                        data.append('<div class="text-success">'+qs_instance.get_datamode_display()+'</div>')
-                        data.append('<div class="text-end"><a href="'+edit_url+'" class="text-primary pe-2 ps-2">Edit</a> | <a href="javascript:void()" class="text-danger ps-2" onclick="delete_object('+str(qs_data['id'])+')">Inactivate</a></div>')
-                    else:
-                        data.append('<div class="text-danger">'+qs_instance.get_datamode_display()+'</div>')
-                        data.append('<div class="text-end"><a href="'+edit_url+'" class="text-primary pe-2 ps-2">Edit</a> | <a href="javascript:void()" class="text-success ps-2" onclick="delete_object('+str(qs_data['id'])+')">Activate</a></div>')
-                elif column['column_name'] == "property":
-                    data.append(qs_instance.property.title) 
-                else:
-                    if isinstance(qs_data.get(column['column_name']), PhoneNumber):
-                        data.append(qs_data.get(column['column_name']).national_number)
-                    elif isinstance(qs_data.get(column['column_name']), models.ImageField):
-                        pass
-                    else:
-                        data.append(qs_data.get(column['column_name'], "-"))
-            final_data.append(data)
+            request, renderer.queryset)
+
+        final_data = renderer.render(qs)
         fResult = app_utils.final_dict(request, total_records, total_display_records, final_data)
 
         result, msg = True, success_msg
@@ -471,36 +403,12 @@ def property_image_load_data(request, table_data):
     error_msg = 'Internal Server Error'
     fResult = list()
     try:
-        queryset = PropertyImage.objects.exclude(datamode='D').order_by('-updated_on')
+        queryset = PropertyImage.objects.live().latest_first()
+        renderer = app_rows.RowRenderer(queryset, table_data, edit_url='squarebox:property_image_update')
         qs, total_records, total_display_records = app_utils.method_for_datatable_operations(
-            request, queryset)
-
-        final_data = list()
-        for qs_instance in qs:
-            qs_data = model_to_dict(qs_instance)
-            data = list()
-            edit_url = reverse('squarebox:property_image_update', args=[qs_data['id']])
-
-            for column in table_data['columns']:
-                if column['column_name'] == "datamode":
-                    data.append('<div class="text-success">'+qs_instance.get_datamode_display()+'</div>')
-                    data.append('<div class="text-end"><a href="'+edit_url+'" class="text-primary pe-2 ps-2">Edit</a>')
-                    if qs_instance.datamode == "A":
-                        data.append('<div class="text-success">'+qs_instance.get_datamode_display()+'</div>')
-                        data.append('<div class="text-end"><a href="'+edit_url+'" class="text-primary pe-2 ps-2">Edit</a> | <a href="javascript:void()" class="text-danger ps-2" onclick="delete_object('+str(qs_data['id'])+')">Inactivate</a></div>')
-                    else:
-                        data.append('<div class="text-danger">'+qs_instance.get_datamode_display()+'</div>')
-                        data.append('<div class="text-end"><a href="'+edit_url+'" class="text-primary pe-2 ps-2">Edit</a> | <a href="javascript:void()" class="text-success ps-2" onclick="delete_object('+str(qs_data['id'])+')">Activate</a></div>')
-                elif column['column_name'] == "property":
-                    data.append(qs_instance.property.title) 
-                else:
-                    if isinstance(qs_data.get(column['column_name']), PhoneNumber):
-                        data.append(qs_data.get(column['column_name']).national_number)
-                    elif isinstance(qs_data.get(column['column_name']), models.ImageField):
-                        pass
-                    else:
-                        data.append(qs_data.get(column['column_name'], "-"))
-            final_data.append(data)
+            request, renderer.queryset)
+
+        final_data = renderer.render(qs)
         fResult = app_utils.final_dict(request, total_records, total_display_records, final_data)
 
         result, msg = True, success_msg
@@ -594,33 +502,12 @@ def maintenance_load_data(request, table_data):
     error_msg = 'Internal Server Error'
     fResult = list()
     try:
-        queryset = MaintenanceRequest.objects.exclude(datamode='D').order_by('-updated_on')
+        queryset = MaintenanceRequest.objects.live().latest_first()
+        renderer = app_rows.RowRenderer(queryset, table_data, edit_url='squarebox:maintenance_update')
         qs, total_records, total_display_records = app_utils.method_for_datatable_operations(
-            request, queryset)
-
-        final_data = list()
-        for qs_instance in qs:
-            qs_data = model_to_dict(qs_instance)
-            data = list()
-            edit_url = reverse('squarebox:maintenance_update', args=[qs_data['id']])
-
-            for column in table_data['columns']:
-                if column['column_name'] == "datamode":
-                    if qs_instance.datamode == "A":
-                        data.append(f'<div class="text-success">{qs_instance.get_datamode_display()}</div>')
-                        data.append(f'<div class="text-end"><a href="{edit_url}" class="text-primary pe-2 ps-2">Edit</a> | '
-                                    f'<a href="javascript:void()" class="text-danger ps-2" onclick="delete_object({qs_data["id"]})">Inactivate</a></div>')
-                    else:
-                        data.append(f'<div class="text-danger">{qs_instance.get_datamode_display()}</div>')
-                        data.append(f'<div class="text-end"><a href="{edit_url}" class="text-primary pe-2 ps-2">Edit</a> | '
-                                    f'<a href="javascript:void()" class="text-success ps-2" onclick="delete_object({qs_data["id"]})">Activate</a></div>')
-                # elif column['column_name'] == "property":
-                #     data.append(qs_instance.property.title if qs_instance.property else "-")
-                # elif column['column_name'] == "assigned_to":
-                #     data.append(qs_instance.assigned_to.name if qs_instance.assigned_to else "-")
-                else:
-                    data.append(qs_data.get(column['column_name'], "-"))
-            final_data.append(data)
+            request, renderer.queryset)
+
+        final_data = renderer.render(qs)
         fResult = app_utils.final_dict(request, total_records, total_display_records, final_data)
 
         result, msg = True, success_msg
@@ -936,33 +823,14 @@ def ajax_maintenance_save(request):
     
     return result, message
 
-@app_logger.functionlogs(log=log_name)
-def ajax_eniry_save(request):
-    result = False
-    message = "Failed to save enquiry"
-    
-    try:
-        pDict = request.POST
-        files = request.FILES
-        logger.info("Processing enquiry save")
-        
-        # Create Lead first
-        lead_obj = Lead(
-            name=request.POST.get("name", ""),
-            email=request.POST.get("email", ""),
-            phone=request.POST.get("phone", ""),
-            location=request.POST.get("location", ""),
-            message=request.POST.get("message", ""),
-            property_type=request.POST.get("property_type", ""),
-            created_by=1,
-            updated_by=1
-        )
-        lead_obj.save()
-        logger.info("lead object created with ID: %s", lead_obj.id)
-
-        # -------- Send Email to User -----------
-        subject = "Thank you for your enquiry!"
-        body = f"""
+def queue_enquiry_emails(lead_obj):
+    """
+    Confirmation to the user and notification to the admins of a new Lead,
+    queued in the outbox so they are only sent once the Lead is committed
+    """
+    # -------- Send Email to User -----------
+    subject = "Thank you for your enquiry!"
+    body = f"""
         Hi {lead_obj.name},
 
         Thank you for contacting us! 
@@ -978,17 +846,51 @@ def ajax_eniry_save(request):
         Regards,  
         Your Company Team
         """
+    if lead_obj.email:
+        app_outbox.enqueue(subject, body, [lead_obj.email])
 
-        send_mail(
-            subject,
-            body,
-            settings.DEFAULT_FROM_EMAIL,    # From
-            [lead_obj.email],               # To user who submitted enquiry
-            fail_silently=False,
-        )
+    # -------- Notify Admin -----------
+    if settings.ENQUIRY_ADMIN_EMAILS:
+        subject = "New enquiry from {0}".format(lead_obj.name)
+        body = f"""
+        Name: {lead_obj.name}
+        Email: {lead_obj.email}
+        Phone: {lead_obj.phone}
+        Location: {lead_obj.location}
+        Property Type: {lead_obj.property_type}
+        Message: {lead_obj.message}
+        """
+        app_outbox.enqueue(subject, body, settings.ENQUIRY_ADMIN_EMAILS)
+
+
+@app_logger.functionlogs(log=log_name)
+def ajax_eniry_save(request):
+    result = False
+    message = "Failed to save enquiry"
+    
+    try:
+        pDict = request.POST
+        files = request.FILES
+        logger.info("Processing enquiry save")
+        
+        with transaction.atomic():
+            # Create Lead first
+            lead_obj = Lead(
+                name=request.POST.get("name", ""),
+                email=request.POST.get("email", ""),
+                phone=request.POST.get("phone", ""),
+                location=request.POST.get("location", ""),
+                message=request.POST.get("message", ""),
+                property_type=request.POST.get("property_type", ""),
+                created_by=1,
+                updated_by=1
+            )
+            lead_obj.save()
+            logger.info("lead object created with ID: %s", lead_obj.id)
+            queue_enquiry_emails(lead_obj)
 
         result = True
-        message = "Lead saved and confirmation email sent to user"
+        message = "Lead saved and confirmation email queued for the user"
 
     except Exception as e:
         logger.exception("Error in ajax_enquiry_save")
@@ -1019,8 +921,10 @@ def ajax_enquiry_save(request):
             created_by=1,
             updated_by=1
         )
-        lead_obj.save()
-        logger.info("lead object created with ID: %s", lead_obj.id)
+        with transaction.atomic():
+            lead_obj.save()
+            logger.info("lead object created with ID: %s", lead_obj.id)
+            queue_enquiry_emails(lead_obj)
         
         result = True
         message = "lead saved successfully"
@@ -4,3 +4,8 @@ from django.apps import AppConfig
 class SquareboxConfig(AppConfig):
     default_auto_field = 'django.db.models.BigAutoField'
     name = 'squarebox'
+
+    def ready(self):
+        # the signal receivers, connected for the scripts and the shell too
+        from config import app_datatable  # noqa: F401
+        from config import app_images  # noqa: F401
@@ -6,6 +6,7 @@ from crispy_forms.helper import *
 from crispy_forms.layout import *
 from crispy_forms.bootstrap import *
 from squarebox import models
+from config import app_reference
 
 
 class PropertyCreateUpdateForm(forms.ModelForm):
@@ -13,6 +14,7 @@ class PropertyCreateUpdateForm(forms.ModelForm):
     def __init__(self, *args, **kwargs):
         mode = kwargs.pop('mode', None)
         super(PropertyCreateUpdateForm, self).__init__(*args, **kwargs)
+        app_reference.bind(self.fields['property_type'])
         for field_name in self.fields:
             self.fields[field_name].label = str(self.fields[field_name].label).upper()
             self.fields[field_name].widget.attrs['class'] = "form-control form-control-solid"
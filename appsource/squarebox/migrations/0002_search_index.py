@@ -0,0 +1,33 @@
+# Full text search index for Property and Lead, see config/app_search.py
+
+from django.db import migrations
+from config import app_search
+
+
+SEARCH_INDEXES = {
+    'Property': ['title', 'address', 'city', 'state', 'zipcode', 'description'],
+    'Lead': ['name', 'email', 'phone', 'location', 'message'],
+}
+
+
+def install_search_index(apps, schema_editor):
+    backend = app_search.get_backend(schema_editor.connection)
+    for model_name, fields in SEARCH_INDEXES.items():
+        backend.install(schema_editor, apps.get_model('squarebox', model_name), fields)
+
+
+def uninstall_search_index(apps, schema_editor):
+    backend = app_search.get_backend(schema_editor.connection)
+    for model_name, fields in SEARCH_INDEXES.items():
+        backend.uninstall(schema_editor, apps.get_model('squarebox', model_name), fields)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('squarebox', '0001_initial'),
+    ]
+
+    operations = [
+        migrations.RunPython(install_search_index, uninstall_search_index),
+    ]
@@ -0,0 +1,69 @@
+# Indexes of the datamode / updated_on lists, see config/app_models.py
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('squarebox', '0003_image_derivatives'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='lead',
+            index=models.Index(fields=['datamode', '-updated_on'], name='lead_dm_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='lead',
+            index=models.Index(condition=models.Q(('datamode', 'D'), _negated=True), fields=['-updated_on'], name='lead_live_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='maintenancerequest',
+            index=models.Index(fields=['datamode', '-updated_on'], name='maintenance_request_dm_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='maintenancerequest',
+            index=models.Index(condition=models.Q(('datamode', 'D'), _negated=True), fields=['-updated_on'], name='maintenance_request_live_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='property',
+            index=models.Index(fields=['datamode', '-updated_on'], name='property_dm_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='property',
+            index=models.Index(condition=models.Q(('datamode', 'D'), _negated=True), fields=['-updated_on'], name='property_live_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='property',
+            index=models.Index(condition=models.Q(('datamode', 'D'), _negated=True), fields=['city'], name='property_city_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='property',
+            index=models.Index(fields=['listing_type', 'price'], name='property_listing_price_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='property',
+            index=models.Index(fields=['price'], name='property_price_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='propertyimage',
+            index=models.Index(fields=['datamode', '-updated_on'], name='property_image_dm_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='propertyimage',
+            index=models.Index(condition=models.Q(('datamode', 'D'), _negated=True), fields=['-updated_on'], name='property_image_live_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='propertyimage',
+            index=models.Index(condition=models.Q(('datamode', 'D'), _negated=True), fields=['property', '-updated_on'], name='property_image_cover_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='propertytype',
+            index=models.Index(fields=['datamode', '-updated_on'], name='property_type_dm_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='propertytype',
+            index=models.Index(condition=models.Q(('datamode', 'D'), _negated=True), fields=['-updated_on'], name='property_type_live_idx'),
+        ),
+    ]
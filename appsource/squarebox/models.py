@@ -2,6 +2,7 @@ from django.db import models
 from django.contrib.auth.models import User
 from django.conf import settings
 from config import app_gv as gv
+from config.app_models import LIVE, ActiveManager, datamode_indexes
 from django.utils import timezone
 from django.utils.timezone import now
 from django.core.mail import send_mail, EmailMessage
@@ -14,10 +15,12 @@ class PropertyType(models.Model):
     created_on = models.DateTimeField(auto_now_add=True)
     updated_on = models.DateTimeField(auto_now=True)
     datamode = models.CharField(max_length=20, default='A', choices=gv.DATAMODE_CHOICES)
+    objects = ActiveManager()
 
 
     class Meta:
         db_table = 'property_type'
+        indexes = datamode_indexes('property_type')
 
     def __str__(self):
         return self.name
@@ -53,6 +56,7 @@ class Property(models.Model):
     list_date = models.DateTimeField(auto_now_add=True,blank=True, null=True)
     is_hot_selling = models.BooleanField(default=False,blank=True, null=True)
     main_image = models.ImageField(upload_to='ddata/properties/%Y/%m/%d/',blank=True, null=True)
+    image_derivatives = models.JSONField(default=dict, blank=True, editable=False) # config/app_images.py
     property_type = models.ForeignKey(PropertyType, on_delete=models.SET_NULL, null=True, blank=True)
 
     # Apartment specific fields
@@ -96,9 +100,16 @@ class Property(models.Model):
     created_on = models.DateTimeField(auto_now_add=True)
     updated_on = models.DateTimeField(auto_now=True)
     datamode = models.CharField(max_length=20, default='A', choices=gv.DATAMODE_CHOICES)
+    objects = ActiveManager()
 
     class Meta:
         db_table = 'property'
+        # property_type is a ForeignKey, indexed already
+        indexes = datamode_indexes('property') + [
+            models.Index(fields=['city'], condition=LIVE, name='property_city_idx'),
+            models.Index(fields=['listing_type', 'price'], name='property_listing_price_idx'),
+            models.Index(fields=['price'], name='property_price_idx'),
+        ]
 
     def __str__(self):
         return self.title
@@ -110,14 +121,20 @@ class Property(models.Model):
 class PropertyImage(models.Model):
     property = models.ForeignKey(Property, on_delete=models.CASCADE, related_name='images')
     image = models.ImageField(upload_to='ddata/property_images/%Y/%m/%d/')
+    image_derivatives = models.JSONField(default=dict, blank=True, editable=False) # config/app_images.py
     created_by = models.CharField(max_length=8)
     updated_by = models.CharField(max_length=8)
     created_on = models.DateTimeField(auto_now_add=True)
     updated_on = models.DateTimeField(auto_now=True)
     datamode = models.CharField(max_length=20, default='A', choices=gv.DATAMODE_CHOICES)
+    objects = ActiveManager()
 
     class Meta:
         db_table = 'property_image'
+        # latest image per property (cover image, prefetched galleries)
+        indexes = datamode_indexes('property_image') + [
+            models.Index(fields=['property', '-updated_on'], condition=LIVE, name='property_image_cover_idx'),
+        ]
 
     def __str__(self):
         return f"Image for {self.property.title}"
@@ -151,9 +168,11 @@ class MaintenanceRequest(models.Model):
     created_on = models.DateTimeField(auto_now_add=True)
     updated_on = models.DateTimeField(auto_now=True)
     datamode = models.CharField(max_length=20, default='A', choices=gv.DATAMODE_CHOICES)
+    objects = ActiveManager()
     
     class Meta:
         db_table = 'maintenance_request'
+        indexes = datamode_indexes('maintenance_request')
 
     def __str__(self):
         return f"Maintenance Request #{self.id} for {self.property.title} by {self.user.username}"
@@ -187,9 +206,11 @@ class Lead(models.Model):
     created_on = models.DateTimeField(auto_now_add=True)
     updated_on = models.DateTimeField(auto_now=True)
     datamode = models.CharField(max_length=20, default='A', choices=gv.DATAMODE_CHOICES)
+    objects = ActiveManager()
 
     class Meta:
         db_table = 'lead'
+        indexes = datamode_indexes('lead')
 
     def __str__(self):
         return f"{self.name} ({self.property.title})"
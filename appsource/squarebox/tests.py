@@ -1,3 +1,37 @@
+from django.db import connection
+from django.db.models import OuterRef, Subquery
 from django.test import TestCase
+from unittest import skipUnless
+from squarebox.models import Property, PropertyImage, PropertyType
+from mck_master.models import SupportPageContent
 
-# Create your tests here.
+
+@skipUnless(connection.vendor == 'sqlite', "the plans are SQLite EXPLAIN QUERY PLAN output")
+class DatamodeIndexTests(TestCase):
+    """
+    The hot lists read an index (config/app_models.py), not the whole table
+    """
+    def assertUsesIndex(self, qs, index_name):
+        plan = qs.explain()
+        self.assertRegex(plan, r"USING (COVERING )?INDEX %s\b" % index_name, plan)
+
+    def test_live_latest_first(self):
+        self.assertUsesIndex(Property.objects.live().latest_first(), 'property_live_idx')
+        self.assertUsesIndex(PropertyType.objects.live().latest_first(), 'property_type_live_idx')
+        self.assertUsesIndex(SupportPageContent.objects.live().latest_first(), 'support_page_content_live_idx')
+
+    def test_active(self):
+        self.assertUsesIndex(Property.objects.active().latest_first(), 'property_dm_idx')
+
+    def test_property_search(self):
+        cities = Property.objects.live().values_list('city', flat=True).distinct().order_by('city')
+        self.assertUsesIndex(cities, 'property_city_idx')
+        self.assertUsesIndex(Property.objects.live().filter(listing_type='sale', price__lt=100000),
+                             'property_listing_price_idx')
+        self.assertUsesIndex(Property.objects.live().filter(price__gt=300000).order_by('price'),
+                             'property_price_idx')
+
+    def test_cover_image(self):
+        cover = PropertyImage.objects.filter(property=OuterRef('pk')).live().latest_first()
+        qs = Property.objects.live().annotate(cover_image=Subquery(cover.values('image')[:1]))
+        self.assertUsesIndex(qs, 'property_image_cover_idx')